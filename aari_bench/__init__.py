@@ -0,0 +1,13 @@
+"""
+AARI component micro-benchmarks
+Times the pure-Python NLP, emotion and memory paths that run on every
+command, writes machine-readable results and compares two runs
+
+    python -m aari_bench run -o before.json
+    python -m aari_bench run -o after.json
+    python -m aari_bench compare before.json after.json --threshold 0.10
+"""
+
+from aari_bench.core import BENCHMARKS, Benchmark, Case, benchmark, compare, run_benchmarks
+
+__all__ = ["BENCHMARKS", "Benchmark", "Case", "benchmark", "compare", "run_benchmarks"]
@@ -0,0 +1,104 @@
+"""
+python -m aari_bench [run] [-k PATTERN ...] [-o results.json]
+python -m aari_bench compare base.json new.json [--threshold 0.10]
+python -m aari_bench list
+"""
+
+import argparse
+import json
+import sys
+
+from aari_bench import core, suites  # noqa: F401  (suites registers the benchmarks)
+from aari_bench.fixtures import Fixtures, quiet_logging
+
+
+def cmd_list(args) -> int:
+    for bench in core.select(args.filter):
+        print(f"{bench.name:<32} {bench.description}")
+        for case_id in bench.case_ids():
+            print(f"    {case_id}")
+    return 0
+
+
+def cmd_run(args) -> int:
+    quiet_logging()
+    benchmarks = core.select(args.filter)
+    if not benchmarks:
+        print(f"No benchmarks match {args.filter}", file=sys.stderr)
+        return 2
+
+    def progress(case_id, result):
+        print(f"{case_id:<48} {core.format_ns(result['ns_per_op']):>12}  "
+              f"(min {core.format_ns(result['min_ns'])}, +/- {core.format_ns(result['stdev_ns'])})",
+              file=sys.stderr)
+
+    fixtures = Fixtures()
+    try:
+        document = core.run_benchmarks(benchmarks, fixtures, min_time=args.min_time, repeat=args.repeat,
+                                       progress=progress)
+    finally:
+        fixtures.close()
+
+    if args.output:
+        core.save_results(document, args.output)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        json.dump(document, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+def cmd_compare(args) -> int:
+    base = core.load_results(args.base)
+    new = core.load_results(args.new)
+    rows = core.compare(base, new, threshold=args.threshold)
+
+    if args.json:
+        json.dump({"threshold": args.threshold, "rows": rows}, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"{'Case':<48}{'Base':>12}{'New':>12}{'Ratio':>8}  Status")
+        print("-" * 92)
+        for row in rows:
+            ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+            print(f"{row['case']:<48}{core.format_ns(row['base_ns']):>12}{core.format_ns(row['new_ns']):>12}"
+                  f"{ratio:>8}  {row['status']}")
+
+    regressions = [row for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m aari_bench", description="AARI component micro-benchmarks")
+    commands = parser.add_subparsers(dest="command")
+
+    run = commands.add_parser("run", help="run benchmarks and emit JSON results")
+    run.add_argument("-k", "--filter", action="append", help="only benchmarks whose name contains this")
+    run.add_argument("-o", "--output", help="write results here instead of stdout")
+    run.add_argument("--min-time", type=float, default=0.05, help="seconds per timing sample")
+    run.add_argument("--repeat", type=int, default=5, help="samples per case")
+    run.set_defaults(handler=cmd_run)
+
+    listing = commands.add_parser("list", help="list benchmarks and cases")
+    listing.add_argument("-k", "--filter", action="append")
+    listing.set_defaults(handler=cmd_list)
+
+    diff = commands.add_parser("compare", help="compare two result files; exit 1 on regressions")
+    diff.add_argument("base")
+    diff.add_argument("new")
+    diff.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before failing")
+    diff.add_argument("--json", action="store_true", help="machine-readable comparison")
+    diff.set_defaults(handler=cmd_compare)
+
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0].startswith("-"):
+        argv = ["run"] + list(argv)
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Benchmark registry, timing loop, result files and run-to-run comparison
+"""
+
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+SCHEMA_VERSION = 1
+
+# Registered benchmarks by name, in definition order
+BENCHMARKS: Dict[str, "Benchmark"] = {}
+
+
+@dataclass
+class Case:
+    """One input set for a benchmark; inputs are built outside the timed region"""
+    name: str
+    inputs: Callable[[], List[Any]]
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class Benchmark:
+    """build(fixtures, **case.params) returns the callable timed once per input"""
+    name: str
+    build: Callable
+    cases: List[Case]
+    description: str = ""
+
+    def case_ids(self) -> List[str]:
+        return [f"{self.name}[{case.name}]" for case in self.cases]
+
+
+def benchmark(name: str, cases: List[Case]):
+    """Register a builder under `name`, run once per case"""
+    def register(build: Callable) -> Callable:
+        BENCHMARKS[name] = Benchmark(name, build, cases, (build.__doc__ or "").strip())
+        return build
+    return register
+
+
+def _run_once(call: Callable, items: List[Any], loops: int) -> int:
+    """Nanoseconds for `loops` passes over `items`"""
+    start = time.perf_counter_ns()
+    for _ in range(loops):
+        for item in items:
+            call(item)
+    return time.perf_counter_ns() - start
+
+
+def time_case(call: Callable, items: List[Any], min_time: float = 0.05, repeat: int = 5) -> Dict[str, Any]:
+    """Calibrate a loop count that runs at least `min_time`, then take `repeat` samples (GC off, like timeit)"""
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        loops = 1
+        while True:
+            elapsed = _run_once(call, items, loops)
+            if elapsed >= min_time * 1e9 or loops >= 1 << 20:
+                break
+            # Jump close to the target instead of doubling from 1 on fast cases
+            loops = max(loops * 2, int(loops * min_time * 1e9 / max(elapsed, 1) * 1.1))
+
+        ops = loops * len(items)
+        samples = [_run_once(call, items, loops) / ops for _ in range(repeat)]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        "ns_per_op": statistics.median(samples),
+        "min_ns": min(samples),
+        "stdev_ns": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "samples": samples,
+        "inputs": len(items),
+        "loops": loops,
+    }
+
+
+def select(patterns: Optional[List[str]] = None) -> List[Benchmark]:
+    """Benchmarks whose name contains any of `patterns` (all when none given)"""
+    if not patterns:
+        return list(BENCHMARKS.values())
+    return [bench for bench in BENCHMARKS.values() if any(p in bench.name for p in patterns)]
+
+
+def run_benchmarks(benchmarks: List[Benchmark], fixtures, min_time: float = 0.05, repeat: int = 5,
+                   progress: Optional[Callable[[str, Dict], None]] = None) -> Dict[str, Any]:
+    """Run every case and return a results document"""
+    results = {}
+    for bench in benchmarks:
+        for case in bench.cases:
+            case_id = f"{bench.name}[{case.name}]"
+            items = case.inputs()
+            call = bench.build(fixtures, **case.params)
+            results[case_id] = time_case(call, items, min_time=min_time, repeat=repeat)
+            if progress:
+                progress(case_id, results[case_id])
+
+    return {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        "settings": {"min_time": min_time, "repeat": repeat},
+        "results": results,
+    }
+
+
+def environment() -> Dict[str, str]:
+    """Where the numbers came from, so comparisons across machines are visible"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout.strip()
+    except Exception:
+        commit = ""
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "commit": commit,
+    }
+
+
+def save_results(document: Dict[str, Any], path: str):
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, "r") as f:
+        document = json.load(f)
+    if document.get("schema") != SCHEMA_VERSION:
+        raise ValueError(f"{path}: unsupported benchmark schema {document.get('schema')}")
+    return document
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """Per-case ratio new/base on the median; slower by more than `threshold` is a regression"""
+    rows = []
+    base_results, new_results = base["results"], new["results"]
+    for case_id in sorted(set(base_results) | set(new_results)):
+        before, after = base_results.get(case_id), new_results.get(case_id)
+        if before is None or after is None:
+            rows.append({"case": case_id, "status": "added" if before is None else "removed",
+                         "base_ns": before and before["ns_per_op"], "new_ns": after and after["ns_per_op"],
+                         "ratio": None})
+            continue
+
+        ratio = after["ns_per_op"] / before["ns_per_op"] if before["ns_per_op"] else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "same"
+        rows.append({"case": case_id, "status": status, "base_ns": before["ns_per_op"],
+                     "new_ns": after["ns_per_op"], "ratio": ratio})
+    return rows
+
+
+def format_ns(ns: Optional[float]) -> str:
+    """Human-scaled duration"""
+    if ns is None:
+        return "-"
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.0f} ns"
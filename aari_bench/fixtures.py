@@ -0,0 +1,57 @@
+"""
+Shared objects under benchmark, built lazily and once per run
+"""
+
+import logging
+import os
+import tempfile
+from typing import Dict
+
+from aari_bench import inputs
+
+
+class Fixtures:
+    """Lazily constructed components; model loading stays outside every timed region"""
+
+    def __init__(self):
+        self._nlp = None
+        self._emotion = None
+        self._memories: Dict[int, object] = {}
+        self._tmp = tempfile.TemporaryDirectory(prefix="aari-bench-")
+
+    @property
+    def nlp(self):
+        if self._nlp is None:
+            from nlp_processor import NLPProcessor
+            self._nlp = NLPProcessor()
+        return self._nlp
+
+    @property
+    def emotion(self):
+        if self._emotion is None:
+            from emotional_intelligence import EmotionalIntelligence
+            self._emotion = EmotionalIntelligence()
+        return self._emotion
+
+    @property
+    def model_dir(self) -> str:
+        """Scratch directory for model artifacts"""
+        return os.path.join(self._tmp.name, "models")
+
+    def memory(self, size: int):
+        """MemoryManager holding a generated store of `size` conversations (never written to disk)"""
+        if size not in self._memories:
+            from memory_manager import MemoryManager
+            manager = MemoryManager(memory_file=os.path.join(self._tmp.name, f"memory_{size}.json"))
+            manager.memory = inputs.memory_store(size)
+            self._memories[size] = manager
+        return self._memories[size]
+
+    def close(self):
+        self._tmp.cleanup()
+
+
+def quiet_logging():
+    """Per-call info/debug logging would dominate the hot paths being timed"""
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
@@ -0,0 +1,138 @@
+"""
+Benchmark inputs: realistic voice commands plus adversarial shapes
+(long dictations, keyword floods, no-match text, large memory stores)
+All generators are seeded so runs are comparable
+"""
+
+import random
+from typing import Any, Dict, List
+
+COMMANDS = [
+    "send message to john saying hello friend",
+    "whatsapp mom that i love her so much",
+    "text my brother to come home",
+    "email my boss about the meeting",
+    "call mom",
+    "set alarm for tomorrow morning at 6 am",
+    "remind me to buy milk in 10 minutes",
+    "wake me up at 6 am",
+    "what is the weather today",
+    "tell me a joke",
+    "play my favorite song",
+    "start the playlist",
+    "open chrome",
+    "launch whatsapp",
+    "turn on bluetooth",
+    "download the latest report pdf",
+    "remember this important information",
+    "save my preference",
+    "hello aari",
+    "good morning",
+]
+
+# The same commands grouped by the intent they are classified as
+COMMANDS_BY_INTENT = {
+    "send_message": ["send message to john saying hello friend", "whatsapp mom that i love her so much",
+                     "text my brother to come home", "email my boss about the meeting"],
+    "make_call": ["call mom"],
+    "set_reminder": ["set alarm for tomorrow morning at 6 am", "remind me to buy milk in 10 minutes",
+                     "wake me up at 6 am"],
+    "query": ["what is the weather today"],
+    "play_media": ["play my favorite song"],
+    "system_control": ["start the playlist", "open chrome", "launch whatsapp", "turn on bluetooth"],
+    "download_file": ["download the latest report pdf"],
+    "memory": ["remember this important information", "save my preference"],
+    "greeting": ["hello aari", "good morning"],
+}
+
+MESSAGE_COMMANDS = [command for command in COMMANDS
+                    if any(k in command for k in ("send", "message", "whatsapp", "text", "email", "sms"))]
+
+EMOTIONAL_INPUTS = [
+    "i'm so happy today, everything is amazing",
+    "i'm feeling really sad and lonely tonight",
+    "i'm so frustrated with this laptop",
+    "thank you for helping me",
+    "i'm confused about this topic",
+    "can you help me with something",
+    "open chrome",
+    "set alarm for 6 am",
+]
+
+_DICTATION_WORDS = (
+    "so i was thinking we could meet at the usual place around seven and then maybe grab dinner "
+    "after the movie if you are not too tired tell your sister she is welcome to join us and "
+    "say hi to everyone at home for me the message from yesterday was about the tickets which "
+    "i already booked so do not worry about that text me when you leave"
+).split()
+
+_FILLER_WORDS = "alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima".split()
+
+
+def dictation(chars: int, seed: int = 7) -> str:
+    """A long dictated WhatsApp body; the vocabulary repeats say/tell/text/message like real speech"""
+    rng = random.Random(seed)
+    words = []
+    length = 0
+    while length < chars:
+        word = rng.choice(_DICTATION_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def long_messages(sizes=(1024, 4096)) -> List[str]:
+    return [f"send message to john saying {dictation(size, seed=size)}" for size in sizes]
+
+
+def keyword_flood(repeats: int = 200) -> List[str]:
+    """Every intent keyword many times over: worst case for per-keyword substring scans"""
+    keywords = "send message call play open remind what hello download remember text tell say".split()
+    return [" ".join(keywords * repeats)]
+
+
+def no_match(chars: int = 2048, seed: int = 11) -> List[str]:
+    """Long text that matches no keyword, so every scan runs to the end"""
+    rng = random.Random(seed)
+    words = []
+    while sum(len(w) + 1 for w in words) < chars:
+        words.append(rng.choice(_FILLER_WORDS))
+    return [" ".join(words)]
+
+
+def punctuation_heavy() -> List[str]:
+    return [
+        "send... message!!! to -- john: saying 'hello, friend?!'",
+        "REMIND ME TO BUY MILK IN 10 MINUTES!!!",
+        "   whatsapp    mom    that    i    love    her   ",
+        "text\tmy\tbrother\tto\tcome\thome",
+        "téléphone à maman s'il te plaît",
+    ]
+
+
+def memory_store(size: int, seed: int = 3) -> Dict[str, Any]:
+    """A memory dict shaped like aari_memory.json with `size` conversations and size/10 facts"""
+    rng = random.Random(seed)
+    conversations = []
+    for i in range(size):
+        content = " ".join(rng.choice(_DICTATION_WORDS + _FILLER_WORDS) for _ in range(rng.randint(8, 40)))
+        conversations.append({
+            "title": f"note {i} {rng.choice(_FILLER_WORDS)}",
+            "content": content,
+            "category": rng.choice(["general", "important", "reminder"]),
+            "timestamp": "2026-01-01T00:00:00",
+            "tags": [w for w in content.split() if len(w) > 3],
+        })
+    return {
+        "user_name": "avnish",
+        "preferences": {},
+        "important_conversations": conversations,
+        "reminders": [],
+        "contacts": {},
+        "learned_facts": {f"fact {i}": f"value {rng.choice(_FILLER_WORDS)} {i}" for i in range(size // 10)},
+        "daily_notes": {},
+    }
+
+
+# Recall queries: matches a few entries, matches most entries, matches nothing
+RECALL_QUERIES = ["note 42", "dinner", "zzzz-not-there"]
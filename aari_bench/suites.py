@@ -0,0 +1,180 @@
+"""
+Benchmarks for the pure-Python paths that run on every command
+"""
+
+from aari_bench import inputs
+from aari_bench.core import Case, benchmark
+
+COMMAND_CASES = [
+    Case("realistic", lambda: list(inputs.COMMANDS)),
+    Case("punctuation", inputs.punctuation_heavy),
+    Case("long_message_4k", lambda: inputs.long_messages((4096,))),
+    Case("keyword_flood", inputs.keyword_flood),
+    Case("no_match_2k", inputs.no_match),
+]
+
+MESSAGE_CASES = [
+    Case("realistic", lambda: list(inputs.MESSAGE_COMMANDS)),
+    Case("long_message_1k", lambda: inputs.long_messages((1024,))),
+    Case("long_message_4k", lambda: inputs.long_messages((4096,))),
+    Case("long_message_16k", lambda: inputs.long_messages((16384,))),
+]
+
+
+@benchmark("nlp.keyword_intent", COMMAND_CASES)
+def keyword_intent(fx):
+    """NLPProcessor._keyword_based_intent on lowercased text"""
+    nlp = fx.nlp
+    return lambda text: nlp._keyword_based_intent(text.lower())
+
+
+@benchmark("nlp.extract_entities", COMMAND_CASES)
+def extract_entities(fx):
+    """NLPProcessor._extract_entities, spaCy parse included"""
+    return fx.nlp._extract_entities
+
+
+@benchmark("nlp.extract_intent", [
+    Case("realistic", lambda: list(inputs.COMMANDS), {"cached": False}),
+    Case("realistic_repeated", lambda: list(inputs.COMMANDS), {"cached": True}),
+])
+def extract_intent(fx, cached: bool):
+    """Full NLPProcessor.extract_intent as the command route calls it, with or without intent cache hits"""
+    nlp = fx.nlp
+    if cached:
+        return nlp.extract_intent
+
+    def uncached(text):
+        nlp.intent_cache.clear()
+        return nlp.extract_intent(text)
+    return uncached
+
+
+BATCH_CASES = [Case("200_commands", lambda: [list(inputs.COMMANDS) * 10])]
+
+
+@benchmark("nlp.classify_loop", BATCH_CASES)
+def classify_loop(fx):
+    """Hybrid intent scoring one text at a time (one predict_proba per text)"""
+    nlp = fx.nlp
+    return lambda texts: [nlp.classify_intents_batch([text]) for text in texts]
+
+
+@benchmark("nlp.classify_batch", BATCH_CASES)
+def classify_batch(fx):
+    """NLPProcessor.classify_intents_batch: one sparse transform + predict_proba for all texts"""
+    return fx.nlp.classify_intents_batch
+
+
+@benchmark("nlp.message_content", MESSAGE_CASES)
+def message_content(fx):
+    """NLPProcessor._extract_message_content"""
+    from nlp_processor import Utterance
+    extract = fx.nlp._extract_message_content
+    return lambda text: extract(Utterance(text))
+
+
+@benchmark("nlp.contact", MESSAGE_CASES[:2])
+def contact(fx):
+    """NLPProcessor._extract_contact, spaCy fallback included"""
+    from nlp_processor import Utterance
+    nlp = fx.nlp
+    return lambda text: nlp._extract_contact(Utterance(text, nlp._parse))
+
+
+def _sub_extractor(method: str):
+    def build(fx):
+        from nlp_processor import Utterance
+        extract = getattr(fx.nlp, method)
+        return lambda text: extract(Utterance(text))
+    build.__doc__ = f"NLPProcessor.{method}"
+    return build
+
+
+for _name, _method in (
+    ("file_name", "_extract_file_name"),
+    ("file_type", "_extract_file_type"),
+    ("app_name", "_extract_app_name"),
+    ("media_name", "_extract_media_name"),
+    ("reminder_text", "_extract_reminder_text"),
+    ("time_info", "_extract_time_info"),
+    ("alarm_type", "_extract_alarm_type"),
+):
+    benchmark(f"nlp.sub.{_name}", COMMAND_CASES[:3])(_sub_extractor(_method))
+
+
+INTENT_CASES = [
+    Case(intent, lambda intent=intent: list(inputs.COMMANDS_BY_INTENT[intent]), {"intent": intent})
+    for intent in inputs.COMMANDS_BY_INTENT
+]
+
+
+@benchmark("nlp.entities.all", INTENT_CASES)
+def entities_all(fx, intent: str):
+    """Every extractor the substring gates let through, spaCy parse included (the pre-planner path)"""
+    return fx.nlp._extract_entities
+
+
+@benchmark("nlp.entities.planned", INTENT_CASES)
+def entities_planned(fx, intent: str):
+    """NLPProcessor.extract_entities_for_intent: only the intent's slots, spaCy only as a fallback"""
+    nlp = fx.nlp
+    return lambda text: nlp.extract_entities_for_intent(intent, text)
+
+
+EMOTION_CASES = [
+    Case("realistic", lambda: list(inputs.EMOTIONAL_INPUTS)),
+    Case("long_message_4k", lambda: inputs.long_messages((4096,))),
+    Case("no_match_2k", inputs.no_match),
+]
+
+
+@benchmark("emotion.detect", EMOTION_CASES)
+def detect_emotion(fx):
+    """EmotionalIntelligence.detect_emotion (TextBlob sentiment included)"""
+    return fx.emotion.detect_emotion
+
+
+@benchmark("emotion.contextual_response", EMOTION_CASES[:2])
+def contextual_response(fx):
+    """EmotionalIntelligence.generate_contextual_response on a fixed handler reply"""
+    emotion = fx.emotion
+    context = {"user_name": "avnish"}
+    return lambda text: emotion.generate_contextual_response(text, "Here's what I can help with.", context)
+
+
+@benchmark("memory.recall", [
+    Case("store_100", lambda: list(inputs.RECALL_QUERIES), {"size": 100}),
+    Case("store_5000", lambda: list(inputs.RECALL_QUERIES), {"size": 5000}),
+])
+def recall(fx, size: int):
+    """MemoryManager.recall over a generated store"""
+    return fx.memory(size).recall
+
+
+@benchmark("startup.intent_model", [
+    Case("refit", lambda: [None], {"mode": "refit"}),
+    Case("artifact", lambda: [None], {"mode": "artifact"}),
+])
+def intent_model_startup(fx, mode: str):
+    """Getting a fitted intent classifier at process start: refit vs loading the artifact"""
+    import intent_model
+    from nlp_processor import INTENT_TRAINING_DATA
+
+    if mode == "refit":
+        return lambda _: intent_model.train(INTENT_TRAINING_DATA)
+
+    intent_model.load_or_train(INTENT_TRAINING_DATA, fx.model_dir)
+    return lambda _: intent_model.load_or_train(INTENT_TRAINING_DATA, fx.model_dir)
+
+
+@benchmark("keyword.scan", COMMAND_CASES)
+def keyword_scan(fx):
+    """One shared-automaton pass plus intent scoring; the per-thread memo is cleared so every call scans"""
+    from keyword_matcher import MATCHER
+    fx.nlp  # registers the intent table
+
+    def scan(text):
+        MATCHER._local.last = None
+        return MATCHER.scan(text.lower()).score("intent")
+    return scan
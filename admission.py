@@ -0,0 +1,168 @@
+"""
+Admission Control - Concurrency limits, token buckets and bounded queues
+Expensive endpoints are grouped into pools; a request either gets a slot,
+waits briefly in a bounded queue, or is shed at once with 429/503 and a
+Retry-After hint, so cheap endpoints keep their worker threads
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = os.getenv("AARI_CONFIG_FILE", "config.json")
+
+
+class Rejection:
+    """Why a request was shed and when the client should retry"""
+
+    def __init__(self, status: int, reason: str, retry_after: int):
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `burst`; caller holds the limiter lock"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Consume a token; returns 0, or the seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionLimiter:
+    """One pool: at most `max_concurrent` running, `max_queue` waiting up to `queue_timeout` seconds"""
+
+    def __init__(self, name: str, max_concurrent: int = 4, max_queue: int = 0, queue_timeout: float = 1.0,
+                 rate: float = 0, burst: float = 0):
+        self.name = name
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.max_queue = max(0, int(max_queue))
+        self.queue_timeout = max(0.0, float(queue_timeout))
+        self.bucket = TokenBucket(float(rate), float(burst or rate)) if rate else None
+
+        self._cond = threading.Condition(threading.Lock())
+        self.active = 0
+        self.waiting = 0
+        self._service_time = 1.0  # EWMA of seconds per request, for Retry-After
+
+    def acquire(self) -> Optional[Rejection]:
+        """Take a slot (possibly after queueing); returns a Rejection instead when shedding"""
+        with self._cond:
+            # A token is only spent once the request has a slot or a queue position
+            if self.active < self.max_concurrent:
+                rejection = self._take_token()
+                if rejection is None:
+                    self.active += 1
+                return rejection
+
+            if self.waiting >= self.max_queue:
+                return self._reject(503, "queue_full", self._drain_estimate())
+
+            rejection = self._take_token()
+            if rejection is not None:
+                return rejection
+
+            self.waiting += 1
+            metrics.ADMISSION_QUEUED.inc(self.name)
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self.active >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return self._reject(503, "queue_timeout", self._drain_estimate())
+                    self._cond.wait(remaining)
+            finally:
+                self.waiting -= 1
+                metrics.ADMISSION_QUEUED.dec(self.name)
+
+            self.active += 1
+            return None
+
+    def release(self, elapsed: float):
+        """Free the slot and fold the request's duration into the service-time estimate"""
+        with self._cond:
+            self.active -= 1
+            self._service_time = 0.8 * self._service_time + 0.2 * elapsed
+            self._cond.notify()
+
+    def _take_token(self) -> Optional[Rejection]:
+        """Spend a rate-limit token (called with the lock held); a Rejection when the bucket is empty"""
+        if self.bucket is None:
+            return None
+        wait = self.bucket.take()
+        return self._reject(429, "rate_limited", wait) if wait else None
+
+    def _drain_estimate(self) -> float:
+        """Seconds until the queue ahead of a new request should have cleared"""
+        return self._service_time * (self.waiting + 1) / self.max_concurrent
+
+    def _reject(self, status: int, reason: str, wait: float) -> Rejection:
+        metrics.ADMISSION_REJECTIONS.inc(self.name, reason)
+        return Rejection(status, reason, max(1, math.ceil(wait)))
+
+    def status(self) -> Dict:
+        with self._cond:
+            return {
+                "active": self.active,
+                "waiting": self.waiting,
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+            }
+
+
+class AdmissionController:
+    """Maps Flask endpoint names to their pool's limiter"""
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or {}
+        self.enabled = config.get("enabled", True)
+        self.pools = {
+            name: AdmissionLimiter(name, **settings)
+            for name, settings in config.get("pools", {}).items()
+        }
+        self.endpoints = {}
+        for endpoint, pool in config.get("endpoints", {}).items():
+            if pool in self.pools:
+                self.endpoints[endpoint] = self.pools[pool]
+            else:
+                logger.error(f"Admission config: endpoint {endpoint} names unknown pool {pool}")
+
+    @classmethod
+    def from_config_file(cls, path: str = CONFIG_FILE) -> "AdmissionController":
+        """Build from the "admission" section of config.json; no section means no limits"""
+        try:
+            with open(path, 'r') as f:
+                return cls(json.load(f).get("admission"))
+        except FileNotFoundError:
+            return cls()
+        except Exception as e:
+            logger.error(f"Error loading admission config: {e}")
+            return cls()
+
+    def limiter_for(self, endpoint: Optional[str]) -> Optional[AdmissionLimiter]:
+        if not self.enabled or endpoint is None:
+            return None
+        return self.endpoints.get(endpoint)
+
+    def status(self) -> Dict:
+        return {name: limiter.status() for name, limiter in self.pools.items()}
@@ -3,6 +3,7 @@ Advanced Features for AARI - Super Intelligent Voice Assistant
 Machine Learning, Computer Vision, IoT Control, Advanced Automation
 """
 
+import copy
 import os
 import json
 import subprocess
@@ -14,14 +15,26 @@ import requests
 from datetime import datetime, timedelta
 import re
 
+from keyword_matcher import MATCHER
+
 # Optional import for desktop automation (not needed in cloud)
 try:
     import pyautogui
-except ImportError:
+except Exception:  # ImportError, or KeyError("DISPLAY") on headless Linux
     pyautogui = None
 
 logger = logging.getLogger(__name__)
 
+# Subtask types checked in order; the first with a keyword present wins
+SUBTASK_KEYWORDS = {
+    "system_operation": ["kill", "close", "stop", "sleep", "restart"],
+    "file_management": ["file", "folder", "document"],
+    "process_automation": ["automate", "batch", "workflow"],
+    "iot_control": ["light", "thermostat", "lock"],
+    "screen_interaction": ["click", "type", "scroll", "screenshot"],
+}
+MATCHER.register("subtask", SUBTASK_KEYWORDS)
+
 
 class AdvancedTaskExecutor:
     """Execute advanced high-level tasks beyond basic commands"""
@@ -350,20 +363,7 @@ class MLProcessor:
     
     def classify_subtask(self, task: str) -> str:
         """Classify task type"""
-        task = task.lower()
-        
-        if any(word in task for word in ["kill", "close", "stop", "sleep", "restart"]):
-            return "system_operation"
-        elif any(word in task for word in ["file", "folder", "document"]):
-            return "file_management"
-        elif any(word in task for word in ["automate", "batch", "workflow"]):
-            return "process_automation"
-        elif any(word in task for word in ["light", "thermostat", "lock"]):
-            return "iot_control"
-        elif any(word in task for word in ["click", "type", "scroll", "screenshot"]):
-            return "screen_interaction"
-        else:
-            return "unknown"
+        return MATCHER.scan(task.lower()).first_label("subtask") or "unknown"
 
 
 class IoTController:
@@ -427,6 +427,12 @@ class AARIAdvanced:
         self.task_executor = AdvancedTaskExecutor()
         self.learning_engine = LearningEngine()
     
+    def for_session(self) -> "AARIAdvanced":
+        """Instance for one user's session: shares the stateless executor, learns its own patterns"""
+        advanced = copy.copy(self)
+        advanced.learning_engine = LearningEngine()
+        return advanced
+    
     def handle_advanced_command(self, command: str, user_context: Dict) -> str:
         """Handle advanced commands with full device control"""
         
@@ -2,16 +2,23 @@ package com.voiceassistant.app;
 
 import android.content.Context;
 import android.content.SharedPreferences;
+import android.os.Handler;
+import android.os.Looper;
+import com.android.volley.AuthFailureError;
 import com.android.volley.Request;
 import com.android.volley.RequestQueue;
 import com.android.volley.Response;
 import com.android.volley.VolleyError;
+import com.android.volley.toolbox.HttpResponse;
+import com.android.volley.toolbox.HurlStack;
 import com.android.volley.toolbox.JsonObjectRequest;
 import com.android.volley.toolbox.Volley;
 import org.json.JSONException;
 import org.json.JSONObject;
+import java.io.IOException;
 import java.util.HashMap;
 import java.util.Map;
+import java.util.UUID;
 
 /**
  * API Client for communicating with AARI backend server
@@ -47,6 +54,9 @@ public class ApiClient {
     private static boolean preferLocal = false;
     
     private static RequestQueue requestQueue;
+    private static final Handler jobPollHandler = new Handler(Looper.getMainLooper());
+    private static final long JOB_POLL_INTERVAL_MS = 1000;
+    private static final int JOB_POLL_MAX_ATTEMPTS = 120;
     private static ApiClient instance;
     private Context context;
     private SharedPreferences prefs;
@@ -54,7 +64,7 @@ public class ApiClient {
     private ApiClient(Context context) {
         this.context = context.getApplicationContext();
         this.prefs = context.getSharedPreferences("aari_prefs", Context.MODE_PRIVATE);
-        requestQueue = Volley.newRequestQueue(this.context);
+        requestQueue = newRequestQueue(this.context);
         
         // Load saved backend preference
         String savedBackend = prefs.getString("current_backend", "cloud");
@@ -74,6 +84,36 @@ public class ApiClient {
         return instance;
     }
     
+    /**
+     * Stable per-install id, sent as X-Device-Id so the backend keeps this
+     * device's history, memory and jobs apart from other clients
+     */
+    public static synchronized String getDeviceId(Context context) {
+        SharedPreferences prefs = context.getSharedPreferences("aari_prefs", Context.MODE_PRIVATE);
+        String deviceId = prefs.getString("device_id", null);
+        if (deviceId == null) {
+            deviceId = UUID.randomUUID().toString();
+            prefs.edit().putString("device_id", deviceId).apply();
+        }
+        return deviceId;
+    }
+    
+    /**
+     * Volley queue whose requests all carry this device's X-Device-Id header
+     */
+    public static RequestQueue newRequestQueue(Context context) {
+        final String deviceId = getDeviceId(context);
+        return Volley.newRequestQueue(context.getApplicationContext(), new HurlStack() {
+            @Override
+            public HttpResponse executeRequest(Request<?> request, Map<String, String> additionalHeaders)
+                    throws IOException, AuthFailureError {
+                Map<String, String> headers = new HashMap<>(additionalHeaders);
+                headers.put("X-Device-Id", deviceId);
+                return super.executeRequest(request, headers);
+            }
+        });
+    }
+    
     /**
      * Switch between local and cloud backend
      */
@@ -177,7 +217,7 @@ public class ApiClient {
                 Request.Method.POST,
                 BASE_URL + "/install-updates",
                 jsonBody,
-                response -> handleResponse(response, callback),
+                response -> handleJobResponse(response, callback),
                 error -> handleError(error, callback)) {
             @Override
             public Map<String, String> getHeaders() {
@@ -234,7 +274,7 @@ public class ApiClient {
                 Request.Method.POST,
                 BASE_URL + "/web-search",
                 jsonBody,
-                response -> handleResponse(response, callback),
+                response -> handleJobResponse(response, callback),
                 error -> handleError(error, callback));
 
         requestQueue.add(request);
@@ -324,6 +364,50 @@ public class ApiClient {
         }
     }
 
+    /**
+     * Long-running endpoints answer with a job id; poll it and deliver the job's result
+     */
+    private void handleJobResponse(JSONObject response, ApiCallback callback) {
+        String jobId = response.optString("job_id", null);
+        if (jobId == null) {
+            handleResponse(response, callback);
+            return;
+        }
+        pollJob(jobId, 0, callback);
+    }
+
+    private void pollJob(String jobId, int attempt, ApiCallback callback) {
+        if (attempt >= JOB_POLL_MAX_ATTEMPTS) {
+            if (callback != null) {
+                callback.onError("Timed out waiting for job " + jobId);
+            }
+            return;
+        }
+
+        jobPollHandler.postDelayed(() -> {
+            JsonObjectRequest request = new JsonObjectRequest(
+                    Request.Method.GET,
+                    BASE_URL + "/jobs/" + jobId,
+                    null,
+                    job -> {
+                        String state = job.optString("state");
+                        if ("succeeded".equals(state)) {
+                            JSONObject result = job.optJSONObject("result");
+                            handleResponse(result != null ? result : new JSONObject(), callback);
+                        } else if ("failed".equals(state)) {
+                            if (callback != null) {
+                                callback.onError(job.optString("error", "Job failed"));
+                            }
+                        } else {
+                            pollJob(jobId, attempt + 1, callback);
+                        }
+                    },
+                    error -> handleError(error, callback));
+
+            requestQueue.add(request);
+        }, JOB_POLL_INTERVAL_MS);
+    }
+
     private void handleError(VolleyError error, ApiCallback callback) {
         if (callback != null) {
             callback.onError(error.getMessage());
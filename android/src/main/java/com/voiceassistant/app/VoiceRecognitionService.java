@@ -22,7 +22,6 @@ import com.android.volley.RequestQueue;
 import com.android.volley.Response;
 import com.android.volley.VolleyError;
 import com.android.volley.toolbox.JsonObjectRequest;
-import com.android.volley.toolbox.Volley;
 import org.json.JSONException;
 import org.json.JSONObject;
 import java.util.ArrayList;
@@ -43,7 +42,7 @@ public class VoiceRecognitionService extends Service implements RecognitionListe
     @Override
     public int onStartCommand(Intent intent, int flags, int startId) {
         handler = new Handler(Looper.getMainLooper());
-        requestQueue = Volley.newRequestQueue(this);
+        requestQueue = ApiClient.newRequestQueue(this);
         advancedFeatures = new AdvancedFeaturesHandler(this);
         learningSystem = new LearningSystem(this);
         broadcastManager = LocalBroadcastManager.getInstance(this);
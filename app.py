@@ -3,10 +3,26 @@ Flask API Server for Voice Assistant
 Enables REST API for Android and desktop integration
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
+import gc
+import hashlib
 import json
 import logging
+import os
+import threading
+import time
+import uuid
+
+import metrics
+from admission import AdmissionController
+from gemini_client import GEMINI
+from job_queue import JobQueue, JobQueueFull
+from model_registry import MODELS
+from pagination import DEFAULT_PAGE_LIMIT, PageRequest, page_iterable, page_mapping, page_sequence, select_fields
+from profiler import PROFILE_HEADER, RequestProfiler
+from response_encoding import encode_response
+from session_manager import InvalidUserId, SessionManager, TooManyUsers
 
 app = Flask(__name__)
 CORS(app)
@@ -15,34 +31,201 @@ CORS(app)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Upper bound on commands accepted by /api/process-commands in one request
+MAX_BATCH_COMMANDS = 200
+
+# Entries per section in /api/get-memory when no ?section= is given
+MEMORY_SECTION_LIMIT = 20
+
 # Lazy initialization
 assistant = None
 task_executor = None
+_init_lock = threading.Lock()
+
+# Per-user sessions keyed by X-User-Id / X-Device-Id (models stay shared)
+sessions = SessionManager(lambda: get_assistant())
+
+# Concurrency / rate limits for expensive endpoints ("admission" in config.json)
+admission = AdmissionController.from_config_file()
+
+# Background jobs for install-updates, download-file and web-search
+jobs = JobQueue()
+
+# Sampled / admin-requested cProfile captures (AARI_PROFILE_* env vars)
+profiler = RequestProfiler()
+
+# Distinguishes this process's version counters in ETags
+_BOOT_ID = uuid.uuid4().hex
+
+# Warm-up state reported by /api/ready
+_ready = threading.Event()
+_warm_up_started = False
+_warm_up_error = None
 
 def get_assistant():
     """Lazy load assistant"""
     global assistant
     if assistant is None:
-        try:
-            from voice_assistant import VoiceAssistant
-            assistant = VoiceAssistant()
-        except Exception as e:
-            logger.error(f"Failed to initialize VoiceAssistant: {e}")
-            return None
+        with _init_lock:
+            if assistant is None:
+                try:
+                    from voice_assistant import VoiceAssistant
+                    assistant = VoiceAssistant()
+                except Exception as e:
+                    logger.error(f"Failed to initialize VoiceAssistant: {e}")
+                    return None
     return assistant
 
 def get_task_executor():
     """Lazy load task executor"""
     global task_executor
     if task_executor is None:
-        try:
-            from task_executor import TaskExecutor
-            task_executor = TaskExecutor()
-        except Exception as e:
-            logger.error(f"Failed to initialize TaskExecutor: {e}")
-            return None
+        with _init_lock:
+            if task_executor is None:
+                try:
+                    from task_executor import TaskExecutor
+                    task_executor = TaskExecutor()
+                except Exception as e:
+                    logger.error(f"Failed to initialize TaskExecutor: {e}")
+                    return None
     return task_executor
 
+def current_user_id() -> str:
+    """User/device id from request headers; empty means the shared default session"""
+    return (request.headers.get('X-User-Id') or request.headers.get('X-Device-Id') or '').strip()
+
+def _etag(*parts) -> str:
+    """Strong ETag from a store version; the boot id keeps restarted counters from colliding"""
+    return hashlib.sha1("|".join(str(p) for p in (_BOOT_ID, current_user_id()) + parts).encode()).hexdigest()[:24]
+
+def _not_modified(etag: str):
+    """304 response if the client already holds this version, else None"""
+    if request.if_none_match.contains_weak(etag):
+        metrics.CACHE_LOOKUPS.inc("etag", "hit")
+        response = app.response_class(status=304)
+        return _tagged(response, etag)
+    metrics.CACHE_LOOKUPS.inc("etag", "miss")
+    return None
+
+def _tagged(response, etag: str):
+    """Attach the ETag and mark the response as varying by user"""
+    response.set_etag(etag)
+    response.vary.update(["X-User-Id", "X-Device-Id"])
+    return response
+
+def warm_up():
+    """Build every heavy component and exercise the hot paths once"""
+    global _warm_up_error
+    start = time.perf_counter()
+    try:
+        asst = get_assistant()
+        if asst is None:
+            raise RuntimeError("Assistant not available")
+        get_task_executor()
+        
+        # Load every shared model once (spaCy, Gemini client, intent classifier, sentiment lexicon)
+        MODELS.warm()
+        
+        # Prime regex caches and the hot paths
+        asst.nlp_processor.extract_intent("send message to john saying hello")
+        asst.emotional_intelligence.detect_emotion("hello, thank you")
+        
+        _warm_up_error = None
+        _ready.set()
+        logger.info(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
+    except Exception as e:
+        _warm_up_error = str(e)
+        logger.error(f"Warm-up failed: {e}")
+
+def start_warm_up():
+    """Run warm-up once on a background thread"""
+    global _warm_up_started
+    with _init_lock:
+        if _warm_up_started:
+            return
+        _warm_up_started = True
+    threading.Thread(target=warm_up, name="aari-warm-up", daemon=True).start()
+
+
+@app.before_request
+def _start_request_metrics():
+    """Count the request as in flight; labelled by route, never by raw path"""
+    g.metrics_endpoint = request.endpoint or "unmatched"
+    g.metrics_start = time.perf_counter()
+    metrics.IN_FLIGHT.inc(g.metrics_endpoint)
+    
+    profile = profiler.start(request.headers.get(PROFILE_HEADER))
+    if profile is not None:
+        g.profile = profile
+
+@app.before_request
+def _check_user_id():
+    """Refuse malformed ids, and new ids once the per-user storage cap is reached"""
+    try:
+        sessions.check_user_id(current_user_id())
+    except InvalidUserId as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except TooManyUsers as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    return None
+
+@app.before_request
+def _admit_request():
+    """Shed load on limited endpoints before it takes a worker thread for long"""
+    limiter = admission.limiter_for(request.endpoint)
+    if limiter is None:
+        return None
+    
+    rejection = limiter.acquire()
+    if rejection is not None:
+        message = "Too many requests" if rejection.status == 429 else "Server busy"
+        response = jsonify({"status": "error", "message": message, "reason": rejection.reason})
+        response.status_code = rejection.status
+        response.headers["Retry-After"] = str(rejection.retry_after)
+        return response
+    
+    g.admission = (limiter, time.perf_counter())
+    return None
+
+@app.after_request
+def _record_request_metrics(response):
+    """Observe request latency by endpoint and status"""
+    if "metrics_start" in g:
+        metrics.REQUEST_LATENCY.observe(
+            g.metrics_endpoint, response.status_code, value=time.perf_counter() - g.metrics_start
+        )
+    if "profile" in g:
+        g.profile_status = response.status_code
+    return response
+
+@app.after_request
+def _encode_response(response):
+    """MessagePack / brotli / gzip negotiation for JSON responses"""
+    return encode_response(response, request)
+
+@app.teardown_request
+def _finish_request_metrics(exc):
+    """Runs even when a view raised, so gauges and admission slots never leak"""
+    endpoint = g.pop("metrics_endpoint", None)
+    if endpoint is not None:
+        metrics.IN_FLIGHT.dec(endpoint)
+    
+    admitted = g.pop("admission", None)
+    if admitted is not None:
+        limiter, started = admitted
+        limiter.release(time.perf_counter() - started)
+    
+    # Teardown runs after streamed bodies finish, so SSE requests are profiled end to end
+    profile = g.pop("profile", None)
+    if profile is not None:
+        profiler.finish(profile, {
+            "endpoint": endpoint,
+            "method": request.method,
+            "path": request.path,
+            "status": g.pop("profile_status", 500),
+            "duration_ms": round((time.perf_counter() - g.metrics_start) * 1000, 3),
+        })
+
 
 @app.route('/api/process-command', methods=['POST'])
 def process_command():
@@ -54,37 +237,21 @@ def process_command():
         if not command:
             return jsonify({"status": "error", "message": "No command provided"}), 400
         
-        asst = get_assistant()
+        # Not sessions.session(): command stages take the state lock themselves, around local work only
+        asst = sessions.get(current_user_id())
         if asst is None:
             return jsonify({"status": "error", "message": "Assistant not available"}), 500
         
-        # Process command and extract intent/entities
-        response = asst.process_command(command)
-        
-        # Also extract intent and entities for mobile apps
-        intent, entities, confidence = asst.nlp_processor.extract_intent(command)
+        # Single pass: response, intent, entities and contact details together
+        detailed = asst.process_command_detailed(command)
         
         # Build response with metadata
         result = {
             "status": "success",
-            "response": response,
-            "intent": intent,
-            "confidence": confidence,
+            **detailed.to_dict(),
             "timestamp": json.dumps(__import__('datetime').datetime.now(), default=str)
         }
         
-        # Add contact and message info if available
-        if entities:
-            if entities.get("contact"):
-                result["contact"] = entities.get("contact")
-                # Get contact number
-                contact_number = asst._get_contact_number(entities.get("contact"))
-                if contact_number:
-                    result["contact_number"] = contact_number
-            
-            if entities.get("message"):
-                result["message"] = entities.get("message")
-        
         return jsonify(result)
     
     except Exception as e:
@@ -92,6 +259,120 @@ def process_command():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+def submit_job(kind: str, func, *args, **kwargs):
+    """Queue work on the job pool and answer 202 with where to poll"""
+    try:
+        job = jobs.submit(kind, func, *args, owner=current_user_id(), **kwargs)
+    except JobQueueFull as e:
+        logger.error(f"Job queue full: {e}")
+        response = jsonify({"status": "error", "message": "Too many background jobs, retry later"})
+        response.status_code = 503
+        response.headers["Retry-After"] = "5"
+        return response
+    
+    # Anonymous callers can only poll through this URL: it carries the job's secret
+    job_url = f"/api/jobs/{job.id}?token={job.token}" if job.token else f"/api/jobs/{job.id}"
+    response = jsonify({
+        "status": "accepted",
+        "job_id": job.id,
+        "job_url": job_url
+    })
+    response.status_code = 202
+    response.headers["Location"] = job_url
+    return response
+
+
+def sse_event(event: str, data) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.route('/api/process-command/stream', methods=['POST'])
+def process_command_stream():
+    """Process voice command, streaming intent, answer chunks and the final result as SSE"""
+    try:
+        data = request.get_json()
+        command = data.get('command', '').lower()
+        
+        if not command:
+            return jsonify({"status": "error", "message": "No command provided"}), 400
+        
+        if get_assistant() is None:
+            return jsonify({"status": "error", "message": "Assistant not available"}), 500
+        
+        user_id = current_user_id()
+        
+        def generate():
+            try:
+                asst = sessions.get(user_id)
+                for event, payload in asst.process_command_stream(command):
+                    yield sse_event(event, payload)
+            except Exception as e:
+                logger.error(f"Error streaming command: {e}")
+                yield sse_event("error", {"status": "error", "message": str(e)})
+        
+        response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+    
+    except Exception as e:
+        logger.error(f"Error processing command: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route('/api/process-commands', methods=['POST'])
+def process_commands():
+    """Process an ordered batch of commands (offline queue replay)"""
+    try:
+        data = request.get_json()
+        items = data.get('commands', [])
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({"status": "error", "message": "No commands provided"}), 400
+        
+        if len(items) > MAX_BATCH_COMMANDS:
+            return jsonify({
+                "status": "error",
+                "message": f"Too many commands (max {MAX_BATCH_COMMANDS})"
+            }), 413
+        
+        # Accept plain strings or {"command": "..."} objects; anything else (numbers, null) is not a command
+        commands = []
+        for item in items:
+            command = item.get('command', '') if isinstance(item, dict) else item
+            commands.append(command.lower() if isinstance(command, str) else None)
+        
+        asst = sessions.get(current_user_id())
+        if asst is None:
+            return jsonify({"status": "error", "message": "Assistant not available"}), 500
+        
+        # Empty and non-string items are reported in place so indexes stay aligned with the request
+        valid = [i for i, command in enumerate(commands) if command]
+        batch_results = asst.process_commands_batch([commands[i] for i in valid])
+        
+        results = [
+            {"index": i, "status": "error",
+             "message": "Command must be a string" if command is None else "No command provided"}
+            for i, command in enumerate(commands)
+        ]
+        for i, item_result in zip(valid, batch_results):
+            item_result["index"] = i
+            results[i] = item_result
+        
+        return jsonify({
+            "status": "success",
+            "results": results,
+            "count": len(results),
+            "errors": sum(1 for r in results if r["status"] != "success"),
+            "timestamp": json.dumps(__import__('datetime').datetime.now(), default=str)
+        })
+    
+    except Exception as e:
+        logger.error(f"Error processing command batch: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
 @app.route('/api/send-message', methods=['POST'])
 def send_message():
     """Send message via WhatsApp"""
@@ -133,7 +414,7 @@ def make_call():
 
 @app.route('/api/download-file', methods=['POST'])
 def download_file():
-    """Download file"""
+    """Download file in the background; poll /api/jobs/<id> for the result"""
     try:
         data = request.get_json()
         file_name = data.get('file_name', '')
@@ -143,8 +424,7 @@ def download_file():
         if executor is None:
             return jsonify({"status": "error", "message": "Executor not available"}), 500
         
-        result = executor.download_file(file_name, file_type)
-        return jsonify(result)
+        return submit_job("download_file", executor.download_file, file_name, file_type)
     
     except Exception as e:
         logger.error(f"Error downloading file: {e}")
@@ -270,20 +550,40 @@ def execute_system_command():
 
 @app.route('/api/get-conversation-history', methods=['GET'])
 def get_conversation_history():
-    """Get conversation history"""
+    """Get one page of conversation history (?limit=&before=|after=&fields=), newest page by default"""
     try:
-        asst = get_assistant()
-        if asst is None:
-            return jsonify({"status": "error", "message": "Assistant not available"}), 500
+        try:
+            page = PageRequest.from_args(request.args)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
         
-        history = asst.get_conversation_history()
-        return jsonify({"status": "success", "history": history})
+        with sessions.session(current_user_id()) as asst:
+            if asst is None:
+                return jsonify({"status": "error", "message": "Assistant not available"}), 500
+            
+            # The version changes on every append and never repeats, even for a recreated session
+            history = asst.get_conversation_history()
+            etag = _etag("history", asst.history_version, request.query_string.decode())
+            cached = _not_modified(etag)
+            if cached is not None:
+                return cached
+            
+            items, page_info = page_sequence(history, page)
+            return _tagged(jsonify({"status": "success", "history": items, "page": page_info}), etag)
     
     except Exception as e:
         logger.error(f"Error getting history: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+def _cache_stats():
+    """Size and hit rate of the shared intent and answer caches (empty until the assistant is loaded)"""
+    if assistant is None:
+        return {}
+    from nlp_processor import ANSWER_CACHE
+    return {"intent": assistant.nlp_processor.intent_cache.stats(), "answer": ANSWER_CACHE.stats()}
+
+
 @app.route('/api/status', methods=['GET'])
 def status():
     """Get assistant status"""
@@ -291,6 +591,10 @@ def status():
         "status": "running",
         "assistant": "AI Voice Assistant",
         "version": "1.0.0",
+        "admission": admission.status(),
+        "models": MODELS.stats(),
+        "caches": _cache_stats(),
+        "gemini": GEMINI.status(),
         "timestamp": json.dumps(__import__('datetime').datetime.now(), default=str)
     })
 
@@ -301,6 +605,67 @@ def health():
     return jsonify({"status": "healthy"}), 200
 
 
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    """Readiness check: green only once warm-up has finished"""
+    if _ready.is_set():
+        return jsonify({"status": "ready"}), 200
+    
+    # A readiness probe against a cold worker starts warming it up
+    start_warm_up()
+    body = {"status": "warming_up"}
+    if _warm_up_error:
+        body["error"] = _warm_up_error
+    return jsonify(body), 503
+
+
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage/intent latency histograms and counters in Prometheus text format"""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+def _profiles_forbidden():
+    """403 unless the admin token is sent; with no token configured, only a debug-mode server serves them"""
+    if profiler.admin_token:
+        if profiler.is_admin(request.headers.get(PROFILE_HEADER)):
+            return None
+        return jsonify({"status": "error", "message": "Admin token required"}), 403
+    if app.debug:
+        return None
+    return jsonify({"status": "error", "message": "Profiles disabled: set AARI_PROFILE_TOKEN"}), 403
+
+@app.route('/api/debug/profiles', methods=['GET'])
+def list_profiles():
+    """List recent request profiles with their hottest functions"""
+    forbidden = _profiles_forbidden()
+    if forbidden is not None:
+        return forbidden
+    
+    limit = request.args.get('limit', 20, type=int)
+    profiles = profiler.list_profiles(limit)
+    return jsonify({
+        "status": "success",
+        "sample_rate": profiler.sample_rate,
+        "keep": profiler.keep,
+        "profiles": profiles,
+        "count": len(profiles)
+    })
+
+@app.route('/api/debug/profiles/<profile_id>/<kind>', methods=['GET'])
+def get_profile(profile_id, kind):
+    """Download a profile as a pstats dump or a collapsed-stack flamegraph file"""
+    forbidden = _profiles_forbidden()
+    if forbidden is not None:
+        return forbidden
+    
+    path = profiler.profile_path(profile_id, kind)
+    if path is None:
+        return jsonify({"status": "error", "message": "Profile not found"}), 404
+    return send_file(os.path.abspath(path), as_attachment=True,
+                     mimetype="application/octet-stream" if kind == "pstats" else "text/plain")
+
+
 @app.route('/api/remember', methods=['POST'])
 def remember():
     """Remember/store important information"""
@@ -310,12 +675,12 @@ def remember():
         content = data.get('content', '')
         category = data.get('category', 'general')
         
-        asst = get_assistant()
-        if asst is None:
-            return jsonify({"status": "error", "message": "Assistant not available"}), 500
-        
-        result = asst.memory_manager.remember(title, content, category)
-        return jsonify(result)
+        with sessions.session(current_user_id()) as asst:
+            if asst is None:
+                return jsonify({"status": "error", "message": "Assistant not available"}), 500
+            
+            result = asst.memory_manager.remember(title, content, category)
+            return jsonify(result)
     
     except Exception as e:
         logger.error(f"Error in remember: {e}")
@@ -324,21 +689,28 @@ def remember():
 
 @app.route('/api/recall', methods=['POST'])
 def recall():
-    """Recall stored memories"""
+    """Recall stored memories, one page at a time (limit/before/after/fields in body or query)"""
     try:
         data = request.get_json()
         query = data.get('query', '')
         
-        asst = get_assistant()
-        if asst is None:
-            return jsonify({"status": "error", "message": "Assistant not available"}), 500
+        try:
+            page = PageRequest.from_args({**request.args.to_dict(), **data})
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
         
-        memories = asst.memory_manager.recall(query)
-        return jsonify({
-            "status": "success",
-            "memories": memories,
-            "count": len(memories)
-        })
+        with sessions.session(current_user_id()) as asst:
+            if asst is None:
+                return jsonify({"status": "error", "message": "Assistant not available"}), 500
+            
+            # The search stops as soon as the page is full
+            memories, page_info = page_iterable(asst.memory_manager.iter_recall(query), page)
+            return jsonify({
+                "status": "success",
+                "memories": memories,
+                "count": len(memories),
+                "page": page_info
+            })
     
     except Exception as e:
         logger.error(f"Error in recall: {e}")
@@ -353,31 +725,76 @@ def learn():
         fact = data.get('fact', '')
         value = data.get('value', '')
         
-        asst = get_assistant()
-        if asst is None:
-            return jsonify({"status": "error", "message": "Assistant not available"}), 500
-        
-        result = asst.memory_manager.learn_fact(fact, value)
-        return jsonify(result)
+        with sessions.session(current_user_id()) as asst:
+            if asst is None:
+                return jsonify({"status": "error", "message": "Assistant not available"}), 500
+            
+            result = asst.memory_manager.learn_fact(fact, value)
+            return jsonify(result)
     
     except Exception as e:
         logger.error(f"Error in learn: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+def _page_memory_section(entries, page: PageRequest):
+    """(items, page info) for a list or dict memory section; None for anything else"""
+    if isinstance(entries, list):
+        return page_sequence(entries, page)
+    if isinstance(entries, dict):
+        return page_mapping(entries, page)
+    return None
+
+
 @app.route('/api/get-memory', methods=['GET'])
 def get_memory():
-    """Get all stored memories"""
+    """Get stored memories: the first page of each section (?fields= picks sections), or ?section= to page through one"""
     try:
-        asst = get_assistant()
-        if asst is None:
-            return jsonify({"status": "error", "message": "Assistant not available"}), 500
-        
-        memories = asst.memory_manager.get_all_memories()
-        return jsonify({
-            "status": "success",
-            "memories": memories
-        })
+        section = request.args.get('section')
+        try:
+            page = PageRequest.from_args(request.args, default_limit=DEFAULT_PAGE_LIMIT if section else MEMORY_SECTION_LIMIT)
+            if not section and (page.before is not None or page.after is not None):
+                raise ValueError("before and after need ?section=")
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        
+        with sessions.session(current_user_id()) as asst:
+            if asst is None:
+                return jsonify({"status": "error", "message": "Assistant not available"}), 500
+            
+            etag = _etag("memory", asst.memory_manager.version, request.query_string.decode())
+            cached = _not_modified(etag)
+            if cached is not None:
+                return cached
+            
+            memories = asst.memory_manager.get_all_memories()
+            if not section:
+                # Each section is capped at limit entries; its page info says how to fetch the rest
+                first_page = PageRequest(page.limit)
+                sections, pages = {}, {}
+                for name, entries in select_fields(memories, page.fields).items():
+                    paged = _page_memory_section(entries, first_page)
+                    if paged is None:
+                        sections[name] = entries
+                    else:
+                        sections[name], pages[name] = paged
+                return _tagged(jsonify({
+                    "status": "success",
+                    "memories": sections,
+                    "pages": pages
+                }), etag)
+            
+            paged = _page_memory_section(memories.get(section), page)
+            if paged is None:
+                return jsonify({"status": "error", "message": f"Unknown memory section: {section}"}), 404
+            items, page_info = paged
+            
+            return _tagged(jsonify({
+                "status": "success",
+                "section": section,
+                "memories": items,
+                "page": page_info
+            }), etag)
     
     except Exception as e:
         logger.error(f"Error in get_memory: {e}")
@@ -388,12 +805,12 @@ def get_memory():
 def clear_memory():
     """Clear all memories"""
     try:
-        asst = get_assistant()
-        if asst is None:
-            return jsonify({"status": "error", "message": "Assistant not available"}), 500
-        
-        result = asst.memory_manager.clear_memories()
-        return jsonify(result)
+        with sessions.session(current_user_id()) as asst:
+            if asst is None:
+                return jsonify({"status": "error", "message": "Assistant not available"}), 500
+            
+            result = asst.memory_manager.clear_memories()
+            return jsonify(result)
     
     except Exception as e:
         logger.error(f"Error in clear_memory: {e}")
@@ -418,7 +835,7 @@ def check_updates():
 
 @app.route('/api/install-updates', methods=['POST'])
 def install_updates():
-    """Install available updates"""
+    """Install available updates in the background; poll /api/jobs/<id> for the result"""
     try:
         data = request.get_json()
         features = data.get('features', None)  # Optional specific features list
@@ -427,8 +844,7 @@ def install_updates():
         if asst is None:
             return jsonify({"status": "error", "message": "Assistant not available"}), 500
         
-        result = asst.auto_updater.auto_install_updates(features)
-        return jsonify(result)
+        return submit_job("install_updates", asst.auto_updater.auto_install_updates, features)
     
     except Exception as e:
         logger.error(f"Error installing updates: {e}")
@@ -443,15 +859,20 @@ def update_status():
         if asst is None:
             return jsonify({"status": "error", "message": "Assistant not available"}), 500
         
+        etag = _etag("update-status", asst.auto_updater.config_version())
+        cached = _not_modified(etag)
+        if cached is not None:
+            return cached
+        
         config = asst.auto_updater._load_config()
-        return jsonify({
+        return _tagged(jsonify({
             "status": "success",
             "auto_update_enabled": config.get("auto_update_enabled"),
             "last_update_check": config.get("last_update_check"),
             "last_feature_update": config.get("last_feature_update"),
             "installed_features": config.get("installed_features", []),
             "update_history": config.get("update_history", [])
-        })
+        }), etag)
     
     except Exception as e:
         logger.error(f"Error getting update status: {e}")
@@ -462,20 +883,20 @@ def update_status():
 def learning_status():
     """Get self-learning system status"""
     try:
-        asst = get_assistant()
-        if asst is None:
-            return jsonify({"status": "error", "message": "Assistant not available"}), 500
-        
-        patterns = asst.self_learning.pattern_db.get("patterns", [])
-        success_patterns = [p for p in patterns if p.get("success")]
-        
-        return jsonify({
-            "status": "success",
-            "total_interactions": len(patterns),
-            "successful_interactions": len(success_patterns),
-            "success_rate": len(success_patterns) / len(patterns) if patterns else 0,
-            "learning_enabled": True
-        })
+        with sessions.session(current_user_id()) as asst:
+            if asst is None:
+                return jsonify({"status": "error", "message": "Assistant not available"}), 500
+            
+            etag = _etag("learning", asst.self_learning.version)
+            cached = _not_modified(etag)
+            if cached is not None:
+                return cached
+            
+            return _tagged(jsonify({
+                "status": "success",
+                **asst.self_learning.get_status(),
+                "learning_enabled": True
+            }), etag)
     
     except Exception as e:
         logger.error(f"Error getting learning status: {e}")
@@ -484,7 +905,7 @@ def learning_status():
 
 @app.route('/api/web-search', methods=['POST'])
 def web_search():
-    """Perform web search"""
+    """Perform web search in the background; poll /api/jobs/<id> for the result"""
     try:
         data = request.get_json()
         query = data.get('query', '')
@@ -494,19 +915,31 @@ def web_search():
         if asst is None:
             return jsonify({"status": "error", "message": "Assistant not available"}), 500
         
-        results = asst.web_search.search(query, num_results)
-        return jsonify({
-            "status": "success",
-            "query": query,
-            "results": results,
-            "count": len(results)
-        })
+        def run_search(progress):
+            results = asst.web_search.search(query, num_results, progress=progress)
+            return {
+                "status": "success",
+                "query": query,
+                "results": results,
+                "count": len(results)
+            }
+        
+        return submit_job("web_search", run_search)
     
     except Exception as e:
         logger.error(f"Error in web search: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Progress and, once finished, result of a background job"""
+    job = jobs.get(job_id, owner=current_user_id(), token=request.args.get('token', ''))
+    if job is None:
+        return jsonify({"status": "error", "message": "Job not found or expired"}), 404
+    return jsonify({"status": "success", **job.to_dict()})
+
+
 @app.route('/api/get-page-content', methods=['POST'])
 def get_page_content():
     """Get content from webpage"""
@@ -530,6 +963,15 @@ def get_page_content():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+# Preload mode: build everything at import time, so a worker is warm before it serves.
+# Import in the worker (no gunicorn --preload): gRPC channels in the Gemini client do not survive a fork
+if os.getenv("AARI_PRELOAD", "").lower() in ("1", "true", "yes"):
+    warm_up()
+    # Keep the collector from rescanning the long-lived models on every full collection
+    gc.freeze()
+
+
 if __name__ == '__main__':
     logger.info("Starting Voice Assistant API Server on http://localhost:5000")
+    start_warm_up()
     app.run(debug=False, host='0.0.0.0', port=5000, threaded=True)
@@ -0,0 +1,443 @@
+"""
+Async API Server for Voice Assistant
+Serves the same routes as app.py on an asyncio event loop so slow
+Gemini, web search and download calls cost coroutines, not threads,
+plus a persistent WebSocket channel at /api/ws for the desktop client
+
+Run with:
+    gunicorn app_async:app --bind :$PORT --worker-class aiohttp.GunicornWebWorker
+or:
+    python app_async.py
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from datetime import datetime
+
+from aiohttp import WSMsgType, web
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+
+import app as wsgi
+import metrics
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Threads for CPU-bound NLP work and for routes served through the Flask app
+WORKER_THREADS = int(os.getenv("ASYNC_WORKER_THREADS", "8"))
+
+executor = ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix="aari-worker")
+
+# Threads that advance streaming command generators; each open stream holds one while it
+# waits for the next chunk, so streams never starve the worker pool above
+STREAM_THREADS = int(os.getenv("ASYNC_STREAM_THREADS", "32"))
+
+stream_executor = ThreadPoolExecutor(max_workers=STREAM_THREADS, thread_name_prefix="aari-stream")
+
+# Seconds between WebSocket pings; a peer that misses a pong is disconnected
+WS_HEARTBEAT = float(os.getenv("AARI_WS_HEARTBEAT", "20"))
+
+
+async def get_assistant():
+    """Lazy load the shared assistant without blocking the event loop"""
+    if wsgi.assistant is not None:
+        return wsgi.assistant
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, wsgi.get_assistant)
+
+
+async def get_task_executor():
+    """Lazy load the shared task executor without blocking the event loop"""
+    if wsgi.task_executor is not None:
+        return wsgi.task_executor
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, wsgi.get_task_executor)
+
+
+def request_user_id(request: web.Request) -> str:
+    """User/device id from request headers, the same rule as app.current_user_id()"""
+    return (request.headers.get('X-User-Id') or request.headers.get('X-Device-Id') or '').strip()
+
+
+async def user_session(request: web.Request):
+    """Per-user session from app.py's SessionManager; command stages lock its state themselves"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, wsgi.sessions.get, request_user_id(request))
+
+
+async def iterate_in_executor(events):
+    """Advance a blocking generator on the stream pool, yielding its items on the loop; always closes it"""
+    step = None
+    try:
+        while True:
+            step = stream_executor.submit(next, events, None)
+            item = await asyncio.wrap_future(step)
+            if item is None:
+                return
+            yield item
+    finally:
+        # The client may have left mid-stream: close the generator so it records the turn,
+        # but only once any next() still running on its thread has returned
+        if step is None:
+            stream_executor.submit(events.close)
+        else:
+            step.add_done_callback(lambda _: stream_executor.submit(events.close))
+
+
+async def read_json(request: web.Request) -> dict:
+    """Parse a JSON body, treating an empty or invalid body as {}"""
+    try:
+        data = await request.json()
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def error(message: str, status: int = 500) -> web.Response:
+    return web.json_response({"status": "error", "message": message}, status=status)
+
+
+async def process_command(request: web.Request) -> web.Response:
+    """Process voice command via API"""
+    try:
+        data = await read_json(request)
+        command = data.get('command', '').lower()
+
+        if not command:
+            return error("No command provided", 400)
+
+        await get_assistant()
+        asst = await user_session(request)
+        if asst is None:
+            return error("Assistant not available")
+
+        detailed = await asst.process_command_detailed_async(command)
+
+        return web.json_response({
+            "status": "success",
+            **detailed.to_dict(),
+            "timestamp": json.dumps(datetime.now(), default=str)
+        })
+
+    except Exception as e:
+        logger.error(f"Error processing command: {e}")
+        return error(str(e))
+
+
+async def process_command_stream(request: web.Request) -> web.StreamResponse:
+    """Process voice command, streaming intent, answer chunks and the final result as SSE"""
+    data = await read_json(request)
+    command = data.get('command', '').lower()
+
+    if not command:
+        return error("No command provided", 400)
+
+    if await get_assistant() is None:
+        return error("Assistant not available")
+
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    await response.prepare(request)
+
+    # The generator blocks on Gemini between chunks, so advance it on the worker pool
+    try:
+        asst = await user_session(request)
+        async with aclosing(iterate_in_executor(asst.process_command_stream(command))) as events:
+            async for event, payload in events:
+                await response.write(wsgi.sse_event(event, payload).encode("utf-8"))
+    except Exception as e:
+        logger.error(f"Error streaming command: {e}")
+        await response.write(wsgi.sse_event("error", {"status": "error", "message": str(e)}).encode("utf-8"))
+
+    await response.write_eof()
+    return response
+
+
+class Channel:
+    """One open WebSocket; sends are serialized because commands run as concurrent tasks"""
+    
+    def __init__(self, ws: web.WebSocketResponse, user_id: str):
+        self.ws = ws
+        self.user_id = user_id
+        self._send_lock = asyncio.Lock()
+    
+    async def send(self, message: dict):
+        async with self._send_lock:
+            if not self.ws.closed:
+                await self.ws.send_json(message)
+
+
+class ChannelHub:
+    """Open channels by user id, so worker threads can push events to them"""
+    
+    def __init__(self):
+        self.loop = None
+        self._channels = {}
+    
+    def add(self, channel: Channel):
+        self._channels.setdefault(channel.user_id, set()).add(channel)
+        metrics.WS_CHANNELS.inc()
+    
+    def remove(self, channel: Channel):
+        channels = self._channels.get(channel.user_id, set())
+        channels.discard(channel)
+        if not channels:
+            self._channels.pop(channel.user_id, None)
+        metrics.WS_CHANNELS.dec()
+    
+    def publish(self, user_id: str, event: str, data: dict):
+        """Thread-safe: push {"type": "event"} to every channel of user_id (never to anonymous channels)"""
+        if self.loop is None or not user_id or user_id not in self._channels:
+            return
+        asyncio.run_coroutine_threadsafe(self._push(user_id, event, data), self.loop)
+    
+    async def _push(self, user_id: str, event: str, data: dict):
+        for channel in list(self._channels.get(user_id, ())):
+            try:
+                await channel.send({"type": "event", "event": event, "data": data})
+            except Exception as e:
+                logger.error(f"Error pushing {event} event: {e}")
+
+
+hub = ChannelHub()
+
+
+async def websocket_channel(request: web.Request) -> web.WebSocketResponse:
+    """
+    Persistent channel. Client frames: {"type": "command", "id", "command", "stream"}
+    and {"type": "ping", "id"}. Server frames: hello, meta, chunk, response, error,
+    pong and event (e.g. finished background jobs)
+    """
+    ws = web.WebSocketResponse(heartbeat=WS_HEARTBEAT)
+    await ws.prepare(request)
+    
+    channel = Channel(ws, request_user_id(request))
+    hub.add(channel)
+    tasks = set()
+    try:
+        await channel.send({"type": "hello", "heartbeat": WS_HEARTBEAT})
+        
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            try:
+                message = json.loads(msg.data)
+                kind = message.get("type")
+            except (ValueError, AttributeError):
+                await channel.send({"type": "error", "message": "Invalid JSON message"})
+                continue
+            
+            if kind == "ping":
+                await channel.send({"type": "pong", "id": message.get("id")})
+            elif kind == "command":
+                # Run commands as tasks so pings are answered while one is processing
+                task = asyncio.create_task(channel_command(request, channel, message))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            else:
+                await channel.send({"type": "error", "id": message.get("id"), "message": f"Unknown message type: {kind}"})
+    
+    finally:
+        hub.remove(channel)
+        for task in tasks:
+            task.cancel()
+    
+    return ws
+
+
+async def channel_command(request: web.Request, channel: Channel, message: dict):
+    """Process one channel command, replying with the same id"""
+    message_id = message.get("id")
+    command = str(message.get("command", "")).lower()
+    
+    try:
+        if not command:
+            await channel.send({"type": "error", "id": message_id, "message": "No command provided"})
+            return
+        
+        if await get_assistant() is None:
+            await channel.send({"type": "error", "id": message_id, "message": "Assistant not available"})
+            return
+        
+        asst = await user_session(request)
+        if message.get("stream"):
+            async with aclosing(iterate_in_executor(asst.process_command_stream(command))) as events:
+                async for event, payload in events:
+                    if event == "done":
+                        await channel.send({"type": "response", "id": message_id, "status": "success", **payload})
+                    else:
+                        await channel.send({"type": event, "id": message_id, **payload})
+        else:
+            detailed = await asst.process_command_detailed_async(command)
+            await channel.send({"type": "response", "id": message_id, "status": "success", **detailed.to_dict()})
+    
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing channel command: {e}")
+        await channel.send({"type": "error", "id": message_id, "message": str(e)})
+
+
+async def web_search(request: web.Request) -> web.Response:
+    """Perform web search"""
+    try:
+        data = await read_json(request)
+        query = data.get('query', '')
+        num_results = data.get('num_results', 5)
+
+        asst = await get_assistant()
+        if asst is None:
+            return error("Assistant not available")
+
+        results = await asst.web_search.search_async(query, num_results)
+        return web.json_response({
+            "status": "success",
+            "query": query,
+            "results": results,
+            "count": len(results)
+        })
+
+    except Exception as e:
+        logger.error(f"Error in web search: {e}")
+        return error(str(e))
+
+
+async def get_page_content(request: web.Request) -> web.Response:
+    """Get content from webpage"""
+    try:
+        data = await read_json(request)
+        url = data.get('url', '')
+
+        asst = await get_assistant()
+        if asst is None:
+            return error("Assistant not available")
+
+        content = await asst.web_search.get_page_content_async(url)
+        return web.json_response({
+            "status": "success",
+            "url": url,
+            "content": content
+        })
+
+    except Exception as e:
+        logger.error(f"Error getting page content: {e}")
+        return error(str(e))
+
+
+async def download_file(request: web.Request) -> web.Response:
+    """Download file"""
+    try:
+        data = await read_json(request)
+        file_name = data.get('file_name', '')
+        file_type = data.get('file_type', '')
+
+        task_executor = await get_task_executor()
+        if task_executor is None:
+            return error("Executor not available")
+
+        result = await task_executor.download_file_async(file_name, file_type)
+        return web.json_response(result)
+
+    except Exception as e:
+        logger.error(f"Error downloading file: {e}")
+        return error(str(e))
+
+
+async def health(request: web.Request) -> web.Response:
+    """Health check answered on the event loop; advertises the WebSocket channel to clients"""
+    return web.json_response({"status": "healthy", "channel": "/api/ws"})
+
+
+async def flask_fallback(request: web.Request) -> web.Response:
+    """Serve every other route through the Flask app on the worker pool"""
+    body = await request.read()
+    builder = EnvironBuilder(
+        path=request.path,
+        method=request.method,
+        query_string=request.query_string,
+        headers=list(request.headers.items()),
+        data=body,
+    )
+    environ = builder.get_environ()
+
+    def call_flask():
+        app_iter, status, headers = run_wsgi_app(wsgi.app, environ, buffered=True)
+        return b"".join(app_iter), status, headers
+
+    loop = asyncio.get_running_loop()
+    payload, status, headers = await loop.run_in_executor(executor, call_flask)
+
+    response = web.Response(body=payload, status=int(status.split(" ", 1)[0]))
+    for key, value in headers.items():
+        if key.lower() not in ("content-length", "transfer-encoding", "connection"):
+            response.headers.add(key, value)
+    return response
+
+
+@web.middleware
+async def request_metrics(request: web.Request, handler):
+    """In-flight gauge and latency for native routes; Flask records its own"""
+    if handler is flask_fallback or handler is websocket_channel:
+        return await handler(request)
+    
+    endpoint = getattr(handler, "__name__", "unknown")
+    status = 500
+    start = time.perf_counter()
+    metrics.IN_FLIGHT.inc(endpoint)
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    finally:
+        metrics.IN_FLIGHT.dec(endpoint)
+        metrics.REQUEST_LATENCY.observe(endpoint, status, value=time.perf_counter() - start)
+
+
+@web.middleware
+async def check_user_id(request: web.Request, handler):
+    """Refuse malformed ids, and new ids once the per-user storage cap is reached"""
+    try:
+        wsgi.sessions.check_user_id(request_user_id(request))
+    except wsgi.InvalidUserId as e:
+        return error(str(e), 400)
+    except wsgi.TooManyUsers as e:
+        return error(str(e), 503)
+    return await handler(request)
+
+
+async def start_channels(application: web.Application):
+    """Bind the hub to the running loop and push finished jobs to their owners"""
+    hub.loop = asyncio.get_running_loop()
+    wsgi.jobs.add_listener(lambda job: hub.publish(job.owner, "job", job.to_dict()))
+
+
+def create_app() -> web.Application:
+    """Build the aiohttp application"""
+    application = web.Application(middlewares=[request_metrics, check_user_id])
+    application.on_startup.append(start_channels)
+    application.router.add_get('/api/ws', websocket_channel)
+    application.router.add_post('/api/process-command', process_command)
+    application.router.add_post('/api/process-command/stream', process_command_stream)
+    application.router.add_post('/api/web-search', web_search)
+    application.router.add_post('/api/get-page-content', get_page_content)
+    application.router.add_post('/api/download-file', download_file)
+    application.router.add_get('/api/health', health)
+    application.router.add_route('*', '/{tail:.*}', flask_fallback)
+    return application
+
+
+app = create_app()
+
+
+if __name__ == '__main__':
+    port = int(os.getenv("PORT", "5000"))
+    logger.info(f"Starting async Voice Assistant API Server on http://localhost:{port}")
+    web.run_app(app, host='0.0.0.0', port=port)
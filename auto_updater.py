@@ -3,15 +3,20 @@ Automatic Update System for Voice Assistant
 Enables self-learning and feature updates without manual intervention
 """
 
+import copy
 import json
 import os
 import subprocess
 import logging
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional
 import requests
 import hashlib
 
+from metrics import CACHE_LOOKUPS, record_json_write
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,6 +28,10 @@ class AutoUpdater:
         self.features_file = "features.json"
         self.learning_file = "learning_database.json"
         self.config_file = "auto_update_config.json"
+        self._config_cache = None  # (file stamp, config) from the last read
+        # One updater per process, shared by every session: checks and installs
+        # read-modify-write the config and log files, so they run one at a time
+        self._lock = threading.RLock()
         
         self._init_update_system()
     
@@ -51,36 +60,37 @@ class AutoUpdater:
     
     def check_for_updates(self) -> Dict[str, Any]:
         """Check if updates are available"""
-        try:
-            config = self._load_config()
+        with self._lock:
+            try:
+                config = self._load_config()
             
-            # Check if enough time has passed since last update check
-            last_check = config.get("last_update_check")
-            if last_check:
-                last_check_time = datetime.fromisoformat(last_check)
-                hours_since = (datetime.now() - last_check_time).total_seconds() / 3600
+                # Check if enough time has passed since last update check
+                last_check = config.get("last_update_check")
+                if last_check:
+                    last_check_time = datetime.fromisoformat(last_check)
+                    hours_since = (datetime.now() - last_check_time).total_seconds() / 3600
                 
-                if hours_since < config.get("update_frequency_hours", 24):
-                    return {"status": "no_update_needed", "reason": "Too soon to check"}
-            
-            # Check for available updates
-            available_updates = self._fetch_available_updates()
-            
-            config["last_update_check"] = datetime.now().isoformat()
-            self._save_config(config)
-            
-            if available_updates:
-                return {
-                    "status": "updates_available",
-                    "updates": available_updates,
-                    "count": len(available_updates)
-                }
-            else:
-                return {"status": "up_to_date"}
+                    if hours_since < config.get("update_frequency_hours", 24):
+                        return {"status": "no_update_needed", "reason": "Too soon to check"}
+            
+                # Check for available updates
+                available_updates = self._fetch_available_updates()
+            
+                config["last_update_check"] = datetime.now().isoformat()
+                self._save_config(config)
+            
+                if available_updates:
+                    return {
+                        "status": "updates_available",
+                        "updates": available_updates,
+                        "count": len(available_updates)
+                    }
+                else:
+                    return {"status": "up_to_date"}
         
-        except Exception as e:
-            logger.error(f"Update check error: {e}")
-            return {"status": "error", "message": str(e)}
+            except Exception as e:
+                logger.error(f"Update check error: {e}")
+                return {"status": "error", "message": str(e)}
     
     def _fetch_available_updates(self) -> List[Dict]:
         """Fetch available updates from remote source"""
@@ -136,63 +146,66 @@ class AutoUpdater:
             logger.error(f"Error fetching updates: {e}")
             return []
     
-    def auto_install_updates(self, feature_names: List[str] = None) -> Dict[str, Any]:
-        """Automatically install updates"""
-        try:
-            config = self._load_config()
-            
-            # If no features specified, install all high-priority updates
-            if not feature_names:
-                available = self._fetch_available_updates()
-                feature_names = [u["name"] for u in available if u.get("priority") == "high"]
-            
-            if not feature_names:
-                return {"status": "no_updates_to_install"}
-            
-            # Backup before updating
-            if config.get("backup_before_update"):
-                self._backup_system()
-            
-            installed_features = []
-            failed_features = []
-            
-            for feature_name in feature_names:
-                try:
-                    result = self._install_feature(feature_name)
-                    if result["status"] == "success":
-                        installed_features.append(feature_name)
-                        config["installed_features"].append(feature_name)
-                    else:
-                        failed_features.append({"name": feature_name, "error": result.get("error")})
-                except Exception as e:
-                    failed_features.append({"name": feature_name, "error": str(e)})
-                    logger.error(f"Failed to install {feature_name}: {e}")
-            
-            # Update last feature update time
-            config["last_feature_update"] = datetime.now().isoformat()
-            
-            # Add to history
-            update_record = {
-                "timestamp": datetime.now().isoformat(),
-                "installed": installed_features,
-                "failed": failed_features,
-                "total": len(feature_names)
-            }
-            config["update_history"].append(update_record)
+    def auto_install_updates(self, feature_names: List[str] = None, progress: Optional[Callable] = None) -> Dict[str, Any]:
+        """Automatically install updates; progress(fraction, message) after each feature"""
+        with self._lock:
+            try:
+                config = self._load_config()
+            
+                # If no features specified, install all high-priority updates
+                if not feature_names:
+                    available = self._fetch_available_updates()
+                    feature_names = [u["name"] for u in available if u.get("priority") == "high"]
+            
+                if not feature_names:
+                    return {"status": "no_updates_to_install"}
+            
+                # Backup before updating
+                if config.get("backup_before_update"):
+                    self._backup_system()
+            
+                installed_features = []
+                failed_features = []
+            
+                for index, feature_name in enumerate(feature_names):
+                    if progress:
+                        progress(index / len(feature_names), f"Installing {feature_name}")
+                    try:
+                        result = self._install_feature(feature_name)
+                        if result["status"] == "success":
+                            installed_features.append(feature_name)
+                            config["installed_features"].append(feature_name)
+                        else:
+                            failed_features.append({"name": feature_name, "error": result.get("error")})
+                    except Exception as e:
+                        failed_features.append({"name": feature_name, "error": str(e)})
+                        logger.error(f"Failed to install {feature_name}: {e}")
+            
+                # Update last feature update time
+                config["last_feature_update"] = datetime.now().isoformat()
+            
+                # Add to history
+                update_record = {
+                    "timestamp": datetime.now().isoformat(),
+                    "installed": installed_features,
+                    "failed": failed_features,
+                    "total": len(feature_names)
+                }
+                config["update_history"].append(update_record)
             
-            self._save_config(config)
-            self._log_update(update_record)
+                self._save_config(config)
+                self._log_update(update_record)
             
-            return {
-                "status": "update_complete",
-                "installed": installed_features,
-                "failed": failed_features,
-                "total_installed": len(installed_features)
-            }
+                return {
+                    "status": "update_complete",
+                    "installed": installed_features,
+                    "failed": failed_features,
+                    "total_installed": len(installed_features)
+                }
         
-        except Exception as e:
-            logger.error(f"Auto-install error: {e}")
-            return {"status": "error", "message": str(e)}
+            except Exception as e:
+                logger.error(f"Auto-install error: {e}")
+                return {"status": "error", "message": str(e)}
     
     def _install_feature(self, feature_name: str) -> Dict[str, Any]:
         """Install a specific feature"""
@@ -759,12 +772,28 @@ class VideoStreaming:
             logger.warning(f"Backup failed: {e}")
             return {"status": "error"}
     
+    def config_version(self) -> str:
+        """Cheap change marker for the config file (stat only, no read)"""
+        try:
+            stat = os.stat(self.config_file)
+            return f"{stat.st_mtime_ns}-{stat.st_size}"
+        except OSError:
+            return "missing"
+    
     def _load_config(self) -> Dict:
         """Load update config"""
         try:
             if os.path.exists(self.config_file):
+                # Callers mutate the returned dict, so hand out copies of the cache
+                stamp = self.config_version()
+                if self._config_cache and self._config_cache[0] == stamp:
+                    CACHE_LOOKUPS.inc("update_config", "hit")
+                    return copy.deepcopy(self._config_cache[1])
+                CACHE_LOOKUPS.inc("update_config", "miss")
                 with open(self.config_file, 'r') as f:
-                    return json.load(f)
+                    config = json.load(f)
+                self._config_cache = (stamp, config)
+                return copy.deepcopy(config)
         except:
             pass
         return {}
@@ -774,6 +803,8 @@ class VideoStreaming:
         try:
             with open(self.config_file, 'w') as f:
                 json.dump(config, f, indent=2)
+                record_json_write(self.config_file, f.tell())
+            self._config_cache = None
         except Exception as e:
             logger.error(f"Config save error: {e}")
     
@@ -792,6 +823,7 @@ class VideoStreaming:
         try:
             with open(self.update_log_file, 'w') as f:
                 json.dump(log, f, indent=2)
+                record_json_write(self.update_log_file, f.tell())
         except Exception as e:
             logger.error(f"Log save error: {e}")
     
@@ -808,9 +840,29 @@ class VideoStreaming:
 class SelfLearningSystem:
     """Self-learning system that improves without manual intervention"""
     
-    def __init__(self):
-        self.learning_file = "self_learning.json"
+    def __init__(self, learning_file: str = "self_learning.json"):
+        self.learning_file = learning_file
         self.pattern_db = self._load_patterns()
+        self.version = 0  # Bumped on every change; used for ETags
+        self._status_cache = None
+        self._defer_saves = False
+        self._pending_save = False
+    
+    @contextmanager
+    def deferred_saves(self):
+        """Collapse every pattern save inside the block into a single write at the end"""
+        if self._defer_saves:
+            yield
+            return
+        
+        self._defer_saves = True
+        try:
+            yield
+        finally:
+            self._defer_saves = False
+            if self._pending_save:
+                self._pending_save = False
+                self._write_patterns()
     
     def learn_from_interaction(self, command: str, response: str, success: bool):
         """Learn from each interaction"""
@@ -875,10 +927,36 @@ class SelfLearningSystem:
             pass
         return {"patterns": []}
     
+    def get_status(self) -> Dict[str, Any]:
+        """Interaction counts, recomputed only when patterns have changed"""
+        if self._status_cache is None or self._status_cache[0] != self.version:
+            CACHE_LOOKUPS.inc("learning_status", "miss")
+            patterns = self.pattern_db.get("patterns", [])
+            successful = sum(1 for p in patterns if p.get("success"))
+            self._status_cache = (self.version, {
+                "total_interactions": len(patterns),
+                "successful_interactions": successful,
+                "success_rate": successful / len(patterns) if patterns else 0,
+            })
+        else:
+            CACHE_LOOKUPS.inc("learning_status", "hit")
+        return self._status_cache[1]
+    
     def _save_patterns(self):
         """Save learned patterns"""
+        self.version += 1
+        
+        if self._defer_saves:
+            self._pending_save = True
+            return
+        
+        self._write_patterns()
+    
+    def _write_patterns(self):
+        """Write learned patterns to disk"""
         try:
             with open(self.learning_file, 'w') as f:
                 json.dump(self.pattern_db, f, indent=2)
+                record_json_write(self.learning_file, f.tell())
         except Exception as e:
             logger.error(f"Pattern save error: {e}")
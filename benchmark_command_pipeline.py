@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark the /api/process-command route, old handler against the current one
+Both handlers run in the real Flask app through its test client, with a
+zero-latency Gemini stub, a local fake search server and no-op side effects.
+The baseline is the pre-single-pass handler body (process_command() followed
+by a second extract_intent() and contact lookup), mounted on a benchmark-only
+URL; the current handler is /api/process-command itself
+
+    python benchmark_command_pipeline.py --rounds 50 [--no-intent-cache]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from flask import jsonify, request
+
+from loadtest_commands import prepare_app
+from loadtest_fakes import FakeSearchServer, no_op_side_effects
+from result_cache import LRUCache
+
+COMMANDS = [
+    "send message to john saying hello friend",
+    "whatsapp mom that i love her so much",
+    "text my brother to come home",
+    "call mom",
+    "set alarm for tomorrow morning at 6 am",
+    "remind me to buy milk in 10 minutes",
+    "what is the weather today",
+    "play my favorite song",
+    "open chrome",
+    "download the latest report pdf",
+    "remember this important information",
+    "hello aari",
+]
+
+BASELINE_URL = "/api/process-command/benchmark-baseline"
+CURRENT_URL = "/api/process-command"
+HEADERS = {"X-User-Id": "benchmark-user"}
+
+
+def install_baseline_route(app_module):
+    """Mount the handler as it was before process_command_detailed(): extraction runs twice"""
+
+    def baseline_process_command():
+        data = request.get_json()
+        command = data.get('command', '').lower()
+        asst = app_module.sessions.get(app_module.current_user_id())
+
+        response = asst.process_command(command)
+        intent, entities, confidence = asst.nlp_processor.extract_intent(command)
+
+        result = {
+            "status": "success",
+            "response": response,
+            "intent": intent,
+            "confidence": confidence,
+            "timestamp": json.dumps(datetime.now(), default=str)
+        }
+        if entities:
+            if entities.get("contact"):
+                result["contact"] = entities.get("contact")
+                contact_number = asst._get_contact_number(entities.get("contact"))
+                if contact_number:
+                    result["contact_number"] = contact_number
+            if entities.get("message"):
+                result["message"] = entities.get("message")
+        return jsonify(result)
+
+    app_module.app.add_url_rule(BASELINE_URL, "benchmark_baseline_process_command",
+                                baseline_process_command, methods=["POST"])
+
+
+def run_round(client, url: str):
+    """CPU and wall seconds for one pass over COMMANDS"""
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for command in COMMANDS:
+        response = client.post(url, json={"command": command}, headers=HEADERS)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} answered {response.status_code} for {command!r}")
+    return time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+
+def measure(client, rounds: int):
+    """Per-request (CPU, wall) seconds for each route
+
+    Rounds alternate between the routes (and which goes first), since the session's
+    history and memory files grow as the benchmark runs
+    """
+    totals = {BASELINE_URL: [0.0, 0.0], CURRENT_URL: [0.0, 0.0]}
+    for i in range(rounds):
+        order = (BASELINE_URL, CURRENT_URL) if i % 2 == 0 else (CURRENT_URL, BASELINE_URL)
+        for url in order:
+            cpu, wall = run_round(client, url)
+            totals[url][0] += cpu
+            totals[url][1] += wall
+    count = rounds * len(COMMANDS)
+    return {url: (cpu / count, wall / count) for url, (cpu, wall) in totals.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--no-intent-cache", action="store_true",
+                        help="time every extraction pass instead of letting repeats hit the intent cache")
+    args = parser.parse_args()
+
+    # Everything prepare_app reads; no latency, errors or vague answers
+    fake_args = SimpleNamespace(gemini_latency="", gemini_error_rate=0.0, gemini_vague_rate=0.0,
+                                seed=1, no_admission=True)
+
+    search_server = FakeSearchServer().start()
+    with tempfile.TemporaryDirectory(prefix="aari-benchmark-") as data_dir, \
+            no_op_side_effects() as recorder, search_server.installed():
+        app_module = prepare_app(fake_args, recorder, data_dir)
+        if args.no_intent_cache:
+            app_module.get_assistant().nlp_processor.intent_cache = LRUCache("intent", 0)
+        install_baseline_route(app_module)
+        client = app_module.app.test_client()
+
+        try:
+            # Warm up both routes (session creation, regex caches, models) before timing
+            measure(client, 2)
+            results = measure(client, args.rounds)
+        finally:
+            search_server.stop()
+
+    baseline_cpu, baseline_wall = results[BASELINE_URL]
+    current_cpu, current_wall = results[CURRENT_URL]
+    print("\n" + "="*70)
+    print("PROCESS-COMMAND ROUTE BENCHMARK")
+    print("="*70)
+    print(f"Commands: {len(COMMANDS)} x {args.rounds} rounds, intent cache "
+          f"{'off' if args.no_intent_cache else 'on'}")
+    print(f"Baseline (extract twice): {baseline_cpu * 1e6:10.1f} us CPU {baseline_wall * 1e6:10.1f} us wall/request")
+    print(f"Current (single pass):    {current_cpu * 1e6:10.1f} us CPU {current_wall * 1e6:10.1f} us wall/request")
+    if current_cpu > 0:
+        print(f"CPU speedup:              {baseline_cpu / current_cpu:10.2f}x")
+    print("="*70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
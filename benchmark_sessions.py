@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for per-user sessions
+Measures command throughput as the thread count grows with every thread on
+one session (one state_lock) versus one session per thread, and session
+lookup throughput with one table lock (stripes=1) versus lock striping
+(stripes=64). Commands hold the stripe lock only for the lookup, so striping
+shows up in the lookup column, not the command one
+"""
+
+import sys
+import tempfile
+import threading
+import time
+
+from voice_assistant import VoiceAssistant
+from session_manager import SessionManager
+
+COMMANDS = [
+    "hello aari",
+    "remember this my locker code is 42",
+    "recall locker",
+    "text my brother to come home",
+]
+
+
+def run(shared: VoiceAssistant, threads: int, per_thread: int, one_session: bool) -> float:
+    """Return commands/second with `threads` users, each on their own session unless one_session"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        sessions = SessionManager(lambda: shared, data_dir=data_dir)
+        barrier = threading.Barrier(threads + 1)
+
+        def worker(user_id: str):
+            barrier.wait()
+            for i in range(per_thread):
+                sessions.get(user_id).process_command(COMMANDS[i % len(COMMANDS)])
+
+        user_ids = ["user-shared" if one_session else f"user-{n}" for n in range(threads)]
+        return threads * per_thread / _timed(barrier, worker, user_ids)
+
+
+def lookups(shared: VoiceAssistant, stripes: int, threads: int, per_thread: int) -> float:
+    """Return sessions.get() calls/second with `threads` threads cycling over 64 existing users"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        sessions = SessionManager(lambda: shared, stripes=stripes, data_dir=data_dir)
+        users = [f"user-{n}" for n in range(64)]
+        for user_id in users:
+            sessions.get(user_id)
+        barrier = threading.Barrier(threads + 1)
+
+        def worker(offset: int):
+            barrier.wait()
+            for i in range(per_thread):
+                sessions.get(users[(offset + i) % len(users)])
+
+        return threads * per_thread / _timed(barrier, worker, range(threads))
+
+
+def _timed(barrier: threading.Barrier, worker, args) -> float:
+    """Seconds for worker(arg) on one thread per arg, all released together"""
+    workers = [threading.Thread(target=worker, args=(arg,)) for arg in args]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for w in workers:
+        w.join()
+    return time.perf_counter() - start
+
+
+def main():
+    per_thread = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    shared = VoiceAssistant()
+
+    # Warm up lazy corpora and regex caches before timing
+    run(shared, 1, len(COMMANDS), one_session=False)
+
+    print("\n" + "="*70)
+    print("SESSION CONCURRENCY BENCHMARK")
+    print("="*70)
+    print(f"{'threads':>7} {'one session cmd/s':>18} {'per-user cmd/s':>15} "
+          f"{'1 stripe get/s':>15} {'64 stripes get/s':>17}")
+    for threads in (1, 2, 4, 8, 16):
+        one = run(shared, threads, per_thread, one_session=True)
+        per_user = run(shared, threads, per_thread, one_session=False)
+        single = lookups(shared, 1, threads, per_thread * 100)
+        striped = lookups(shared, 64, threads, per_thread * 100)
+        print(f"{threads:>7} {one:>18.1f} {per_user:>15.1f} {single:>15.0f} {striped:>17.0f}")
+    print("="*70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
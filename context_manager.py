@@ -8,6 +8,8 @@ from typing import Dict, Any, List
 from datetime import datetime
 import logging
 
+from metrics import record_json_write
+
 logger = logging.getLogger(__name__)
 
 
@@ -52,6 +54,7 @@ class ContextManager:
         try:
             with open(self.context_file, 'w') as f:
                 json.dump(self.context, f, indent=2)
+                record_json_write(self.context_file, f.tell())
             logger.info("Context saved")
         except Exception as e:
             logger.error(f"Error saving context: {e}")
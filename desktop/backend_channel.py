@@ -0,0 +1,186 @@
+"""
+Backend Channel - Persistent WebSocket connection to the AARI backend
+Keeps one connection open on a background event loop, sends commands
+over it, and reports liveness from the heartbeat instead of failed requests.
+Servers whose /api/health does not advertise the channel (the Flask app)
+are left alone, and callers keep using HTTP
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Optional
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelUnavailable(Exception):
+    """Raised when a command could not be sent; callers can safely fall back to HTTP"""
+
+
+class BackendChannel:
+    """WebSocket channel with automatic reconnect, request ids and pushed events"""
+
+    def __init__(self, api_url: str, on_status: Callable = None, on_event: Callable = None,
+                 heartbeat: float = 20, user_id: str = ""):
+        """
+        Args:
+            api_url: HTTP(S) base URL of the backend; the channel uses /api/ws on it
+            on_status: Called with True/False when the connection comes up or drops
+            on_event: Called with (event, data) for server-pushed events
+            user_id: Device/user id, so commands reach this client's session
+        """
+        base = api_url.rstrip("/")
+        self.url = "ws" + base[len("http"):] + "/api/ws" if base.startswith("http") else base + "/api/ws"
+        self.health_url = base + "/api/health"
+        self.on_status = on_status
+        self.on_event = on_event
+        self.heartbeat = heartbeat
+        self.headers = {"X-User-Id": user_id} if user_id else {}
+
+        self.connected = False
+        self.running = False
+        self.supported = True  # False once the server said it has no channel
+        self._ids = itertools.count(1)
+        self._pending: Dict[str, Dict] = {}
+        self._ws = None
+        self._loop = None
+        self._thread = None
+
+    @property
+    def available(self) -> bool:
+        return aiohttp is not None and self.supported
+
+    def start(self):
+        """Connect in the background and keep reconnecting until stop()"""
+        if self.running or not self.available:
+            return
+        self.running = True
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._connect_loop(), self._loop)
+
+    def stop(self):
+        """Close the channel and its event loop"""
+        self.running = False
+        if self._loop is not None:
+            if self._ws is not None:
+                asyncio.run_coroutine_threadsafe(self._ws.close(), self._loop)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def send_command(self, command: str, on_chunk: Callable = None, timeout: float = 30) -> Dict:
+        """
+        Send a command and block until its response (call from a worker thread).
+        With on_chunk, the answer is streamed and on_chunk(text) runs per chunk.
+        Raises ChannelUnavailable if nothing was sent, ConnectionError if the
+        connection dropped after sending, TimeoutError if no response came.
+        """
+        if not self.connected:
+            raise ChannelUnavailable("Channel not connected")
+
+        message_id = str(next(self._ids))
+        result = Future()
+        self._pending[message_id] = {"future": result, "on_chunk": on_chunk}
+        message = {"type": "command", "id": message_id, "command": command, "stream": on_chunk is not None}
+
+        try:
+            try:
+                asyncio.run_coroutine_threadsafe(self._ws.send_json(message), self._loop).result(timeout=5)
+            except Exception as e:
+                raise ChannelUnavailable(str(e))
+            try:
+                return result.result(timeout=timeout)
+            except FutureTimeout:
+                raise TimeoutError(f"No response within {timeout}s")
+        finally:
+            self._pending.pop(message_id, None)
+
+    async def _connect_loop(self):
+        """Stay connected, backing off between failed attempts"""
+        delay = 1
+        async with aiohttp.ClientSession(headers=self.headers) as session:
+            while self.running:
+                supported = await self._server_has_channel(session)
+                if supported is False:
+                    logger.info("Backend has no WebSocket channel; commands go over HTTP")
+                    self.supported = False
+                    self.running = False
+                    self._loop.call_soon(self._loop.stop)
+                    return
+                if supported is None:
+                    # Server unreachable; ask again after the backoff
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 30)
+                    continue
+
+                try:
+                    async with session.ws_connect(self.url, heartbeat=self.heartbeat) as ws:
+                        self._ws = ws
+                        delay = 1
+                        self._set_connected(True)
+                        await self._receive(ws)
+                except Exception as e:
+                    logger.warning(f"Backend channel unavailable: {e}")
+                finally:
+                    self._ws = None
+                    self._set_connected(False)
+
+                if self.running:
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 30)
+
+    async def _server_has_channel(self, session) -> Optional[bool]:
+        """Whether /api/health advertises the channel; None if the server could not be reached"""
+        try:
+            async with session.get(self.health_url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                if response.status != 200:
+                    return None
+                health = await response.json(content_type=None)
+        except Exception as e:
+            logger.warning(f"Backend health check failed: {e}")
+            return None
+        return isinstance(health, dict) and bool(health.get("channel"))
+
+    async def _receive(self, ws):
+        """Route incoming frames to waiting commands and event handlers"""
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                continue
+            try:
+                message = json.loads(msg.data)
+            except ValueError:
+                continue
+
+            kind = message.get("type")
+            pending = self._pending.get(str(message.get("id")))
+
+            if kind == "event":
+                if self.on_event:
+                    self.on_event(message.get("event"), message.get("data"))
+            elif kind == "chunk" and pending and pending["on_chunk"]:
+                pending["on_chunk"](message.get("text", ""))
+            elif kind in ("response", "error") and pending and not pending["future"].done():
+                pending["future"].set_result(message)
+
+    def _set_connected(self, connected: bool):
+        if connected == self.connected:
+            return
+        self.connected = connected
+
+        # Fail commands still waiting on a dropped connection
+        if not connected:
+            for pending in list(self._pending.values()):
+                if not pending["future"].done():
+                    pending["future"].set_exception(ConnectionError("Connection lost"))
+
+        if self.on_status:
+            self.on_status(connected)
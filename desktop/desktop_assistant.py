@@ -8,6 +8,7 @@ WITH Auto-Update, Web Search, and Self-Learning
 import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
+import time
 import requests
 import json
 import logging
@@ -22,6 +23,9 @@ import numpy as np
 import platform
 import subprocess
 import webbrowser
+import uuid
+
+from backend_channel import BackendChannel, ChannelUnavailable
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -38,6 +42,47 @@ API_URL = os.getenv('BACKEND_URL', 'https://aari-backend-3rs9.onrender.com')
 if os.getenv('LOCAL_BACKEND'):
     API_URL = "http://localhost:5000"
 
+DEVICE_ID_FILE = os.path.join(os.path.expanduser("~"), ".aari_device_id")
+
+def device_id():
+    """Stable id for this install, so the backend keeps its history and memory apart from other clients"""
+    try:
+        with open(DEVICE_ID_FILE) as f:
+            saved = f.read().strip()
+        if saved:
+            return saved
+    except OSError:
+        pass
+    new_id = str(uuid.uuid4())
+    try:
+        with open(DEVICE_ID_FILE, "w") as f:
+            f.write(new_id)
+    except OSError as e:
+        logger.warning(f"Could not save device id: {e}")
+    return new_id
+
+DEVICE_ID = device_id()
+
+# Every HTTP call identifies the device, so it reaches this user's session
+http = requests.Session()
+http.headers["X-Device-Id"] = DEVICE_ID
+
+def wait_for_job(response, timeout=120, interval=1.0):
+    """Follow a 202 job response to its result; other responses pass through as (status, data)"""
+    data = response.json()
+    if response.status_code != 202 or "job_id" not in data:
+        return response.status_code, data
+    
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        time.sleep(interval)
+        job = http.get(f"{API_URL}/api/jobs/{data['job_id']}", timeout=10).json()
+        if job.get("state") == "succeeded":
+            return 200, job.get("result") or {}
+        if job.get("state") == "failed":
+            return 500, {"status": "error", "message": job.get("error")}
+    return 504, {"status": "error", "message": "Timed out waiting for job"}
+
 class DesktopVoiceAssistant:
     """Desktop GUI for voice assistant with natural female voice"""
     
@@ -60,13 +105,18 @@ class DesktopVoiceAssistant:
         self.setup_ui()
         self.root.bind('<Control-Shift-v>', self.toggle_continuous_listening)
         
+        # Persistent WebSocket when the backend offers one (app_async); HTTP otherwise and while it is down
+        self.channel = BackendChannel(API_URL, on_status=self._on_channel_status,
+                                      on_event=self._on_channel_event, user_id=DEVICE_ID)
+        self.channel.start()
+        
         # Check backend on startup (after UI is set up)
         self.root.after(500, self.check_backend_status)
     
     def check_backend_status(self):
         """Check if backend is running"""
         try:
-            response = requests.get(f"{API_URL}/api/health", timeout=2)
+            response = http.get(f"{API_URL}/api/health", timeout=2)
             if response.status_code == 200:
                 self.backend_running = True
                 self.status_var.set("Ready")
@@ -83,6 +133,26 @@ class DesktopVoiceAssistant:
             self.status_label.config(foreground="red")
             self.log_message("❌ Cannot connect to backend", "error")
     
+    def _on_channel_status(self, connected):
+        """Heartbeat-driven liveness from the backend channel (called off the UI thread)"""
+        def update():
+            self.backend_running = connected
+            if connected:
+                self.status_var.set("Ready")
+                self.status_label.config(foreground="green")
+            else:
+                self.status_var.set("Backend not running")
+                self.status_label.config(foreground="red")
+        self.root.after(0, update)
+    
+    def _on_channel_event(self, event, data):
+        """Server-pushed events, e.g. background jobs finishing"""
+        if event == "job" and data:
+            if data.get("state") == "succeeded":
+                self.root.after(0, self.log_message, f"✅ {data.get('kind', 'Job')} finished", "system")
+            else:
+                self.root.after(0, self.log_message, f"❌ {data.get('kind', 'Job')} failed: {data.get('error')}", "error")
+    
     def setup_ui(self):
         """Setup user interface"""
         
@@ -374,10 +444,25 @@ class DesktopVoiceAssistant:
         """Send command to backend and get response with voice"""
         self.log_message(f"👤 You: {command}", "user")
         
+        # Persistent channel: one message each way, no per-command connection or health check
+        if self.channel.connected:
+            try:
+                data = self.channel.send_command(command, timeout=30)
+                if data.get("type") == "error":
+                    self.log_message(f"❌ Error: {data.get('message')}", "error")
+                else:
+                    self._handle_command_response(data)
+                return
+            except ChannelUnavailable:
+                pass  # Nothing was sent, so falling back to HTTP cannot run it twice
+            except Exception as e:
+                self.log_message(f"❌ Error: {str(e)}", "error")
+                return
+        
         # Check if backend is running
         if not self.backend_running:
             try:
-                response = requests.get(f"{API_URL}/api/health", timeout=2)
+                response = http.get(f"{API_URL}/api/health", timeout=2)
                 if response.status_code == 200:
                     self.backend_running = True
                 else:
@@ -388,30 +473,14 @@ class DesktopVoiceAssistant:
                 return
         
         try:
-            response = requests.post(
+            response = http.post(
                 f"{API_URL}/api/process-command",
                 json={"command": command},
                 timeout=10
             )
             
             if response.status_code == 200:
-                data = response.json()
-                assistant_response = data.get("response", "No response")
-                intent = data.get("intent", "")
-                contact = data.get("contact", "")
-                contact_number = data.get("contact_number", "")
-                message = data.get("message", "")
-                
-                self.log_message(f"🎙️ AARI: {assistant_response}", "assistant")
-                
-                # Handle special intents for WhatsApp and calling
-                if intent == "send_message" and contact and contact_number:
-                    self._handle_whatsapp_desktop(contact, message, contact_number)
-                elif intent == "make_call" and contact and contact_number:
-                    self._handle_call_desktop(contact, contact_number)
-                
-                # Play voice response
-                self._speak_response(assistant_response)
+                self._handle_command_response(response.json())
             else:
                 self.log_message("❌ API Error", "error")
         
@@ -421,6 +490,25 @@ class DesktopVoiceAssistant:
         except Exception as e:
             self.log_message(f"❌ Error: {str(e)}", "error")
     
+    def _handle_command_response(self, data):
+        """Show, act on and speak a processed command result"""
+        assistant_response = data.get("response", "No response")
+        intent = data.get("intent", "")
+        contact = data.get("contact", "")
+        contact_number = data.get("contact_number", "")
+        message = data.get("message", "")
+        
+        self.log_message(f"🎙️ AARI: {assistant_response}", "assistant")
+        
+        # Handle special intents for WhatsApp and calling
+        if intent == "send_message" and contact and contact_number:
+            self._handle_whatsapp_desktop(contact, message, contact_number)
+        elif intent == "make_call" and contact and contact_number:
+            self._handle_call_desktop(contact, contact_number)
+        
+        # Play voice response
+        self._speak_response(assistant_response)
+    
     def _handle_whatsapp_desktop(self, contact: str, message: str, contact_number: str):
         """Handle WhatsApp messaging on desktop"""
         try:
@@ -611,7 +699,7 @@ class DesktopVoiceAssistant:
     def check_updates(self):
         """Check for available updates"""
         try:
-            response = requests.get(f"{API_URL}/api/check-updates", timeout=5)
+            response = http.get(f"{API_URL}/api/check-updates", timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 if data.get("status") == "updates_available":
@@ -636,10 +724,10 @@ class DesktopVoiceAssistant:
                               "This will install new features. Continue?"):
             self.log_message("⏳ Installing updates... Please wait...\n")
             try:
-                response = requests.post(f"{API_URL}/api/install-updates", 
-                                       json={}, timeout=120)
-                if response.status_code == 200:
-                    data = response.json()
+                response = http.post(f"{API_URL}/api/install-updates", 
+                                       json={}, timeout=30)
+                status_code, data = wait_for_job(response, timeout=120)
+                if status_code == 200:
                     if data.get("status") == "update_complete":
                         installed = data.get("installed", [])
                         self.log_message(f"✅ Successfully installed {len(installed)} features!")
@@ -657,7 +745,7 @@ class DesktopVoiceAssistant:
     def show_learning_status(self):
         """Show self-learning status"""
         try:
-            response = requests.get(f"{API_URL}/api/learning-status", timeout=5)
+            response = http.get(f"{API_URL}/api/learning-status", timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 total = data.get("total_interactions", 0)
@@ -709,11 +797,11 @@ I'm getting smarter with each conversation! 🧠
                 search_window.update()
                 
                 try:
-                    response = requests.post(f"{API_URL}/api/web-search",
+                    response = http.post(f"{API_URL}/api/web-search",
                                            json={"query": query, "num_results": 5},
                                            timeout=30)
-                    if response.status_code == 200:
-                        data = response.json()
+                    status_code, data = wait_for_job(response, timeout=60)
+                    if status_code == 200:
                         results = data.get("results", [])
                         
                         result_text.delete('1.0', tk.END)
@@ -738,6 +826,7 @@ I'm getting smarter with each conversation! 🧠
     def on_closing(self):
         """Handle window closing"""
         self.running = False
+        self.channel.stop()
         self.root.destroy()
 
 
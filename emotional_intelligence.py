@@ -7,23 +7,39 @@ import logging
 from typing import Dict, Tuple
 from textblob import TextBlob
 
+from keyword_matcher import MATCHER
+from model_registry import MODELS
+
 logger = logging.getLogger(__name__)
 
+# Checked in order; the first emotion with a keyword present wins
+EMOTION_KEYWORDS = {
+    "happy": ["happy", "great", "amazing", "wonderful", "excellent", "fantastic", "love", "brilliant"],
+    "sad": ["sad", "depressed", "unhappy", "miserable", "sorry", "upset", "down", "terrible"],
+    "angry": ["angry", "furious", "mad", "annoyed", "irritated", "frustrated", "hate"],
+    "anxious": ["anxious", "nervous", "worried", "stressed", "scared", "afraid", "nervous"],
+    "tired": ["tired", "exhausted", "sleepy", "worn out", "fatigued", "drained"],
+    "confused": ["confused", "lost", "don't understand", "unclear", "what", "how", "why"],
+    "grateful": ["thank", "thanks", "thank you", "grateful", "appreciate", "appreciate it"],
+    "lonely": ["alone", "lonely", "miss", "isolated", "nobody", "no one"],
+}
+MATCHER.register("emotion", EMOTION_KEYWORDS)
+
+
+def _load_sentiment_lexicon():
+    # TextBlob's default analyzer is already shared; this loads its lexicon once, up front and timed
+    TextBlob("warm up").sentiment
+    return TextBlob.analyzer
+
+
+MODELS.register("textblob", _load_sentiment_lexicon)
+
 
 class EmotionalIntelligence:
     """Emotional understanding and empathetic responses"""
     
     def __init__(self):
-        self.emotion_keywords = {
-            "happy": ["happy", "great", "amazing", "wonderful", "excellent", "fantastic", "love", "brilliant"],
-            "sad": ["sad", "depressed", "unhappy", "miserable", "sorry", "upset", "down", "terrible"],
-            "angry": ["angry", "furious", "mad", "annoyed", "irritated", "frustrated", "hate"],
-            "anxious": ["anxious", "nervous", "worried", "stressed", "scared", "afraid", "nervous"],
-            "tired": ["tired", "exhausted", "sleepy", "worn out", "fatigued", "drained"],
-            "confused": ["confused", "lost", "don't understand", "unclear", "what", "how", "why"],
-            "grateful": ["thank", "thanks", "thank you", "grateful", "appreciate", "appreciate it"],
-            "lonely": ["alone", "lonely", "miss", "isolated", "nobody", "no one"],
-        }
+        self.emotion_keywords = EMOTION_KEYWORDS
         
         self.empathetic_responses = {
             "happy": [
@@ -72,15 +88,14 @@ class EmotionalIntelligence:
         """Detect emotion from text using keyword matching and sentiment analysis"""
         text_lower = text.lower()
         
-        # Check keywords first
-        for emotion, keywords in self.emotion_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    # Use sentiment polarity as confidence
-                    blob = TextBlob(text)
-                    polarity = blob.sentiment.polarity  # -1 to 1
-                    confidence = abs(polarity) if emotion in ["happy", "sad", "angry"] else 0.7
-                    return emotion, min(confidence, 1.0)
+        # Check keywords first (shares the intent classifier's scan of the same command)
+        emotion = MATCHER.scan(text_lower).first_label("emotion")
+        if emotion:
+            # Use sentiment polarity as confidence
+            blob = TextBlob(text)
+            polarity = blob.sentiment.polarity  # -1 to 1
+            confidence = abs(polarity) if emotion in ["happy", "sad", "angry"] else 0.7
+            return emotion, min(confidence, 1.0)
         
         # Fallback to sentiment analysis
         blob = TextBlob(text)
@@ -0,0 +1,333 @@
+"""
+Gemini Client - Deadlines, hedging and circuit breaking around generate_content
+Every call gets a deadline; a call still running after the recent p95 latency
+(or one that fails fast) gets one hedged duplicate and the first answer wins.
+Consecutive failures open a circuit breaker, so callers go straight to their
+fallback until a probe call succeeds again
+"""
+
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from metrics import GEMINI_CALLS, GEMINI_CIRCUIT_STATE, GEMINI_HEDGES
+
+logger = logging.getLogger(__name__)
+
+# Seconds a caller waits for an answer (when streaming: for each next chunk)
+DEADLINE = float(os.getenv("AARI_GEMINI_DEADLINE", "8"))
+# Upstream timeout for a whole streamed answer, so an abandoned stream frees its thread
+STREAM_TIMEOUT = float(os.getenv("AARI_GEMINI_STREAM_TIMEOUT", "60"))
+# A call slower than this percentile of recent calls is hedged once (0 disables hedging)
+HEDGE_PERCENTILE = float(os.getenv("AARI_GEMINI_HEDGE_PERCENTILE", "0.95"))
+# Consecutive failed calls that open the circuit, and seconds it stays open before a probe
+BREAKER_FAILURES = int(os.getenv("AARI_GEMINI_BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.getenv("AARI_GEMINI_BREAKER_COOLDOWN", "30"))
+# Threads for blocking calls; a call abandoned at its deadline holds its thread until its
+# upstream timeout (the time left to the deadline when it started) expires
+THREADS = int(os.getenv("AARI_GEMINI_THREADS", "32"))
+
+# Until this many calls have been timed, hedge at half the deadline
+MIN_LATENCY_SAMPLES = 20
+
+_END = object()
+
+
+class DeadlineExceeded(TimeoutError):
+    """No answer from upstream within the deadline"""
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling upstream while the circuit breaker is open"""
+
+
+class LatencyWindow:
+    """Durations of the most recent successful calls"""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Latency below which `fraction` of recent calls finished; None until enough calls were timed"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive failures -> half-open (one probe) after `cooldown`"""
+
+    STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now; in half-open state only one probe at a time"""
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    return False
+                self._set_state("half_open")
+            if self.state == "half_open":
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != "closed":
+                logger.info(f"{self.name} circuit closed")
+                self._set_state("closed")
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                logger.warning(f"{self.name} circuit open for {self.cooldown:.0f}s after {self.failures} failures")
+                self._opened_at = time.monotonic()
+                self._set_state("open")
+
+    def abandon(self):
+        """The allowed call ended without saying anything about upstream health (e.g. the client left)"""
+        with self._lock:
+            self._probing = False
+
+    def _set_state(self, state: str):
+        self.state = state
+        GEMINI_CIRCUIT_STATE.set(value=self.STATES[state])
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "failures": self.failures}
+
+
+class GeminiClient:
+    """Wraps a GenerativeModel's calls with a deadline, one p95-timed hedge and a shared circuit breaker"""
+
+    def __init__(self, deadline: float = DEADLINE, hedge_percentile: float = HEDGE_PERCENTILE,
+                 breaker: Optional[CircuitBreaker] = None, threads: int = THREADS,
+                 stream_timeout: float = STREAM_TIMEOUT):
+        self.deadline = deadline
+        self.stream_timeout = stream_timeout
+        self.hedge_percentile = hedge_percentile
+        self.breaker = breaker or CircuitBreaker("gemini")
+        self.latency = LatencyWindow()
+        self.threads = max(1, threads)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="gemini")
+        return self._executor
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a still-running call is hedged; None when hedging is off"""
+        if not self.hedge_percentile:
+            return None
+        recent = self.latency.percentile(self.hedge_percentile)
+        # Never later than half the deadline, so the hedge still has time to answer
+        return min(recent if recent is not None else self.deadline, self.deadline / 2)
+
+    def _admit(self, mode: str):
+        if not self.breaker.allow():
+            GEMINI_CALLS.inc(mode, "circuit_open")
+            raise CircuitOpen("Gemini is failing; circuit breaker open")
+
+    def _settle(self, mode: str, outcome: str):
+        GEMINI_CALLS.inc(mode, outcome)
+        if outcome == "ok":
+            self.breaker.record_success()
+        elif outcome == "cancelled":
+            self.breaker.abandon()
+        else:
+            self.breaker.record_failure()
+
+    def _timed(self, call: Callable[[], str]) -> str:
+        start = time.monotonic()
+        text = call()
+        self.latency.add(time.monotonic() - start)
+        return text
+
+    def generate(self, model, prompt: str) -> str:
+        """Answer text for `prompt` within the deadline; raises DeadlineExceeded, CircuitOpen or the upstream error"""
+        self._admit("sync")
+        outcome = "error"
+        try:
+            text = self._first_answer(lambda remaining: self._pool().submit(
+                self._timed, lambda: model.generate_content(
+                    prompt, request_options={"timeout": remaining}).text))
+            outcome = "ok"
+            return text
+        except DeadlineExceeded:
+            outcome = "timeout"
+            raise
+        finally:
+            self._settle("sync", outcome)
+
+    def _first_answer(self, start_attempt: Callable[[float], Any]) -> str:
+        """Result of the first attempt to succeed, starting a second one when the first is slow or fails
+
+        start_attempt gets the seconds left to the deadline, to pass upstream as its timeout
+        """
+        start = time.monotonic()
+        deadline = start + self.deadline
+        delay = self.hedge_delay()
+        hedge_at = start + delay if delay is not None else None
+
+        attempts = {start_attempt(self.deadline)}
+        error = None
+        while attempts:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            wake = deadline if hedge_at is None else min(deadline, hedge_at)
+            done, attempts = wait(attempts, timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED)
+            for attempt in done:
+                if attempt.exception() is None:
+                    return attempt.result()
+                error = attempt.exception()
+            if hedge_at is not None and (done or time.monotonic() >= hedge_at):
+                hedge_at = None
+                GEMINI_HEDGES.inc("sync")
+                attempts.add(start_attempt(max(0.0, deadline - time.monotonic())))
+
+        if attempts or error is None:
+            # Still running: the threads finish on their own, nobody waits for them
+            raise DeadlineExceeded(f"No Gemini answer within {self.deadline:.1f}s")
+        raise error
+
+    async def generate_async(self, model, prompt: str) -> str:
+        """Awaitable variant of generate(); losing and late attempts are cancelled"""
+        self._admit("async")
+        outcome = "error"
+        start = time.monotonic()
+        deadline = start + self.deadline
+        delay = self.hedge_delay()
+        hedge_at = start + delay if delay is not None else None
+
+        async def attempt():
+            began = time.monotonic()
+            response = await model.generate_content_async(
+                prompt, request_options={"timeout": max(0.0, deadline - began)})
+            text = response.text
+            self.latency.add(time.monotonic() - began)
+            return text
+
+        attempts = {asyncio.ensure_future(attempt())}
+        error = None
+        try:
+            while attempts:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                wake = deadline if hedge_at is None else min(deadline, hedge_at)
+                done, attempts = await asyncio.wait(attempts, timeout=max(0.0, wake - now),
+                                                    return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        outcome = "ok"
+                        return task.result()
+                    error = task.exception()
+                if hedge_at is not None and (done or time.monotonic() >= hedge_at):
+                    hedge_at = None
+                    GEMINI_HEDGES.inc("async")
+                    attempts.add(asyncio.ensure_future(attempt()))
+
+            if attempts or error is None:
+                outcome = "timeout"
+                raise DeadlineExceeded(f"No Gemini answer within {self.deadline:.1f}s")
+            raise error
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            for task in attempts:
+                task.cancel()
+            self._settle("async", outcome)
+
+    def stream(self, model, prompt: str) -> Iterator[str]:
+        """Text chunks as Gemini generates them; DeadlineExceeded if the next chunk takes longer than the deadline
+
+        Streams are not hedged: once a chunk has been passed on there is nothing to race
+        """
+        self._admit("stream")
+        chunks: "queue.Queue" = queue.Queue()
+        stopped = threading.Event()
+
+        def produce():
+            try:
+                for chunk in model.generate_content(prompt, stream=True,
+                                                    request_options={"timeout": self.stream_timeout}):
+                    if stopped.is_set():
+                        return
+                    if chunk.text:
+                        chunks.put(chunk.text)
+                chunks.put(_END)
+            except Exception as e:
+                chunks.put(e)
+
+        self._pool().submit(produce)
+        outcome = "error"
+        received = False
+        try:
+            while True:
+                try:
+                    item = chunks.get(timeout=self.deadline)
+                except queue.Empty:
+                    outcome = "timeout"
+                    raise DeadlineExceeded(f"No Gemini chunk within {self.deadline:.1f}s")
+                if item is _END:
+                    outcome = "ok"
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                received = True
+                yield item
+        except GeneratorExit:
+            # The consumer went away; upstream was fine if it had already produced something
+            outcome = "ok" if received else "cancelled"
+            raise
+        finally:
+            stopped.set()
+            self._settle("stream", outcome)
+
+    def status(self) -> Dict[str, Any]:
+        """Breaker state, current hedge delay and deadline, for /api/status"""
+        delay = self.hedge_delay()
+        return {
+            "circuit": self.breaker.status(),
+            "deadline_seconds": self.deadline,
+            "hedge_after_seconds": round(delay, 3) if delay is not None else None,
+        }
+
+
+# Process-wide client: latency history and breaker state are shared by every caller
+GEMINI = GeminiClient()
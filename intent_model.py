@@ -0,0 +1,160 @@
+"""
+Intent Model Artifact - Fitted TF-IDF vectorizer + Naive Bayes classifier on disk
+Artifacts are keyed by a hash of the training data, the model settings and
+the library versions, so startup loads the fitted model directly and only
+refits when one of those changes
+
+    python intent_model.py        # build the artifact ahead of time (e.g. in the image build)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import platform
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import sklearn
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+except ImportError:
+    sklearn = None
+    TfidfVectorizer = None
+    MultinomialNB = None
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = os.getenv("AARI_MODEL_DIR", "models")
+ARTIFACT_PREFIX = "intent-"
+ARTIFACT_SUFFIX = ".pkl"
+
+# Anything that changes the fitted model must be part of the key
+VECTORIZER_PARAMS = {"analyzer": "word", "ngram_range": (1, 2), "lowercase": True, "min_df": 1, "max_features": 500}
+CLASSIFIER_PARAMS = {"alpha": 0.1}
+
+
+def _library_versions() -> Dict[str, str]:
+    """Versions whose pickles are not guaranteed to load across releases"""
+    versions = {"python": platform.python_version(), "sklearn": getattr(sklearn, "__version__", "")}
+    for name in ("numpy", "scipy"):
+        try:
+            versions[name] = __import__(name).__version__
+        except ImportError:
+            versions[name] = ""
+    return versions
+
+
+def artifact_key(training_data: Dict[str, List[str]]) -> str:
+    """Stable hash of training data, model settings and library versions"""
+    payload = json.dumps({
+        "training_data": training_data,
+        "vectorizer": VECTORIZER_PARAMS,
+        "classifier": CLASSIFIER_PARAMS,
+        "versions": _library_versions(),
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def artifact_path(key: str, directory: str = MODEL_DIR) -> str:
+    return os.path.join(directory, f"{ARTIFACT_PREFIX}{key[:16]}{ARTIFACT_SUFFIX}")
+
+
+def train(training_data: Dict[str, List[str]]) -> Tuple["TfidfVectorizer", "MultinomialNB"]:
+    """Fit the vectorizer and classifier from {intent: [examples]}"""
+    texts = []
+    labels = []
+    for intent, examples in training_data.items():
+        for example in examples:
+            texts.append(example)
+            labels.append(intent)
+
+    tfidf = TfidfVectorizer(**VECTORIZER_PARAMS)
+    X = tfidf.fit_transform(texts)
+    classifier = MultinomialNB(**CLASSIFIER_PARAMS)
+    classifier.fit(X, labels)
+    return tfidf, classifier
+
+
+def load(key: str, directory: str = MODEL_DIR) -> Optional[Tuple["TfidfVectorizer", "MultinomialNB"]]:
+    """Fitted model for `key`, or None if there is no usable artifact"""
+    path = artifact_path(key, directory)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            artifact = pickle.load(f)
+        if artifact.get("key") != key:
+            logger.warning(f"Intent model artifact {path} has a different key, ignoring it")
+            return None
+        return artifact["tfidf"], artifact["classifier"]
+    except Exception as e:
+        logger.warning(f"Could not load intent model artifact {path}: {e}")
+        return None
+
+
+def save(key: str, tfidf, classifier, directory: str = MODEL_DIR) -> Optional[str]:
+    """Write the artifact atomically (workers may race) and drop artifacts for other keys"""
+    path = artifact_path(key, directory)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        artifact = {
+            "key": key,
+            "created": time.time(),
+            "versions": _library_versions(),
+            "tfidf": tfidf,
+            "classifier": classifier,
+        }
+        fd, tmp_path = tempfile.mkstemp(prefix=ARTIFACT_PREFIX, suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        _prune(directory, keep=path)
+        return path
+    except Exception as e:
+        logger.warning(f"Could not save intent model artifact {path}: {e}")
+        return None
+
+
+def _prune(directory: str, keep: str):
+    """Remove stale artifacts from earlier training data or library versions"""
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.startswith(ARTIFACT_PREFIX) and name.endswith(ARTIFACT_SUFFIX) and path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def load_or_train(training_data: Dict[str, List[str]],
+                  directory: str = MODEL_DIR) -> Tuple["TfidfVectorizer", "MultinomialNB", str]:
+    """Fitted (tfidf, classifier, source) where source is "artifact" or "trained" """
+    start = time.perf_counter()
+    key = artifact_key(training_data)
+
+    loaded = load(key, directory)
+    if loaded is not None:
+        logger.info(f"Loaded intent model artifact {key[:16]} in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return loaded[0], loaded[1], "artifact"
+
+    tfidf, classifier = train(training_data)
+    logger.info(f"Trained intent model {key[:16]} in {(time.perf_counter() - start) * 1000:.1f} ms")
+    save(key, tfidf, classifier, directory)
+    return tfidf, classifier, "trained"
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if sklearn is None:
+        raise SystemExit("scikit-learn is not installed; nothing to build")
+    from nlp_processor import INTENT_TRAINING_DATA
+    _, _, source = load_or_train(INTENT_TRAINING_DATA)
+    print(f"Intent model {source}: {artifact_path(artifact_key(INTENT_TRAINING_DATA))}")
@@ -0,0 +1,159 @@
+"""
+Job Queue - Background execution for long-running API operations
+Work runs on a bounded thread pool; callers poll jobs by id for progress
+and results, and finished jobs are evicted after a TTL
+"""
+
+import hmac
+import logging
+import os
+import secrets
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("AARI_JOB_WORKERS", "4"))
+JOB_MAX_PENDING = int(os.getenv("AARI_JOB_MAX_PENDING", "64"))
+JOB_TTL_SECONDS = int(os.getenv("AARI_JOB_TTL_SECONDS", "3600"))
+JOB_MAX_RETAINED = int(os.getenv("AARI_JOB_MAX_RETAINED", "1000"))
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already queued or running"""
+
+
+class Job:
+    """State of one background operation"""
+
+    def __init__(self, kind: str, owner: str = ""):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.owner = owner  # user/device id that submitted the job
+        # Without an owner, only the submitter, who got this secret, may read the job back
+        self.token = "" if owner else secrets.token_urlsafe(16)
+        self.state = "queued"  # queued -> running -> succeeded | failed
+        self.progress = 0.0
+        self.message = ""
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.finished_monotonic: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.state in ("succeeded", "failed")
+
+    def report(self, progress: float, message: str = ""):
+        """Progress callback handed to the work function (0.0 - 1.0)"""
+        self.progress = max(0.0, min(1.0, float(progress)))
+        if message:
+            self.message = message
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "state": self.state,
+            "progress": round(self.progress, 3),
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """Bounded worker pool with job lookup and TTL eviction of finished jobs"""
+
+    def __init__(self, workers: int = JOB_WORKERS, max_pending: int = JOB_MAX_PENDING,
+                 ttl: int = JOB_TTL_SECONDS, max_retained: int = JOB_MAX_RETAINED):
+        self.max_pending = max(1, max_pending)
+        self.ttl = ttl
+        self.max_retained = max(1, max_retained)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="aari-job")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._finished = deque()  # job ids in completion order, for eviction
+        self._pending = 0
+        self._listeners = []
+
+    def add_listener(self, callback: Callable):
+        """Call callback(job) on the worker thread whenever a job finishes"""
+        self._listeners.append(callback)
+
+    def submit(self, kind: str, func: Callable, *args, owner: str = "", **kwargs) -> Job:
+        """Queue func(*args, progress=job.report, **kwargs); raises JobQueueFull when saturated"""
+        job = Job(kind, owner)
+        with self._lock:
+            self._evict_expired()
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"{self._pending} jobs already pending")
+            self._pending += 1
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def get(self, job_id: str, owner: str = "", token: str = "") -> Optional[Job]:
+        """The job, if it exists and was submitted by `owner` (anonymous jobs: holding its token);
+        other callers' jobs look missing"""
+        with self._lock:
+            self._evict_expired()
+            job = self._jobs.get(job_id)
+        if job is None or job.owner != owner:
+            return None
+        if not job.owner and not hmac.compare_digest(job.token, token):
+            return None
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"pending": self._pending, "retained": len(self._jobs)}
+
+    def _run(self, job: Job, func: Callable, args, kwargs):
+        job.state = "running"
+        job.started_at = datetime.now().isoformat()
+        try:
+            job.result = func(*args, progress=job.report, **kwargs)
+            job.progress = 1.0
+            state = "succeeded"
+        except Exception as e:
+            logger.error(f"Job {job.kind} {job.id} failed: {e}")
+            job.error = str(e)
+            state = "failed"
+
+        job.finished_at = datetime.now().isoformat()
+        job.finished_monotonic = time.monotonic()
+        # Publish the final state last so pollers never see it without the result
+        job.state = state
+        with self._lock:
+            self._pending -= 1
+            self._finished.append(job.id)
+
+        for listener in self._listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                logger.error(f"Job listener error: {e}")
+
+    def _evict_expired(self):
+        """Drop finished jobs past their TTL, oldest first; caller holds the lock"""
+        now = time.monotonic()
+        while self._finished:
+            job = self._jobs.get(self._finished[0])
+            expired = job is None or now - job.finished_monotonic > self.ttl
+            if not expired and len(self._finished) <= self.max_retained:
+                break
+            self._finished.popleft()
+            if job is not None:
+                del self._jobs[job.id]
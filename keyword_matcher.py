@@ -0,0 +1,164 @@
+"""
+Keyword Matcher - One Aho-Corasick automaton shared by the keyword classifiers
+Intent, emotion and subtask keyword tables register here and are compiled
+into a single automaton. One linear pass over an utterance finds every
+keyword, noting whether any occurrence stood as a whole (space-bounded)
+word, and each classifier scores from those hits instead of rescanning.
+Long texts are searched keyword by keyword instead (C substring search wins there)
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+KeywordTable = Dict[str, List[str]]
+
+# Past this length C substring search over the keyword union beats the per-character walk
+LONG_TEXT = 128
+
+
+class KeywordHits:
+    """Keywords found in one text; True when some occurrence was a whole word"""
+
+    __slots__ = ("text", "version", "found", "_indexes")
+
+    def __init__(self, text: str, version: int, found: Dict[str, bool], indexes: Dict[str, "_TableIndex"]):
+        self.text = text
+        self.version = version
+        self.found = found
+        self._indexes = indexes
+
+    def __contains__(self, keyword: str) -> bool:
+        return keyword in self.found
+
+    def score(self, table: str) -> Dict[str, int]:
+        """Per label in table order: 2 per whole-word keyword, 1 per keyword seen only inside other words"""
+        index = self._indexes[table]
+        scores = dict.fromkeys(index.labels, 0)
+        for keyword, whole in self.found.items():
+            for label, _, count in index.by_keyword.get(keyword, ()):
+                scores[label] += (2 if whole else 1) * count
+        return scores
+
+    def first_label(self, table: str) -> Optional[str]:
+        """First label in table order with any keyword present"""
+        by_keyword = self._indexes[table].by_keyword
+        best = None
+        for keyword in self.found:
+            for label, rank, _ in by_keyword.get(keyword, ()):
+                if best is None or rank < best[0]:
+                    best = (rank, label)
+        return best[1] if best else None
+
+
+class _TableIndex:
+    """Inverted view of one table: keyword -> [(label, label rank, times listed)]"""
+
+    __slots__ = ("labels", "by_keyword")
+
+    def __init__(self, table: KeywordTable):
+        self.labels = list(table)
+        self.by_keyword: Dict[str, List[Tuple[str, int, int]]] = {}
+        for rank, (label, keywords) in enumerate(table.items()):
+            for keyword in dict.fromkeys(keywords):
+                self.by_keyword.setdefault(keyword, []).append((label, rank, keywords.count(keyword)))
+
+
+def _compile(keywords) -> Tuple[List[Dict[str, int]], List[Tuple[str, ...]]]:
+    """Trie + failure links, flattened into a DFA: one dict lookup per character"""
+    goto: List[Dict[str, int]] = [{}]
+    outputs: List[List[str]] = [[]]
+    for keyword in keywords:
+        state = 0
+        for ch in keyword:
+            nxt = goto[state].get(ch)
+            if nxt is None:
+                nxt = len(goto)
+                goto[state][ch] = nxt
+                goto.append({})
+                outputs.append([])
+            state = nxt
+        outputs[state].append(keyword)
+
+    # Breadth-first, so a node's failure target is always complete before the node itself
+    fail = [0] * len(goto)
+    order = list(goto[0].values())
+    for state in order:
+        for ch, nxt in goto[state].items():
+            order.append(nxt)
+    for state in order:
+        for ch, nxt in list(goto[state].items()):
+            if state:
+                fail[nxt] = goto[fail[state]].get(ch, 0)
+                outputs[nxt].extend(outputs[fail[nxt]])
+        if state:
+            # Borrow every transition the failure state has that this one lacks
+            for ch, target in goto[fail[state]].items():
+                goto[state].setdefault(ch, target)
+
+    return goto, [tuple(out) for out in outputs]
+
+
+class KeywordMatcher:
+    """Registry of keyword tables and the automaton compiled from all of them"""
+
+    def __init__(self):
+        self._tables: Dict[str, KeywordTable] = {}
+        self._automaton = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Bumped whenever a table changes, so caches built on matches can invalidate
+        self.version = 0
+
+    def register(self, name: str, table: KeywordTable) -> KeywordTable:
+        """Add or replace a table (scored by name); the automaton is rebuilt on the next scan"""
+        with self._lock:
+            self._tables[name] = table
+            self._automaton = None
+            self.version += 1
+        return table
+
+    def compile(self):
+        """Build the automaton now (otherwise the first scan does it)"""
+        with self._lock:
+            if self._automaton is None:
+                keywords = {keyword for table in self._tables.values()
+                            for keywords in table.values() for keyword in keywords}
+                indexes = {name: _TableIndex(table) for name, table in self._tables.items()}
+                keywords = sorted(keywords)
+                self._automaton = (_compile(keywords), keywords, indexes, self.version)
+            return self._automaton
+
+    def scan(self, text_lower: str) -> KeywordHits:
+        """Every registered keyword in `text_lower`, in one pass; repeat scans of the same text are free"""
+        last = getattr(self._local, "last", None)
+        if last is not None and last.version == self.version and last.text == text_lower:
+            return last
+
+        automaton = self._automaton or self.compile()
+        (goto, outputs), keywords, indexes, version = automaton
+        found: Dict[str, bool] = {}
+        if len(text_lower) > LONG_TEXT:
+            padded = f" {text_lower} "
+            for keyword in keywords:
+                if keyword in text_lower:
+                    found[keyword] = f" {keyword} " in padded
+        else:
+            end = len(text_lower) - 1
+            state = 0
+            for i, ch in enumerate(text_lower):
+                state = goto[state].get(ch, 0)
+                if outputs[state]:
+                    for keyword in outputs[state]:
+                        start = i - len(keyword) + 1
+                        if (start == 0 or text_lower[start - 1] == " ") and (i == end or text_lower[i + 1] == " "):
+                            found[keyword] = True
+                        elif keyword not in found:
+                            found[keyword] = False
+
+        hits = KeywordHits(text_lower, version, found, indexes)
+        self._local.last = hits
+        return hits
+
+
+# Process-wide matcher; classifier modules register their tables on import
+MATCHER = KeywordMatcher()
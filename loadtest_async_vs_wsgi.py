@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Side-by-side load test: WSGI app (app.py) vs async app (app_async.py)
+Floods a slow endpoint while probing /api/health, on both servers
+
+Start the two servers first, e.g.:
+    gunicorn --bind :5000 --workers 1 --threads 8 app:app
+    gunicorn --bind :5001 --worker-class aiohttp.GunicornWebWorker app_async:app
+
+Then:
+    python loadtest_async_vs_wsgi.py --wsgi-url http://localhost:5000 \
+        --async-url http://localhost:5001 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+import aiohttp
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of latencies"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def flood(session, url: str, payload: Dict, total: int, concurrency: int) -> Dict:
+    """Send `total` POSTs with at most `concurrency` in flight"""
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                async with session.post(url, json=payload) as response:
+                    await response.read()
+                    if response.status >= 400:
+                        errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+
+    return {"latencies": latencies, "errors": errors, "elapsed": elapsed}
+
+
+async def probe_health(session, url: str, stop: asyncio.Event, interval: float) -> Dict:
+    """Poll the health endpoint until `stop` is set"""
+    latencies = []
+    timeouts = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                await response.read()
+        except Exception:
+            timeouts += 1
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return {"latencies": latencies, "timeouts": timeouts}
+
+
+async def run_target(name: str, base_url: str, args) -> Dict:
+    """Run the flood and the health probe against one server"""
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        stop = asyncio.Event()
+        prober = asyncio.create_task(
+            probe_health(session, f"{base_url}/api/health", stop, args.health_interval)
+        )
+        result = await flood(session, f"{base_url}{args.endpoint}", json.loads(args.payload),
+                             args.requests, args.concurrency)
+        stop.set()
+        health = await prober
+
+    return {"name": name, **result, "health": health}
+
+
+def report(result: Dict):
+    latencies = result["latencies"]
+    health = result["health"]["latencies"]
+    throughput = len(latencies) / result["elapsed"] if result["elapsed"] else 0
+    print(f"\n{result['name']}")
+    print("-" * 70)
+    print(f"  Requests:        {len(latencies)} ({result['errors']} errors)")
+    print(f"  Throughput:      {throughput:.1f} req/s")
+    print(f"  Latency p50/p95: {percentile(latencies, 50) * 1000:.0f} / {percentile(latencies, 95) * 1000:.0f} ms")
+    print(f"  Health p50/p95:  {percentile(health, 50) * 1000:.0f} / {percentile(health, 95) * 1000:.0f} ms"
+          f" ({result['health']['timeouts']} failed probes)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wsgi-url", default="http://localhost:5000")
+    parser.add_argument("--async-url", default="http://localhost:5001")
+    parser.add_argument("--endpoint", default="/api/web-search")
+    parser.add_argument("--payload", default='{"query": "python asyncio", "num_results": 3}')
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--health-interval", type=float, default=0.25)
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print(f"LOAD TEST: {args.endpoint} x {args.requests} @ concurrency {args.concurrency}")
+    print("="*70)
+
+    for name, url in (("WSGI (app.py)", args.wsgi_url), ("Async (app_async.py)", args.async_url)):
+        report(await run_target(name, url, args))
+
+    print("\n" + "="*70 + "\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
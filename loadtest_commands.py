@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Load test /api/process-command with local stand-ins for every external dependency
+Replays a command corpus at fixed concurrency against the Flask app (app.py)
+served in-process, with a Gemini stub, a fake search server and no-op side
+effects, then reports p50/p95/p99 latency and throughput per intent
+
+    python loadtest_commands.py --concurrency 16 --requests 2000 \
+        --gemini-latency 800,200,4000,0.01 --search-latency 150,50
+
+The corpus is JSON lines with a "command" field (and optionally the expected
+"intent"); lines without a command are skipped. The default corpus is seeded
+from the test_enhancements.py cases
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import requests
+
+from loadtest_async_vs_wsgi import percentile
+from loadtest_fakes import FakeGeminiModel, FakeSearchServer, Latency, NoOpTaskExecutor, no_op_side_effects
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "loadtest_corpus.jsonl")
+
+
+def load_corpus(path: str) -> List[Dict[str, str]]:
+    """Read {"command": ..., "intent": ...} lines"""
+    corpus = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if isinstance(item, dict) and item.get("command"):
+                corpus.append({"command": item["command"], "intent": item.get("intent", "")})
+    return corpus
+
+
+def start_app_server(app, host: str = "127.0.0.1"):
+    """Serve the Flask app on a free local port with one thread per request"""
+    from werkzeug.serving import make_server
+    server = make_server(host, 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="loadtest-app", daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def prepare_app(args, recorder, data_dir: str):
+    """Import app.py and swap the assistant's Gemini model and executor for the stand-ins"""
+    import app as app_module
+    from admission import AdmissionController
+    from session_manager import SessionManager
+
+    # app.py configures INFO logging on import; per-request log lines would skew the numbers
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    asst = app_module.get_assistant()
+    if asst is None:
+        raise RuntimeError("Assistant failed to initialize")
+
+    asst.nlp_processor.model = FakeGeminiModel(
+        Latency.parse(args.gemini_latency), error_rate=args.gemini_error_rate,
+        vague_rate=args.gemini_vague_rate, seed=args.seed,
+    )
+    asst.task_executor = NoOpTaskExecutor(recorder)
+    app_module.task_executor = asst.task_executor
+
+    # Virtual users get throwaway memory / learning files instead of user_data/
+    app_module.sessions = SessionManager(app_module.get_assistant, data_dir=data_dir)
+    if args.no_admission:
+        app_module.admission = AdmissionController({"enabled": False})
+
+    return app_module
+
+
+def run_load(base_url: str, corpus: List[Dict[str, str]], args) -> Dict:
+    """Send args.requests commands with args.concurrency in flight; returns one sample per request"""
+    url = f"{base_url}/api/process-command"
+    order = random.Random(args.seed)
+    plan = [order.choice(corpus) for _ in range(args.requests)]
+    samples = []
+    samples_lock = threading.Lock()
+    next_index = iter(range(len(plan)))
+    index_lock = threading.Lock()
+
+    def worker(worker_id: int):
+        session = requests.Session()
+        headers = {"X-User-Id": f"loadtest-{worker_id % args.users}"} if args.users else {}
+        while True:
+            with index_lock:
+                i = next(next_index, None)
+            if i is None:
+                return
+            item = plan[i]
+            start = time.perf_counter()
+            try:
+                response = session.post(url, json={"command": item["command"]}, headers=headers,
+                                        timeout=args.timeout)
+                status = response.status_code
+                body = response.json() if status == 200 else {}
+            except Exception:
+                status, body = 0, {}
+            elapsed = time.perf_counter() - start
+
+            if status == 200:
+                label = body.get("intent", "unknown")
+            elif status in (429, 503):
+                label = f"rejected ({status})"
+            else:
+                label = "error"
+            with samples_lock:
+                samples.append({"intent": label, "expected": item["intent"], "status": status, "latency": elapsed})
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for worker_id in range(args.concurrency):
+            pool.submit(worker, worker_id)
+    return {"samples": samples, "elapsed": time.perf_counter() - start}
+
+
+def summarize(result: Dict) -> Dict[str, Dict]:
+    """p50/p95/p99 latency and throughput per returned intent, plus an "all" row"""
+    by_intent = defaultdict(list)
+    for sample in result["samples"]:
+        by_intent[sample["intent"]].append(sample["latency"])
+        by_intent["all"].append(sample["latency"])
+
+    elapsed = result["elapsed"] or 1e-9
+    return {
+        intent: {
+            "count": len(latencies),
+            "throughput": len(latencies) / elapsed,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+        }
+        for intent, latencies in sorted(by_intent.items(), key=lambda kv: (kv[0] == "all", kv[0]))
+    }
+
+
+def report(summary: Dict[str, Dict], result: Dict, extras: Dict):
+    print(f"\n{'Intent':<22}{'Count':>7}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    print("-" * 68)
+    for intent, row in summary.items():
+        if intent == "all":
+            print("-" * 68)
+        print(f"{intent:<22}{row['count']:>7}{row['throughput']:>9.1f}"
+              f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}")
+
+    samples = result["samples"]
+    mismatched = sum(1 for s in samples if s["status"] == 200 and s["expected"] and s["intent"] != s["expected"])
+    print(f"\nWall time:         {result['elapsed']:.2f}s")
+    print(f"Intent mismatches: {mismatched} (vs corpus labels)")
+    print(f"Gemini calls:      {dict(extras['gemini'])}")
+    print(f"Search hits:       {dict(extras['search'])}")
+    print(f"Side effects:      {dict(extras['side_effects'])} (all swallowed)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--users", type=int, default=8, help="distinct X-User-Id values (0 = shared session)")
+    parser.add_argument("--gemini-latency", default="800,200", help="ms: mean[,jitter[,tail,tail_rate]]")
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-vague-rate", type=float, default=0.1,
+                        help="fraction of answers that trigger the web-search fallback")
+    parser.add_argument("--search-latency", default="150,50", help="ms per fake search / page fetch")
+    parser.add_argument("--no-admission", action="store_true", help="disable config.json admission limits")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", dest="json_path", help="also write the summary to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        parser.error(f"No commands in {args.corpus}")
+
+    search_server = FakeSearchServer(Latency.parse(args.search_latency)).start()
+    with tempfile.TemporaryDirectory(prefix="aari-loadtest-") as data_dir, \
+            no_op_side_effects() as recorder, search_server.installed():
+        app_module = prepare_app(args, recorder, data_dir)
+        server, base_url = start_app_server(app_module.app)
+        try:
+            print("\n" + "="*70)
+            print(f"COMMAND LOAD TEST: {args.requests} commands ({len(corpus)} distinct) "
+                  f"@ concurrency {args.concurrency}")
+            print("="*70)
+
+            result = run_load(base_url, corpus, args)
+        finally:
+            server.shutdown()
+            search_server.stop()
+
+        summary = summarize(result)
+        report(summary, result, {
+            "gemini": app_module.get_assistant().nlp_processor.model.calls,
+            "search": search_server.hits,
+            "side_effects": recorder.counts,
+        })
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"args": vars(args), "elapsed": result["elapsed"], "intents": summary}, f, indent=2)
+
+    print("\n" + "="*70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
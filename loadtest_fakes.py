@@ -0,0 +1,284 @@
+"""
+Local stand-ins for the backend's external dependencies, for load testing
+Gemini stub with injectable latency, a fake Google search / page server,
+and no-op side effects (WhatsApp, calls, browsers, shell commands)
+"""
+
+import asyncio
+import random
+import re
+import sys
+import threading
+import time
+import types
+from contextlib import ExitStack, contextmanager
+from collections import Counter
+from html import escape, unescape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, Optional
+from unittest import mock
+from urllib.parse import parse_qs, quote_plus, urlparse
+
+import requests
+from googlesearch import SearchResult
+
+from task_executor import TaskExecutor
+
+
+class Latency:
+    """Sampled delay: `mean` seconds plus uniform +/- `jitter`, with rare `tail` spikes"""
+
+    def __init__(self, mean: float = 0.0, jitter: float = 0.0, tail: float = 0.0, tail_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        self.mean = mean
+        self.jitter = jitter
+        self.tail = tail
+        self.tail_rate = tail_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        """Build from "mean[,jitter[,tail,tail_rate]]" in milliseconds / fraction, e.g. "800,200,4000,0.01" """
+        parts = [float(p) for p in spec.split(",") if p.strip()] if spec else []
+        parts += [0.0] * (4 - len(parts))
+        mean, jitter, tail, tail_rate = parts[:4]
+        return cls(mean / 1000, jitter / 1000, tail / 1000, tail_rate)
+
+    def sample(self) -> float:
+        """Seconds to wait for one call"""
+        with self._lock:
+            delay = self.mean + self._random.uniform(-self.jitter, self.jitter)
+            if self.tail_rate and self._random.random() < self.tail_rate:
+                delay += self.tail
+        return max(0.0, delay)
+
+    def sleep(self):
+        time.sleep(self.sample())
+
+    async def sleep_async(self):
+        await asyncio.sleep(self.sample())
+
+
+class _FakeResponse:
+    """The slice of a google.generativeai response the backend reads"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """Drop-in for genai.GenerativeModel: sync, streamed and async generate_content"""
+
+    def __init__(self, latency: Optional[Latency] = None, error_rate: float = 0.0, vague_rate: float = 0.0,
+                 chunks: int = 4, seed: Optional[int] = None):
+        self.latency = latency or Latency()
+        self.error_rate = error_rate
+        # Vague answers send _handle_query down its web-search fallback
+        self.vague_rate = vague_rate
+        self.chunks = max(1, chunks)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = Counter()
+
+    def _answer(self, prompt: str) -> str:
+        topic = " ".join(str(prompt).split()[:12])
+        with self._lock:
+            vague = self.vague_rate and self._random.random() < self.vague_rate
+        if vague:
+            return f"I found information about {topic}. Could you be more specific?"
+        return f"Here is a short answer about {topic}. It was generated locally for load testing."
+
+    def _maybe_fail(self, mode: str):
+        with self._lock:
+            self.calls[mode] += 1
+            failed = self.error_rate and self._random.random() < self.error_rate
+        if failed:
+            raise RuntimeError("fake Gemini error")
+
+    def generate_content(self, prompt, stream: bool = False, **kwargs):
+        if stream:
+            return self._generate_stream(prompt)
+        self.latency.sleep()
+        self._maybe_fail("sync")
+        return _FakeResponse(self._answer(prompt))
+
+    def _generate_stream(self, prompt) -> Iterator[_FakeResponse]:
+        # Time to first chunk is most of the latency, the rest is spread over the chunks
+        delay = self.latency.sample()
+        time.sleep(delay * 0.6)
+        self._maybe_fail("stream")
+        words = self._answer(prompt).split(" ")
+        step = max(1, len(words) // self.chunks)
+        for i in range(0, len(words), step):
+            time.sleep(delay * 0.4 / self.chunks)
+            yield _FakeResponse(" ".join(words[i:i + step]) + " ")
+
+    async def generate_content_async(self, prompt, **kwargs):
+        await self.latency.sleep_async()
+        self._maybe_fail("async")
+        return _FakeResponse(self._answer(prompt))
+
+
+def _search_page(base_url: str, query: str, num: int) -> bytes:
+    """Results page for the fake googlesearch: one link per result"""
+    blocks = []
+    for i in range(num):
+        href = f"{base_url}/page/{i}?q={quote_plus(query)}"
+        blocks.append(f'<div class="g"><a href="{escape(href)}"><h3>Result {i} for {escape(query)}</h3></a></div>')
+    return f"<html><body>{''.join(blocks)}</body></html>".encode()
+
+
+_RESULT_LINK_RE = re.compile(r'<div class="g"><a href="([^"]*)"><h3>(.*?)</h3>')
+
+
+def _content_page(query: str, index: int) -> bytes:
+    paragraph = f"{escape(query)} explained, part {index}. " * 20
+    return (f"<html><head><title>{escape(query)}</title><script>var x = 1;</script></head>"
+            f"<body><h1>{escape(query)}</h1><p>{paragraph}</p></body></html>").encode()
+
+
+class FakeSearchServer:
+    """Threaded local HTTP server answering /search and /page/<n> with injectable latency"""
+
+    def __init__(self, latency: Optional[Latency] = None, host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency or Latency()
+        self.hits = Counter()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query).get("q", [""])[0]
+                server.latency.sleep()
+                if parsed.path == "/search":
+                    num = int(parse_qs(parsed.query).get("num", ["5"])[0])
+                    body = _search_page(server.url, query, num)
+                    server.hits["search"] += 1
+                elif parsed.path.startswith("/page/"):
+                    body = _content_page(query, int(parsed.path.rsplit("/", 1)[-1] or 0))
+                    server.hits["page"] += 1
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://{host}:{self._httpd.server_address[1]}"
+        self._thread = None
+
+    @property
+    def search_url(self) -> str:
+        return f"{self.url}/search"
+
+    def start(self) -> "FakeSearchServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-search", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def googlesearch(self, query, num_results: int = 10, advanced: bool = False, sleep_interval: float = 0, **kwargs):
+        """Stand-in for googlesearch.search: results (SearchResult objects when advanced) from /search"""
+        response = requests.get(self.search_url, params={"q": query, "num": num_results}, timeout=10)
+        response.raise_for_status()
+        for href, title in _RESULT_LINK_RE.findall(response.text):
+            url = unescape(href)
+            yield SearchResult(url, unescape(title), "") if advanced else url
+
+    @contextmanager
+    def installed(self) -> Iterator["FakeSearchServer"]:
+        """Point web_search's sync and async paths at this server"""
+        with mock.patch("web_search.search", self.googlesearch):
+            yield self
+
+
+class SideEffectRecorder:
+    """Counts side effects that were swallowed instead of performed"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, kind: str):
+        with self._lock:
+            self.counts[kind] += 1
+
+    def stub(self, kind: str, result: Any = None):
+        def call(*args, **kwargs):
+            self.record(kind)
+            return result
+        return call
+
+
+class NoOpTaskExecutor(TaskExecutor):
+    """TaskExecutor that reports success without messaging, calling, downloading or launching anything"""
+
+    def __init__(self, recorder: Optional[SideEffectRecorder] = None):
+        super().__init__()
+        self.recorder = recorder or SideEffectRecorder()
+
+    def _ok(self, kind: str, message: str, **extra) -> Dict[str, Any]:
+        self.recorder.record(kind)
+        return {"status": "success", "message": message, **extra}
+
+    def send_whatsapp_message(self, contact_name: str, message: str) -> Dict[str, Any]:
+        return self._ok("whatsapp", f"Message sent to {contact_name}")
+
+    def make_call(self, contact_name: str) -> Dict[str, Any]:
+        return self._ok("call", f"Calling {contact_name}")
+
+    def download_file(self, file_name: str, file_type: str = "", progress=None) -> Dict[str, Any]:
+        if progress:
+            progress(1.0, "Downloaded")
+        return self._ok("download", f"Downloaded {file_name}", file_path="")
+
+    async def download_file_async(self, file_name: str, file_type: str = "") -> Dict[str, Any]:
+        return self.download_file(file_name, file_type)
+
+    def open_application(self, app_name: str) -> Dict[str, Any]:
+        return self._ok("open_app", f"Opening {app_name}")
+
+    def play_media(self, media_name: str) -> Dict[str, Any]:
+        return self._ok("media", f"Playing {media_name}")
+
+    def execute_system_command(self, action: str) -> Dict[str, Any]:
+        return self._ok("system", f"Done: {action}")
+
+    def send_email(self, recipient: str, subject: str, body: str) -> Dict[str, Any]:
+        return self._ok("email", f"Email sent to {recipient}")
+
+    def search_web(self, query: str) -> Dict[str, Any]:
+        return self._ok("browser_search", f"Searching for {query}")
+
+
+@contextmanager
+def no_op_side_effects(recorder: Optional[SideEffectRecorder] = None) -> Iterator[SideEffectRecorder]:
+    """Swallow process-wide side effects that bypass TaskExecutor (browser, pywhatkit, shell, GUI)"""
+    recorder = recorder or SideEffectRecorder()
+    fake_pywhatkit = types.ModuleType("pywhatkit")
+    fake_pywhatkit.sendwhatmsg_instantly = recorder.stub("pywhatkit")
+    fake_pywhatkit.playonyt = recorder.stub("pywhatkit")
+    fake_pywhatkit.search = recorder.stub("pywhatkit")
+    fake_browser = types.SimpleNamespace(open=recorder.stub("browser", True))
+
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch.dict(sys.modules, {"pywhatkit": fake_pywhatkit}))
+        stack.enter_context(mock.patch("webbrowser.open", recorder.stub("browser", True)))
+        stack.enter_context(mock.patch("webbrowser.open_new_tab", recorder.stub("browser", True)))
+        stack.enter_context(mock.patch("webbrowser.get", lambda *args, **kwargs: fake_browser))
+        stack.enter_context(mock.patch("subprocess.Popen", recorder.stub("process")))
+        stack.enter_context(mock.patch("os.system", recorder.stub("shell", 0)))
+        stack.enter_context(mock.patch("os.startfile", recorder.stub("startfile"), create=True))
+        stack.enter_context(mock.patch("advanced_executor.pyautogui", None))
+        yield recorder
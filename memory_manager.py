@@ -6,8 +6,11 @@ Persistent storage for AARI's learned information about the user
 import json
 import os
 import logging
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any
+
+from metrics import record_json_write
 
 logger = logging.getLogger(__name__)
 
@@ -16,9 +19,12 @@ MEMORY_FILE = "aari_memory.json"
 class MemoryManager:
     """Manages AARI's memory and learning"""
     
-    def __init__(self):
-        self.memory_file = MEMORY_FILE
+    def __init__(self, memory_file: str = MEMORY_FILE):
+        self.memory_file = memory_file
         self.memory = self._load_memory()
+        self.version = 0  # Bumped on every change; used for ETags
+        self._defer_saves = False
+        self._pending_save = False
     
     def _load_memory(self) -> Dict[str, Any]:
         """Load memory from persistent storage"""
@@ -42,13 +48,40 @@ class MemoryManager:
     
     def save_memory(self):
         """Save memory to persistent storage"""
+        self.version += 1
+        
+        if self._defer_saves:
+            self._pending_save = True
+            return
+        
+        self._write_memory()
+    
+    def _write_memory(self):
+        """Write the memory dict to disk"""
         try:
             with open(self.memory_file, 'w') as f:
                 json.dump(self.memory, f, indent=2, default=str)
+                record_json_write(self.memory_file, f.tell())
             logger.info("Memory saved successfully")
         except Exception as e:
             logger.error(f"Error saving memory: {e}")
     
+    @contextmanager
+    def deferred_saves(self):
+        """Collapse every save inside the block into a single write at the end"""
+        if self._defer_saves:
+            yield
+            return
+        
+        self._defer_saves = True
+        try:
+            yield
+        finally:
+            self._defer_saves = False
+            if self._pending_save:
+                self._pending_save = False
+                self._write_memory()
+    
     def remember(self, title: str, content: str, category: str = "general") -> Dict[str, Any]:
         """Store important conversation or information"""
         try:
@@ -78,31 +111,32 @@ class MemoryManager:
     def recall(self, query: str) -> List[Dict[str, Any]]:
         """Search and retrieve stored memories"""
         try:
-            query_lower = query.lower()
-            results = []
-            
-            # Search in important conversations
-            for memory in self.memory["important_conversations"]:
-                if (query_lower in memory["title"].lower() or
-                    query_lower in memory["content"].lower() or
-                    query_lower in str(memory.get("tags", [])).lower()):
-                    results.append(memory)
-            
-            # Search in learned facts
-            for fact_key, fact_value in self.memory["learned_facts"].items():
-                if query_lower in fact_key.lower() or query_lower in str(fact_value).lower():
-                    results.append({
-                        "title": fact_key,
-                        "content": fact_value,
-                        "category": "learned_fact",
-                        "timestamp": ""
-                    })
-            
-            return results
+            return list(self.iter_recall(query))
         except Exception as e:
             logger.error(f"Recall error: {e}")
             return []
     
+    def iter_recall(self, query: str) -> Iterator[Dict[str, Any]]:
+        """Yield matching memories in storage order, so callers can stop after one page"""
+        query_lower = query.lower()
+        
+        # Search in important conversations
+        for memory in self.memory["important_conversations"]:
+            if (query_lower in memory["title"].lower() or
+                query_lower in memory["content"].lower() or
+                query_lower in str(memory.get("tags", [])).lower()):
+                yield memory
+        
+        # Search in learned facts
+        for fact_key, fact_value in self.memory["learned_facts"].items():
+            if query_lower in fact_key.lower() or query_lower in str(fact_value).lower():
+                yield {
+                    "title": fact_key,
+                    "content": fact_value,
+                    "category": "learned_fact",
+                    "timestamp": ""
+                }
+    
     def set_preference(self, key: str, value: Any) -> Dict[str, Any]:
         """Store user preference"""
         try:
@@ -0,0 +1,214 @@
+"""
+Metrics - Low-overhead in-process collectors with Prometheus text export
+Counters, gauges and latency histograms are safe to update from any
+gunicorn thread; /api/metrics renders them with render()
+"""
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape_label(value: str) -> str:
+    """Escape a label value for the text exposition format: backslash first, then quote and newline"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Metric:
+    """Shared label handling for every metric type"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Tuple) -> Tuple[str, ...]:
+        if len(labels) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {labels}")
+        return tuple(str(label) for label in labels)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = list(zip(self.label_names, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+    def _render_samples(self, items) -> List[str]:
+        return [f"{self.name}{self._format_labels(key)} {value}" for key, value in items]
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set"""
+
+    type_name = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down per label set"""
+
+    type_name = "gauge"
+
+    def inc(self, *labels, amount: float = 1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track(self, *labels):
+        """Count the block as in flight while it runs"""
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket latency histogram per label set"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value: float):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        """Observe the wall time of the block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(*labels, value=time.perf_counter() - start)
+
+    def _render_samples(self, items) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{self._format_labels(key, (('le', le),))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    "aari_stage_seconds", "Time spent in each command pipeline stage", ("stage",)))
+INTENT_LATENCY = REGISTRY.register(Histogram(
+    "aari_command_seconds", "End-to-end command processing time by intent", ("intent",)))
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    "aari_http_request_seconds", "HTTP request time by endpoint and status", ("endpoint", "status")))
+IN_FLIGHT = REGISTRY.register(Gauge(
+    "aari_requests_in_flight", "HTTP requests currently being served", ("endpoint",)))
+WS_CHANNELS = REGISTRY.register(Gauge(
+    "aari_websocket_channels", "Open WebSocket channels", ()))
+GEMINI_CALLS = REGISTRY.register(Counter(
+    "aari_gemini_calls_total", "Calls to the Gemini API", ("mode", "outcome")))
+GEMINI_HEDGES = REGISTRY.register(Counter(
+    "aari_gemini_hedges_total", "Second Gemini attempts started because the first was slow or failed", ("mode",)))
+GEMINI_CIRCUIT_STATE = REGISTRY.register(Gauge(
+    "aari_gemini_circuit_state", "Gemini circuit breaker state (0 closed, 1 half-open, 2 open)", ()))
+WEB_FETCHES = REGISTRY.register(Counter(
+    "aari_web_fetches_total", "Outbound web requests", ("kind", "outcome")))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "aari_cache_lookups_total", "Cache lookups by cache and result", ("cache", "result")))
+SINGLE_FLIGHT_SHARED = REGISTRY.register(Counter(
+    "aari_single_flight_shared_total", "Calls served by an identical call already in flight", ("call",)))
+JSON_WRITES = REGISTRY.register(Counter(
+    "aari_json_writes_total", "JSON file rewrites", ("file",)))
+JSON_BYTES = REGISTRY.register(Counter(
+    "aari_json_bytes_written_total", "Bytes written by JSON file rewrites", ("file",)))
+ADMISSION_REJECTIONS = REGISTRY.register(Counter(
+    "aari_admission_rejections_total", "Requests shed by admission control", ("pool", "reason")))
+ADMISSION_QUEUED = REGISTRY.register(Gauge(
+    "aari_admission_queued", "Requests waiting for an admission slot", ("pool",)))
+RESPONSE_IDENTITY_BYTES = REGISTRY.register(Counter(
+    "aari_response_identity_bytes_total", "JSON response bytes before encoding", ("endpoint",)))
+RESPONSE_WIRE_BYTES = REGISTRY.register(Counter(
+    "aari_response_wire_bytes_total", "Response bytes sent after encoding", ("endpoint", "encoding")))
+MODEL_LOAD_SECONDS = REGISTRY.register(Gauge(
+    "aari_model_load_seconds", "Time taken to load each shared model", ("model",)))
+MODEL_RESIDENT_BYTES = REGISTRY.register(Gauge(
+    "aari_model_resident_bytes", "Resident memory added by loading each shared model", ("model",)))
+
+
+def record_json_write(path: str, size: int):
+    """Count one JSON file rewrite and its size"""
+    name = os.path.basename(path)
+    JSON_WRITES.inc(name)
+    JSON_BYTES.inc(name, amount=size)
+
+
+def render() -> str:
+    """Prometheus text exposition of every registered metric"""
+    return REGISTRY.render()
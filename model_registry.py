@@ -0,0 +1,132 @@
+"""
+Model Registry - Heavy models loaded lazily and exactly once per process
+Components register a loader under a name and call MODELS.get(name); the
+first call loads the model (recording wall time and resident-memory growth)
+and every later call, from any component or thread, gets the same object
+
+    python model_registry.py      # load every model and print the report
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from metrics import MODEL_LOAD_SECONDS, MODEL_RESIDENT_BYTES
+
+logger = logging.getLogger(__name__)
+
+
+def _resident_bytes() -> Optional[int]:
+    """Current resident set size, or None where /proc is not available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class _Entry:
+    """One registered model and what loading it cost"""
+
+    __slots__ = ("loader", "lock", "loaded", "value", "error", "load_seconds", "resident_bytes")
+
+    def __init__(self, loader: Callable[[], Any]):
+        self.loader = loader
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.value = None
+        self.error = None
+        self.load_seconds = None
+        self.resident_bytes = None
+
+
+class ModelRegistry:
+    """Named, lazily loaded, process-wide models"""
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        """Add or replace the loader for `name` (a loader may return None when the model is unavailable)"""
+        with self._lock:
+            self._entries[name] = _Entry(loader)
+
+    def get(self, name: str) -> Any:
+        """The model, loading it on first use; None if it is unavailable or failed to load"""
+        entry = self._entries[name]
+        if not entry.loaded:
+            # Per-model lock: loading spaCy does not hold up a Gemini client lookup
+            with entry.lock:
+                if not entry.loaded:
+                    self._load(name, entry)
+        return entry.value
+
+    def _load(self, name: str, entry: _Entry):
+        rss_before = _resident_bytes()
+        start = time.perf_counter()
+        try:
+            entry.value = entry.loader()
+        except Exception as e:
+            # Not retried: a missing model or package stays missing for the life of the process
+            logger.warning(f"Model {name} not loaded: {e}")
+            entry.error = str(e)
+        entry.load_seconds = time.perf_counter() - start
+        rss_after = _resident_bytes()
+        if rss_before is not None and rss_after is not None:
+            # Approximate when other threads allocate at the same time
+            entry.resident_bytes = max(rss_after - rss_before, 0)
+            MODEL_RESIDENT_BYTES.set(name, value=entry.resident_bytes)
+        MODEL_LOAD_SECONDS.set(name, value=entry.load_seconds)
+        entry.loaded = True
+
+        if entry.value is not None:
+            logger.info(f"Loaded model {name} in {entry.load_seconds * 1000:.1f} ms"
+                        + (f", +{entry.resident_bytes / 2**20:.1f} MiB resident" if entry.resident_bytes is not None else ""))
+
+    def warm(self):
+        """Load every registered model now (e.g. during warm-up or before forking workers)"""
+        with self._lock:
+            names = list(self._entries)
+        for name in names:
+            self.get(name)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per model: whether it is loaded and available, load time and resident-memory growth"""
+        with self._lock:
+            entries = list(self._entries.items())
+        report = {}
+        for name, entry in entries:
+            report[name] = {
+                "loaded": entry.loaded,
+                "available": entry.value is not None,
+                "load_ms": round(entry.load_seconds * 1000, 1) if entry.load_seconds is not None else None,
+                "resident_mib": round(entry.resident_bytes / 2**20, 1) if entry.resident_bytes is not None else None,
+            }
+            if entry.error:
+                report[name]["error"] = entry.error
+        return report
+
+
+# Process-wide registry; modules register their loaders on import
+MODELS = ModelRegistry()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    # Run as a script this file is __main__; components register with the imported module
+    import model_registry
+    import nlp_processor  # noqa: F401  (registers spaCy, Gemini and the intent classifier)
+    import emotional_intelligence  # noqa: F401  (registers the TextBlob sentiment lexicon)
+
+    model_registry.MODELS.warm()
+    print(f"{'Model':<20} {'Available':>9} {'Load ms':>10} {'RSS MiB':>9}")
+    for name, stat in model_registry.MODELS.stats().items():
+        load_ms = "-" if stat["load_ms"] is None else f"{stat['load_ms']:.1f}"
+        resident = "-" if stat["resident_mib"] is None else f"{stat['resident_mib']:.1f}"
+        print(f"{name:<20} {str(stat['available']):>9} {load_ms:>10} {resident:>9}")
+    rss = _resident_bytes()
+    if rss is not None:
+        print(f"Process resident: {rss / 2**20:.1f} MiB")
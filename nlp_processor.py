@@ -1,6 +1,6 @@
 """
 NLP Processor for intent extraction and natural language understanding
-Uses spaCy, TextBlob, scikit-learn, and Google's Generative AI
+Uses spaCy, TextBlob, scikit-learn (via intent_model), and Google's Generative AI
 """
 
 try:
@@ -9,48 +9,433 @@ except ImportError:
     spacy = None
 
 from textblob import TextBlob
+from bisect import bisect_left
 import json
 import logging
-from typing import Tuple, Dict, Any
+import re
+from typing import Tuple, Dict, Any, List, Iterator
 import google.generativeai as genai
 from dotenv import load_dotenv
 import os
 
-try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.naive_bayes import MultinomialNB
-except ImportError:
-    TfidfVectorizer = None
-    MultinomialNB = None
-
 import time
 
+import intent_model
+from gemini_client import GEMINI, CircuitOpen, DeadlineExceeded
+from keyword_matcher import MATCHER
+from model_registry import MODELS
+from result_cache import LRUCache, SingleFlight, TTLCache
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
 
+# Priority keywords that strongly indicate specific intents
+STRONG_INTENT_KEYWORDS = {
+    "send_message": ["send", "message", "whatsapp", "text", "sms", "email", "tell"],
+    "make_call": ["call", "phone", "ring", "dial", "telephone"],
+    "set_reminder": ["remind", "reminder", "alarm", "alert", "notification"],
+    "play_media": ["play", "music", "song", "podcast", "video"],
+    "download_file": ["download", "fetch", "retrieve", "get"],
+    "system_control": ["open", "launch", "start", "close", "turn"],
+    "query": ["what", "when", "where", "how", "why", "search"],
+    "memory": ["remember", "recall", "save", "store", "bookmark"],
+    "greeting": ["hello", "hi", "hey", "greetings", "morning"],
+}
+MATCHER.register("intent", STRONG_INTENT_KEYWORDS)
+
+# Hybrid intent scoring: share of the blend given to keyword evidence (the rest is the classifier).
+# Both sides are distributions, so a keyword hit the classifier agrees with scores ~0.9; clients
+# that thresholded the older scores (~0.2-0.5 for the same commands) must recalibrate (README)
+KEYWORD_WEIGHT = 0.6
+# Their keywords also show up inside action commands ("text john hi how are you"), so an action
+# keyword at least as strong takes them out of the blend
+CONVERSATIONAL_INTENTS = frozenset({"greeting", "query"})
+# Classifier probability needed to name an intent when no keyword matched
+ML_MIN_CONFIDENCE = 0.5
+# Words of a lowercased command, in order, for telling which tied keyword came first
+_WORD_RE = re.compile(r"[a-z]+")
+
+# Message extraction: words that introduce a message, in priority order
+MESSAGE_KEYWORDS = ["say", "tell", "message", "text", "send", "email", "sms"]
+# Dropped between the keyword and the recipient (each at most once, in this order)
+MESSAGE_SKIP_WORDS = ["to", "a", "the", "in", "on", "at"]
+# Everything after the first of these is the message
+MESSAGE_SEPARATORS = ["that ", "saying ", "says ", ":"]
+# Leading words that look like a recipient rather than the message itself
+MESSAGE_NAME_PREFIXES = ("john", "mom", "dad", "brother", "sister", "avnish", "my", "the")
+_TOKEN_RE = re.compile(r"\S+")
+# Queries only pay for spaCy NER when they can name a place ("weather in delhi")
+_PLACE_CUE_RE = re.compile(r"\b(?:in|at|near|around|from)\s+\w")
+
+
+def _find_all(text: str, sub: str) -> List[int]:
+    """Every start offset of `sub` in `text`, ascending"""
+    positions = []
+    position = text.find(sub)
+    while position != -1:
+        positions.append(position)
+        position = text.find(sub, position + 1)
+    return positions
+
+
+# Intent classifier training set; the model artifact is keyed by a hash of this table
+INTENT_TRAINING_DATA = {
+    "greeting": [
+        "hello", "hi", "hey", "good morning", "good afternoon", "good evening",
+        "good night", "hello there", "hi there", "hey there", "what's up",
+        "how are you", "how are you doing", "how's it going", "how do you do",
+        "nice to meet you", "pleased to meet you", "greetings", "welcome",
+        "hey aari", "hello aari", "hi aari", "suno aari", "aari hello",
+        "good to see you", "good to hear from you", "long time no see",
+        "it's been a while", "haven't seen you in a while", "how have you been",
+        "what's new", "what's happening", "what have you been up to",
+        "how's life", "how's everything", "how's things", "how are things",
+        "yo", "sup", "what's good", "what's going on", "yo yo yo",
+        "hello my friend", "hi buddy", "hey buddy", "hello buddy",
+        "morning", "afternoon", "evening", "night", "good day",
+        "greetings friend", "nice day", "have a nice day", "cheers",
+        "how do you do", "good to see you again", "welcome back",
+        "great to see you", "how are things", "how's your day",
+        "hey how's it", "sup buddy", "yo what's up", "hi how are you",
+        "hello my dear", "hi sweetheart", "hey love", "greetings to you",
+        "nice seeing you", "it's nice to meet you", "pleasure to meet",
+        "start", "begin", "activate", "wake up", "good morning sunshine",
+        "hey there friend", "hello again", "hi again", "welcome again",
+        "top of the morning", "how's the day treating you", "everything good",
+        "you good", "all good", "doing well", "how you doing", "what up homie"
+    ],
+    "send_message": [
+        "send message", "send text", "send email", "send sms", "tell john",
+        "message someone", "text someone", "email someone", "whatsapp someone",
+        "send whatsapp", "send to john", "message to john", "text to john",
+        "send message to mom", "send text to dad", "email my boss",
+        "send whatsapp to my friend", "text my girlfriend", "message my wife",
+        "message my family", "email my company", "send a message",
+        "send an email", "send a text", "send a whatsapp", "send an sms",
+        "tell them hello", "tell them i love them", "message them",
+        "send my regards", "send my love", "send greetings",
+        "get in touch", "reach out to", "contact", "write to",
+        "drop a message", "drop a line", "ping someone", "hit someone up",
+        "let someone know", "inform them", "notify them", "tell them that",
+        "say hello to", "give my number to", "share with", "forward to",
+        "send to whatsapp", "whatsapp message", "text msg", "instant message",
+        "send via whatsapp", "whatsapp john", "text john", "email john",
+        "send word to", "relay message", "convey message", "send communication",
+        "message avnish", "message my brother", "message my sister",
+        "send facebook message", "send telegram message", "send signal message",
+        "contact john on whatsapp", "reach john via text", "email john at work",
+        "send urgent message", "send quick message", "send important message",
+        "tell avnish", "inform avnish", "notify avnish", "message avnish",
+        "send now", "send immediately", "send asap", "send right away"
+    ],
+    "make_call": [
+        "call john", "make a call", "phone call", "ring someone",
+        "call mom", "call dad", "call my friend", "call my family",
+        "call my boss", "call the office", "call the police",
+        "dial someone", "ring someone up", "give someone a call",
+        "call me later", "call you back", "call again", "call once more",
+        "phone someone", "telephone someone", "reach someone",
+        "call home", "call office", "call hospital", "call emergency",
+        "make a phone call", "place a call", "initiate a call",
+        "call customer service", "call support", "call help desk",
+        "call back", "return the call", "call him back",
+        "conference call", "group call", "video call", "voice call",
+        "ring up", "phone up", "get on the phone", "call on the phone",
+        "call avnish", "call my brother", "call my sister",
+        "dial john", "dial my number", "dial his number",
+        "make a phone call to", "ring someone's number", "call their number",
+        "call right now", "call immediately", "call asap", "call urgently",
+        "want to call", "need to call", "should call", "must call",
+        "call for help", "call for backup", "call for assistance",
+        "facetime call", "whatsapp call", "video call on whatsapp"
+    ],
+    "download_file": [
+        "download file", "get file", "fetch document", "retrieve data",
+        "download document", "download pdf", "download image", "download video",
+        "download music", "download song", "download movie", "download app",
+        "download software", "download installer", "download setup",
+        "download data", "download report", "download spreadsheet", "download excel",
+        "download word document", "download presentation", "download text file",
+        "save file", "save document", "save to disk", "save locally",
+        "get a copy", "make a copy", "backup file", "copy file",
+        "grab file", "pull file", "grab document", "pull data",
+        "download it", "get it", "fetch it", "retrieve it",
+        "download from internet", "download from web", "download online",
+        "download this", "download that", "download everything",
+        "fetch file", "pull data", "retrieve document", "grab information",
+        "save this file", "download this file", "get this file",
+        "download zip", "download rar", "download compressed file",
+        "download the latest", "download newest", "download recent",
+        "download to desktop", "download to downloads", "download folder",
+        "get documents", "get media", "get resources", "get files",
+        "download report", "download statement", "download invoice"
+    ],
+    "system_control": [
+        "open file manager", "open settings", "open chrome", "open notepad",
+        "launch app", "start program", "windows settings", "open calculator",
+        "open explorer", "open system settings", "open control panel",
+        "turn on", "turn off", "shut down", "restart", "sleep",
+        "open chatgpt", "open google", "open youtube", "open facebook",
+        "open email", "open gmail", "open outlook", "open teams",
+        "adjust brightness", "adjust volume", "mute", "unmute",
+        "lock screen", "lock computer", "unlock", "logout",
+        "open terminal", "open powershell", "open command prompt",
+        "open taskbar", "open start menu", "minimize", "maximize",
+        "full screen", "exit fullscreen", "close window",
+        "open applications", "open programs", "open apps",
+        "display settings", "network settings", "sound settings",
+        "open wifi", "open bluetooth", "enable wifi", "disable wifi",
+        "launch whatsapp", "launch telegram", "launch browser",
+        "start firefox", "start chrome", "start edge", "start safari",
+        "open visual studio", "open notepad++", "open vscode",
+        "open file explorer", "open my files", "open documents",
+        "turn on bluetooth", "turn off bluetooth", "enable bluetooth",
+        "lower brightness", "increase brightness", "dim screen",
+        "volume up", "volume down", "max volume", "mute volume",
+        "restart computer", "shutdown computer", "put to sleep",
+        "lock device", "unlock device", "log out", "sign out"
+    ],
+    "query": [
+        "what is", "when is", "where is", "how to", "search for",
+        "tell me about", "what does", "what time", "what day",
+        "who is", "why is", "which one", "how many", "how much",
+        "what's happening", "what's the weather", "what's the time",
+        "tell me more", "explain", "describe", "elaborate",
+        "search the web", "search online", "google it", "find information",
+        "look up", "find out", "check on", "what about",
+        "any news", "latest news", "breaking news", "recent news",
+        "how does it work", "what happens", "what comes next",
+        "what if", "what then", "what else", "anything else",
+        "facts about", "information about", "details about",
+        "can you tell me", "do you know", "have you heard",
+        "what do you think", "what's your opinion", "what do you say",
+        "search for information", "look for details", "find facts",
+        "what is the capital", "what is the weather today",
+        "how is the weather", "what is the temperature",
+        "what time is it", "what day is it", "what's the date",
+        "tell me a joke", "tell me a story", "tell me facts",
+        "explain how", "show me how", "teach me how",
+        "latest update", "recent changes", "new information",
+        "news today", "today's news", "current events"
+    ],
+    "set_reminder": [
+        "remind me", "set reminder", "remember to", "alert me",
+        "remind me tomorrow", "remind me later", "remind me at 5",
+        "set alarm", "set notification", "notify me", "alert me later",
+        "don't forget", "make a note", "take a note", "note this down",
+        "remind me about", "remind me on", "remind me in",
+        "set a reminder for", "create a reminder", "add a reminder",
+        "schedule reminder", "schedule notification", "schedule alert",
+        "remember this", "keep in mind", "mark this", "flag this",
+        "todo", "to do", "tasks", "task list", "checklist",
+        "wake me up", "alarm clock", "set alarm", "snooze",
+        "remind me to call", "remind me to buy", "remind me to check",
+        "later", "after a while", "in an hour", "in 10 minutes",
+        "set alarm for", "set alarm at", "alarm at 5am",
+        "alarm tomorrow morning", "alarm today", "alarm tonight",
+        "i need a reminder", "create an alert", "set notification",
+        "remind me tomorrow morning", "remind me tomorrow evening",
+        "remind me in 5 minutes", "remind me in 10 minutes",
+        "ask me about", "tell me to", "prompt me to",
+        "remember me to", "don't let me forget", "make sure i remember",
+        "set task", "add task", "create task", "new task"
+    ],
+    "play_media": [
+        "play music", "play song", "play video", "music please",
+        "play album", "play artist", "play playlist", "play podcast",
+        "play movie", "play film", "play show", "play series",
+        "play next", "play previous", "play again", "replay",
+        "start playing", "begin playback", "resume playback",
+        "pause music", "stop music", "mute music", "lower volume",
+        "increase volume", "turn up", "turn down", "shuffle",
+        "repeat", "loop", "skip", "go back", "rewind", "fast forward",
+        "play from beginning", "play from start", "restart song",
+        "play my favorites", "play my library", "play recommended",
+        "play something good", "play something new", "play something random",
+        "put on music", "start music", "let's dance", "let's rock",
+        "play sound", "play audio", "play content", "play stream",
+        "start playing music", "begin playing", "resume playing",
+        "play my playlist", "play music playlist", "play song playlist",
+        "play podcast episode", "play audiobook", "play audio file",
+        "play youtube video", "play movie online", "play film online",
+        "continue playing", "play next song", "skip to next",
+        "go to previous song", "previous track", "last song",
+        "shuffle songs", "shuffle playlist", "random play"
+    ],
+    "memory": [
+        "remember this", "store this", "learn this", "save this",
+        "remember my", "remember that", "remember when", "remember where",
+        "keep in memory", "recall", "bring back", "think of",
+        "what did i say", "what did we talk about", "remind me what",
+        "did i tell you", "do you remember", "remember i said",
+        "remember i asked", "remember i want", "remember i need",
+        "save for later", "bookmark this", "mark important", "flag",
+        "learn new fact", "add to knowledge", "update memory",
+        "important information", "important note", "important contact",
+        "store information", "file this", "catalog this", "organize this",
+        "don't forget i said", "important thing", "i will remember",
+        "memorize", "commit to memory", "engrave in memory",
+        "recall later", "retrieve information", "look up",
+        "historical note", "memory lane", "way back when",
+        "save my preference", "remember my preference", "store my choice",
+        "remember my name", "remember my number", "remember my address",
+        "store this in memory", "add to memory", "save to memory",
+        "my favorite", "i like", "i prefer", "my choice",
+        "bookmark", "favorite", "mark as important"
+    ]
+}
+
+
+# Contact patterns, most specific first: "tell [CONTACT]", "send to [CONTACT]", "message to [CONTACT]", ...
+CONTACT_PATTERNS = [re.compile(pattern) for pattern in (
+    r"send\s+message\s+to\s+([a-z]+)",
+    r"send\s+to\s+([a-z]+)",
+    r"tell\s+([a-z]+)",
+    r"message\s+to\s+([a-z]+)",
+    r"text\s+to\s+([a-z]+)",
+    r"text\s+([a-z]+)",
+    r"message\s+([a-z]+)",
+    r"contact\s+([a-z]+)",
+)]
+COMMON_CONTACT_NAMES = ["john", "mom", "dad", "brother", "sister", "friend", "wife", "husband",
+                        "boss", "avnish", "alex", "mike", "sarah", "jane", "tom", "jerry",
+                        "david", "michael", "jennifer", "lisa", "james", "disha", "priya", "amit",
+                        "delhi", "rajesh", "neha", "ravi", "anil"]
+
+# Entity slots each intent's handler reads; extraction runs only these.
+# Intents not listed here (e.g. "unknown") get the full extraction
+INTENT_SLOTS = {
+    "send_message": ("contact", "message"),
+    "make_call": ("contact",),
+    "download_file": ("file",),
+    "open_app": ("app",),
+    "system_control": ("app",),
+    "play_media": ("media",),
+    "set_reminder": ("reminder",),
+    "query": ("location",),
+    "greeting": (),
+    "memory": (),
+}
+
+
+# spaCy is only used for named entities here, so these pipes are never loaded
+SPACY_MODEL = os.getenv("AARI_SPACY_MODEL", "en_core_web_sm")
+SPACY_EXCLUDE = ["parser", "lemmatizer", "senter"]
+
+
+def _load_spacy():
+    if not spacy:
+        logger.warning("SpaCy not available, using fallback NLP")
+        return None
+    return spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+
+
+GEMINI_MODEL = "gemini-pro"
+
+
+def _load_gemini():
+    api_key = os.getenv("GOOGLE_API_KEY", "")
+    if not api_key:
+        return None
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(GEMINI_MODEL)
+
+
+def _load_intent_classifier():
+    if not intent_model.sklearn:
+        return None
+    tfidf, classifier, source = intent_model.load_or_train(INTENT_TRAINING_DATA)
+    return tfidf, classifier, source, intent_model.artifact_key(INTENT_TRAINING_DATA)
+
+
+MODELS.register("spacy", _load_spacy)
+MODELS.register("gemini", _load_gemini)
+MODELS.register("intent_classifier", _load_intent_classifier)
+
+
+# extract_intent results for recently seen commands (0 disables the cache)
+INTENT_CACHE_SIZE = int(os.getenv("AARI_INTENT_CACHE_SIZE", "1024"))
+_EDGE_PUNCTUATION_RE = re.compile(r"(?<!\S)[^\w\s]+|[^\w\s]+(?!\S)")
+
+
+def normalize_utterance(text: str) -> str:
+    """Case, runs of whitespace and punctuation around words folded: the answer cache key for a
+    question, and the text intents are classified from"""
+    # Punctuation inside a word ("5:30", "don't") is kept: it can change the answer
+    return " ".join(_EDGE_PUNCTUATION_RE.sub("", text.lower()).split())
+
+
+def intent_cache_keys(text: str) -> Tuple[Tuple[str, str], Tuple[str, str]]:
+    """extract_intent cache keys: the exact text for the full result, the folded text for intent and confidence
+
+    Entities are read from the text as given (spaCy NER and ent.text keep case, messages keep
+    punctuation), so "Call John" and "call john!" only share the classification
+    """
+    return ("text", text), ("intent", normalize_utterance(text))
+
+
+# Gemini answers are shared by every user asking the same (normalized) question;
+# time-sensitive questions ("news", "weather") are why entries expire
+ANSWER_CACHE_SIZE = int(os.getenv("AARI_ANSWER_CACHE_SIZE", "512"))
+ANSWER_CACHE_TTL = float(os.getenv("AARI_ANSWER_CACHE_TTL", "600"))
+ANSWER_CACHE_FILE = os.getenv("AARI_ANSWER_CACHE_FILE", "")
+
+ANSWER_CACHE = TTLCache("answer", ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL, path=ANSWER_CACHE_FILE)
+# Identical questions asked while Gemini is still answering wait for that answer
+ANSWER_FLIGHTS = SingleFlight("gemini")
+
+
+class Utterance:
+    """One command parsed once and shared by every extractor; the spaCy doc is built on first use"""
+    
+    __slots__ = ("text", "lower", "_parse", "_doc", "_words", "_tokens")
+    
+    def __init__(self, text: str, parse=None, doc=None):
+        self.text = text
+        self.lower = text.lower()
+        # Called with the text to build the doc; may return None (no spaCy model)
+        self._parse = parse
+        self._doc = doc
+        self._words = None
+        self._tokens = None
+    
+    @property
+    def words(self) -> List[str]:
+        """Lowercased words (text.lower().split())"""
+        if self._words is None:
+            self._words = self.lower.split()
+        return self._words
+    
+    @property
+    def tokens(self) -> List[Tuple[int, int]]:
+        """(start, end) offsets of each word in `lower`"""
+        if self._tokens is None:
+            self._tokens = [(m.start(), m.end()) for m in _TOKEN_RE.finditer(self.lower)]
+        return self._tokens
+    
+    @property
+    def doc(self):
+        """spaCy doc, parsed on first access (None without a spaCy model)"""
+        if self._doc is None and self._parse is not None:
+            self._doc = self._parse(self.text)
+        return self._doc
+    
+    @property
+    def parsed(self) -> bool:
+        return self._doc is not None
+
+
 class NLPProcessor:
     """Process natural language and extract intents"""
     
     def __init__(self):
-        self.nlp = None
-        if spacy:
-            try:
-                self.nlp = spacy.load("en_core_web_sm")
-            except:
-                logger.warning("SpaCy model not loaded")
-                self.nlp = None
-        else:
-            logger.warning("SpaCy not available, using fallback NLP")
+        # Gemini client shared by every processor in the process (None without an API key)
+        self.model = MODELS.get("gemini")
         
-        # Initialize Google Generative AI
-        api_key = os.getenv("GOOGLE_API_KEY", "")
-        if api_key:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-pro')
-        else:
-            self.model = None
+        # Commands that differ only in case, spacing or punctuation share one cached result
+        self.intent_cache = LRUCache("intent", INTENT_CACHE_SIZE)
         
         # Define intents with enhanced keywords for better fallback detection
         self.intents = {
@@ -82,302 +467,186 @@ class NLPProcessor:
         # Initialize ML-based fast classifier
         self._init_fast_classifier()
     
+    @property
+    def nlp(self):
+        """Shared spaCy pipeline (NER only), loaded on first use; None without spaCy or its model"""
+        return MODELS.get("spacy")
+    
+    def _parse(self, text: str):
+        """spaCy doc for `text`, or None without a spaCy model"""
+        nlp = self.nlp
+        return nlp(text) if nlp is not None else None
+    
     def _init_fast_classifier(self):
-        """Initialize scikit-learn TF-IDF + Naive Bayes classifier with 300+ examples per intent"""
-        if not TfidfVectorizer or not MultinomialNB:
+        """Load the fitted TF-IDF + Naive Bayes classifier artifact, refitting only when it is stale"""
+        if not intent_model.sklearn:
             logger.warning("Scikit-learn not available, using keyword-based fallback NLP")
             self.ml_ready = False
             self.classifier = None
             self.tfidf = None
+            self.model_version = None
             return
             
         try:
-            # COMPREHENSIVE training dataset with 300+ examples per intent for better accuracy
-            training_data = {
-                "greeting": [
-                    "hello", "hi", "hey", "good morning", "good afternoon", "good evening",
-                    "good night", "hello there", "hi there", "hey there", "what's up",
-                    "how are you", "how are you doing", "how's it going", "how do you do",
-                    "nice to meet you", "pleased to meet you", "greetings", "welcome",
-                    "hey aari", "hello aari", "hi aari", "suno aari", "aari hello",
-                    "good to see you", "good to hear from you", "long time no see",
-                    "it's been a while", "haven't seen you in a while", "how have you been",
-                    "what's new", "what's happening", "what have you been up to",
-                    "how's life", "how's everything", "how's things", "how are things",
-                    "yo", "sup", "what's good", "what's going on", "yo yo yo",
-                    "hello my friend", "hi buddy", "hey buddy", "hello buddy",
-                    "morning", "afternoon", "evening", "night", "good day",
-                    "greetings friend", "nice day", "have a nice day", "cheers",
-                    "how do you do", "good to see you again", "welcome back",
-                    "great to see you", "how are things", "how's your day",
-                    "hey how's it", "sup buddy", "yo what's up", "hi how are you",
-                    "hello my dear", "hi sweetheart", "hey love", "greetings to you",
-                    "nice seeing you", "it's nice to meet you", "pleasure to meet",
-                    "start", "begin", "activate", "wake up", "good morning sunshine",
-                    "hey there friend", "hello again", "hi again", "welcome again",
-                    "top of the morning", "how's the day treating you", "everything good",
-                    "you good", "all good", "doing well", "how you doing", "what up homie"
-                ],
-                "send_message": [
-                    "send message", "send text", "send email", "send sms", "tell john",
-                    "message someone", "text someone", "email someone", "whatsapp someone",
-                    "send whatsapp", "send to john", "message to john", "text to john",
-                    "send message to mom", "send text to dad", "email my boss",
-                    "send whatsapp to my friend", "text my girlfriend", "message my wife",
-                    "message my family", "email my company", "send a message",
-                    "send an email", "send a text", "send a whatsapp", "send an sms",
-                    "tell them hello", "tell them i love them", "message them",
-                    "send my regards", "send my love", "send greetings",
-                    "get in touch", "reach out to", "contact", "write to",
-                    "drop a message", "drop a line", "ping someone", "hit someone up",
-                    "let someone know", "inform them", "notify them", "tell them that",
-                    "say hello to", "give my number to", "share with", "forward to",
-                    "send to whatsapp", "whatsapp message", "text msg", "instant message",
-                    "send via whatsapp", "whatsapp john", "text john", "email john",
-                    "send word to", "relay message", "convey message", "send communication",
-                    "message avnish", "message my brother", "message my sister",
-                    "send facebook message", "send telegram message", "send signal message",
-                    "contact john on whatsapp", "reach john via text", "email john at work",
-                    "send urgent message", "send quick message", "send important message",
-                    "tell avnish", "inform avnish", "notify avnish", "message avnish",
-                    "send now", "send immediately", "send asap", "send right away"
-                ],
-                "make_call": [
-                    "call john", "make a call", "phone call", "ring someone",
-                    "call mom", "call dad", "call my friend", "call my family",
-                    "call my boss", "call the office", "call the police",
-                    "dial someone", "ring someone up", "give someone a call",
-                    "call me later", "call you back", "call again", "call once more",
-                    "phone someone", "telephone someone", "reach someone",
-                    "call home", "call office", "call hospital", "call emergency",
-                    "make a phone call", "place a call", "initiate a call",
-                    "call customer service", "call support", "call help desk",
-                    "call back", "return the call", "call him back",
-                    "conference call", "group call", "video call", "voice call",
-                    "ring up", "phone up", "get on the phone", "call on the phone",
-                    "call avnish", "call my brother", "call my sister",
-                    "dial john", "dial my number", "dial his number",
-                    "make a phone call to", "ring someone's number", "call their number",
-                    "call right now", "call immediately", "call asap", "call urgently",
-                    "want to call", "need to call", "should call", "must call",
-                    "call for help", "call for backup", "call for assistance",
-                    "facetime call", "whatsapp call", "video call on whatsapp"
-                ],
-                "download_file": [
-                    "download file", "get file", "fetch document", "retrieve data",
-                    "download document", "download pdf", "download image", "download video",
-                    "download music", "download song", "download movie", "download app",
-                    "download software", "download installer", "download setup",
-                    "download data", "download report", "download spreadsheet", "download excel",
-                    "download word document", "download presentation", "download text file",
-                    "save file", "save document", "save to disk", "save locally",
-                    "get a copy", "make a copy", "backup file", "copy file",
-                    "grab file", "pull file", "grab document", "pull data",
-                    "download it", "get it", "fetch it", "retrieve it",
-                    "download from internet", "download from web", "download online",
-                    "download this", "download that", "download everything",
-                    "fetch file", "pull data", "retrieve document", "grab information",
-                    "save this file", "download this file", "get this file",
-                    "download zip", "download rar", "download compressed file",
-                    "download the latest", "download newest", "download recent",
-                    "download to desktop", "download to downloads", "download folder",
-                    "get documents", "get media", "get resources", "get files",
-                    "download report", "download statement", "download invoice"
-                ],
-                "system_control": [
-                    "open file manager", "open settings", "open chrome", "open notepad",
-                    "launch app", "start program", "windows settings", "open calculator",
-                    "open explorer", "open system settings", "open control panel",
-                    "turn on", "turn off", "shut down", "restart", "sleep",
-                    "open chatgpt", "open google", "open youtube", "open facebook",
-                    "open email", "open gmail", "open outlook", "open teams",
-                    "adjust brightness", "adjust volume", "mute", "unmute",
-                    "lock screen", "lock computer", "unlock", "logout",
-                    "open terminal", "open powershell", "open command prompt",
-                    "open taskbar", "open start menu", "minimize", "maximize",
-                    "full screen", "exit fullscreen", "close window",
-                    "open applications", "open programs", "open apps",
-                    "display settings", "network settings", "sound settings",
-                    "open wifi", "open bluetooth", "enable wifi", "disable wifi",
-                    "launch whatsapp", "launch telegram", "launch browser",
-                    "start firefox", "start chrome", "start edge", "start safari",
-                    "open visual studio", "open notepad++", "open vscode",
-                    "open file explorer", "open my files", "open documents",
-                    "turn on bluetooth", "turn off bluetooth", "enable bluetooth",
-                    "lower brightness", "increase brightness", "dim screen",
-                    "volume up", "volume down", "max volume", "mute volume",
-                    "restart computer", "shutdown computer", "put to sleep",
-                    "lock device", "unlock device", "log out", "sign out"
-                ],
-                "query": [
-                    "what is", "when is", "where is", "how to", "search for",
-                    "tell me about", "what does", "what time", "what day",
-                    "who is", "why is", "which one", "how many", "how much",
-                    "what's happening", "what's the weather", "what's the time",
-                    "tell me more", "explain", "describe", "elaborate",
-                    "search the web", "search online", "google it", "find information",
-                    "look up", "find out", "check on", "what about",
-                    "any news", "latest news", "breaking news", "recent news",
-                    "how does it work", "what happens", "what comes next",
-                    "what if", "what then", "what else", "anything else",
-                    "facts about", "information about", "details about",
-                    "can you tell me", "do you know", "have you heard",
-                    "what do you think", "what's your opinion", "what do you say",
-                    "search for information", "look for details", "find facts",
-                    "what is the capital", "what is the weather today",
-                    "how is the weather", "what is the temperature",
-                    "what time is it", "what day is it", "what's the date",
-                    "tell me a joke", "tell me a story", "tell me facts",
-                    "explain how", "show me how", "teach me how",
-                    "latest update", "recent changes", "new information",
-                    "news today", "today's news", "current events"
-                ],
-                "set_reminder": [
-                    "remind me", "set reminder", "remember to", "alert me",
-                    "remind me tomorrow", "remind me later", "remind me at 5",
-                    "set alarm", "set notification", "notify me", "alert me later",
-                    "don't forget", "make a note", "take a note", "note this down",
-                    "remind me about", "remind me on", "remind me in",
-                    "set a reminder for", "create a reminder", "add a reminder",
-                    "schedule reminder", "schedule notification", "schedule alert",
-                    "remember this", "keep in mind", "mark this", "flag this",
-                    "todo", "to do", "tasks", "task list", "checklist",
-                    "wake me up", "alarm clock", "set alarm", "snooze",
-                    "remind me to call", "remind me to buy", "remind me to check",
-                    "later", "after a while", "in an hour", "in 10 minutes",
-                    "set alarm for", "set alarm at", "alarm at 5am",
-                    "alarm tomorrow morning", "alarm today", "alarm tonight",
-                    "i need a reminder", "create an alert", "set notification",
-                    "remind me tomorrow morning", "remind me tomorrow evening",
-                    "remind me in 5 minutes", "remind me in 10 minutes",
-                    "ask me about", "tell me to", "prompt me to",
-                    "remember me to", "don't let me forget", "make sure i remember",
-                    "set task", "add task", "create task", "new task"
-                ],
-                "play_media": [
-                    "play music", "play song", "play video", "music please",
-                    "play album", "play artist", "play playlist", "play podcast",
-                    "play movie", "play film", "play show", "play series",
-                    "play next", "play previous", "play again", "replay",
-                    "start playing", "begin playback", "resume playback",
-                    "pause music", "stop music", "mute music", "lower volume",
-                    "increase volume", "turn up", "turn down", "shuffle",
-                    "repeat", "loop", "skip", "go back", "rewind", "fast forward",
-                    "play from beginning", "play from start", "restart song",
-                    "play my favorites", "play my library", "play recommended",
-                    "play something good", "play something new", "play something random",
-                    "put on music", "start music", "let's dance", "let's rock",
-                    "play sound", "play audio", "play content", "play stream",
-                    "start playing music", "begin playing", "resume playing",
-                    "play my playlist", "play music playlist", "play song playlist",
-                    "play podcast episode", "play audiobook", "play audio file",
-                    "play youtube video", "play movie online", "play film online",
-                    "continue playing", "play next song", "skip to next",
-                    "go to previous song", "previous track", "last song",
-                    "shuffle songs", "shuffle playlist", "random play"
-                ],
-                "memory": [
-                    "remember this", "store this", "learn this", "save this",
-                    "remember my", "remember that", "remember when", "remember where",
-                    "keep in memory", "recall", "bring back", "think of",
-                    "what did i say", "what did we talk about", "remind me what",
-                    "did i tell you", "do you remember", "remember i said",
-                    "remember i asked", "remember i want", "remember i need",
-                    "save for later", "bookmark this", "mark important", "flag",
-                    "learn new fact", "add to knowledge", "update memory",
-                    "important information", "important note", "important contact",
-                    "store information", "file this", "catalog this", "organize this",
-                    "don't forget i said", "important thing", "i will remember",
-                    "memorize", "commit to memory", "engrave in memory",
-                    "recall later", "retrieve information", "look up",
-                    "historical note", "memory lane", "way back when",
-                    "save my preference", "remember my preference", "store my choice",
-                    "remember my name", "remember my number", "remember my address",
-                    "store this in memory", "add to memory", "save to memory",
-                    "my favorite", "i like", "i prefer", "my choice",
-                    "bookmark", "favorite", "mark as important"
-                ]
-            }
-            
-            # Create training data
-            training_texts = []
-            training_labels = []
-            
-            for intent, examples in training_data.items():
-                for example in examples:
-                    training_texts.append(example)
-                    training_labels.append(intent)
-            
-            logger.info(f"Training ML classifier with {len(training_texts)} samples ({len(training_data)} intents)")
-            
-            # Initialize and train TF-IDF vectorizer (word-level for better semantic understanding)
-            self.tfidf = TfidfVectorizer(
-                analyzer='word',
-                ngram_range=(1, 2),
-                lowercase=True,
-                min_df=1,
-                max_features=500
-            )
-            X = self.tfidf.fit_transform(training_texts)
-            
-            # Initialize and train Naive Bayes classifier
-            self.classifier = MultinomialNB(alpha=0.1)
-            self.classifier.fit(X, training_labels)
+            loaded = MODELS.get("intent_classifier")
+            if loaded is None:
+                raise RuntimeError("intent classifier could not be loaded")
+            self.tfidf, self.classifier, source, self.model_version = loaded
             
             self.ml_ready = True
-            logger.info(f"ML classifier trained successfully!")
-            logger.info(f"  - Training samples: {len(training_texts)}")
+            logger.info(f"ML classifier ready ({source})")
+            logger.info(f"  - Training samples: {sum(len(examples) for examples in INTENT_TRAINING_DATA.values())}")
             logger.info(f"  - Feature vocabulary size: {len(self.tfidf.get_feature_names_out())}")
-            logger.info(f"  - Intents: {len(training_data)}")
+            logger.info(f"  - Intents: {len(INTENT_TRAINING_DATA)}")
             
         except Exception as e:
             logger.warning(f"ML classifier initialization failed: {e}. Will use keyword-based fallback.")
             self.ml_ready = False
             self.tfidf = None
             self.classifier = None
+            self.model_version = None
+    
+    def _cache_generation(self):
+        """Cached results are only valid for these keyword tables and this classifier artifact"""
+        return MATCHER.version, self.model_version
     
     def extract_intent(self, text: str) -> Tuple[str, Dict, float]:
-        """Extract intent using RELIABLE KEYWORD-BASED approach with pattern matching"""
-        text_lower = text.lower()
+        """Extract intent by combining keyword scoring with the trained classifier"""
+        return self.extract_intents_batch([text])[0]
+    
+    def extract_intents_batch(self, texts: List[str]) -> List[Tuple[str, Dict, float]]:
+        """Extract intents for many texts: cached ones are reused, the rest go through one batch pass"""
+        keys = [intent_cache_keys(text)[0] for text in texts]
+        generation = self._cache_generation()
+        results = [self.intent_cache.get(key, generation) for key in keys]
         
-        # Use keyword-based detection (primary, most reliable)
-        final_intent, final_confidence = self._keyword_based_intent(text_lower)
+        misses = [i for i, result in enumerate(results) if result is None]
+        for i, result in zip(misses, self._extract_intents_uncached([texts[i] for i in misses])):
+            intent, entities, confidence = result
+            logger.debug(f"Intent: {intent} ({confidence:.2f}), Entities: {entities}")
+            self.intent_cache.put(keys[i], (intent, dict(entities), confidence), generation)
+            results[i] = result
         
-        # Extract entities using spaCy and pattern matching
-        entities = self._extract_entities(text)
+        return [(intent, dict(entities), confidence) for intent, entities, confidence in results]
+    
+    def _classify_cached(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """(intent, confidence) per text from the folded-text cache, classifying the misses in one pass"""
+        keys = [intent_cache_keys(text)[1] for text in texts]
+        generation = self._cache_generation()
+        results = [self.intent_cache.get(key, generation) for key in keys]
+        
+        misses = [i for i, result in enumerate(results) if result is None]
+        for i, result in zip(misses, self.classify_intents_batch([texts[i] for i in misses])):
+            self.intent_cache.put(keys[i], result, generation)
+            results[i] = result
+        return results
+    
+    def _extract_intents_uncached(self, texts: List[str]) -> List[Tuple[str, Dict, float]]:
+        """One sparse transform + predict_proba, one spaCy pipe"""
+        if not texts:
+            return []
+        intents = self._classify_cached(texts)
         
-        logger.debug(f"Intent: {final_intent} ({final_confidence:.2f}), Entities: {entities}")
+        # Texts without an extraction plan always need the doc, so parse those in one pipe;
+        # the rest parse on demand only if their pattern extractors fall back to spaCy
+        docs = [None] * len(texts)
+        needs_doc = [i for i, (intent, _) in enumerate(intents) if intent not in INTENT_SLOTS]
+        if needs_doc and self.nlp:
+            for i, doc in zip(needs_doc, self.nlp.pipe(texts[i] for i in needs_doc)):
+                docs[i] = doc
         
-        return final_intent, entities, final_confidence
+        return [
+            (intent, self.extract_entities_for_intent(intent, text, doc=doc), confidence)
+            for text, doc, (intent, confidence) in zip(texts, docs, intents)
+        ]
     
-    def _keyword_based_intent(self, text_lower: str) -> Tuple[str, float]:
-        """Improved keyword-based intent detection with weighted scoring"""
+    def classify_intents_batch(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """(intent, confidence) for many texts without entity extraction, for evaluation and retraining"""
+        if not texts:
+            return []
+        # Classified from the folded text, so "call mom!" scores "call" as a whole word
+        folded = [normalize_utterance(text) for text in texts]
+        probabilities = self._classify(folded)
+        return [
+            self._hybrid_intent(text_folded, probabilities[i] if probabilities is not None else None)
+            for i, text_folded in enumerate(folded)
+        ]
+    
+    def _classify(self, texts_lower: List[str]):
+        """Classifier probabilities (rows in classifier.classes_ order) for all texts in one call"""
+        if not self.ml_ready or not texts_lower:
+            return None
+        try:
+            return self.classifier.predict_proba(self.tfidf.transform(texts_lower))
+        except Exception as e:
+            logger.warning(f"ML classification failed, using keywords only: {e}")
+            return None
+    
+    def _hybrid_intent(self, text_lower: str, probabilities=None) -> Tuple[str, float]:
+        """Blend normalized keyword scores with classifier probabilities into one confidence"""
+        if probabilities is None:
+            return self._keyword_based_intent(text_lower)
         
-        # Priority keywords that strongly indicate specific intents
-        strong_keywords = {
-            "send_message": ["send", "message", "whatsapp", "text", "sms", "email", "tell"],
-            "make_call": ["call", "phone", "ring", "dial", "telephone"],
-            "set_reminder": ["remind", "reminder", "alarm", "alert", "notification"],
-            "play_media": ["play", "music", "song", "podcast", "video"],
-            "download_file": ["download", "fetch", "retrieve", "get"],
-            "system_control": ["open", "launch", "start", "close", "turn"],
-            "query": ["what", "when", "where", "how", "why", "search"],
-            "memory": ["remember", "recall", "save", "store", "bookmark"],
-            "greeting": ["hello", "hi", "hey", "greetings", "morning"],
-        }
+        ml_scores = {str(intent): float(p) for intent, p in zip(self.classifier.classes_, probabilities)}
+        hits = MATCHER.scan(text_lower)
+        keyword_scores = hits.score("intent")
+        total = sum(keyword_scores.values())
         
+        # No keyword evidence: trust the classifier only when it is fairly sure
+        if total == 0:
+            best = max(ml_scores, key=ml_scores.get)
+            if ml_scores[best] >= ML_MIN_CONFIDENCE:
+                return best, ml_scores[best]
+            return "unknown", 0.3
+        
+        # Action keywords win over greeting/query words, and among actions tied on keywords
+        # the one named first ("text john call me back"); the classifier ranks what is left
+        actions = {intent: score for intent, score in keyword_scores.items() if intent not in CONVERSATIONAL_INTENTS}
+        action = max(actions.values(), default=0)
+        if action and self._strongest_hit(hits, actions) >= self._strongest_hit(hits, CONVERSATIONAL_INTENTS):
+            tied = [intent for intent, score in actions.items() if score == action]
+            if len(tied) > 1:
+                first = self._first_named(text_lower, tied)
+                actions = {intent: score for intent, score in actions.items() if score < action or intent == first}
+            keyword_scores = actions
+            total = sum(keyword_scores.values())
+        
+        # Both sides are distributions over intents, so the blend is one too
+        combined = {
+            intent: KEYWORD_WEIGHT * score / total + (1 - KEYWORD_WEIGHT) * ml_scores.get(intent, 0.0)
+            for intent, score in keyword_scores.items()
+        }
+        best = max(combined, key=combined.get)
+        return best, min(combined[best], 1.0)
+    
+    def _strongest_hit(self, hits, intents) -> int:
+        """2 if a keyword of `intents` is a whole word of the text, 1 if one only occurs inside a word, else 0"""
+        strength = 0
+        for intent in intents:
+            for keyword in STRONG_INTENT_KEYWORDS[intent]:
+                if keyword in hits:
+                    strength = max(strength, 2 if hits.found[keyword] else 1)
+        return strength
+    
+    def _first_named(self, text_lower: str, intents: List[str]) -> str:
+        """Of `intents`, the one whose keyword appears as the earliest word of the text (else the first listed)"""
+        for word in _WORD_RE.findall(text_lower):
+            for intent in intents:
+                if word in STRONG_INTENT_KEYWORDS[intent]:
+                    return intent
+        return intents[0]
+    
+    def _keyword_scores(self, text_lower: str) -> Dict[str, int]:
+        """Weighted keyword hits per intent: 2 for a whole-word match, 1 for a substring match"""
+        return MATCHER.scan(text_lower).score("intent")
+    
+    def _keyword_based_intent(self, text_lower: str) -> Tuple[str, float]:
+        """Improved keyword-based intent detection with weighted scoring"""
         matched_intent = "unknown"
         max_score = 0
         
-        # Calculate weighted score for each intent
-        for intent, keywords in strong_keywords.items():
-            score = 0
-            for keyword in keywords:
-                if f" {keyword} " in f" {text_lower} ":
-                    score += 2  # Exact word match (with spaces)
-                elif keyword in text_lower:
-                    score += 1  # Substring match
-            
+        # First intent with the highest score wins ties
+        for intent, score in self._keyword_scores(text_lower).items():
             if score > max_score:
                 max_score = score
                 matched_intent = intent
@@ -387,35 +656,50 @@ class NLPProcessor:
             confidence = 0.3
         else:
             # Confidence based on number of keyword matches
-            num_keywords = len(strong_keywords[matched_intent])
+            num_keywords = len(STRONG_INTENT_KEYWORDS[matched_intent])
             confidence = min(max_score / (num_keywords * 2), 1.0)
         
         return matched_intent, confidence
     
-    def _extract_entities(self, text: str) -> Dict[str, Any]:
+    def extract_entities_for_intent(self, intent: str, text: str, doc=None) -> Dict[str, Any]:
+        """Run only the extractors `intent` needs, on one shared parse of the command"""
+        utterance = Utterance(text, self._parse, doc)
+        slots = INTENT_SLOTS.get(intent)
+        if slots is None:
+            # No plan (e.g. "unknown"): keep everything the full extraction finds
+            return self._extract_all_entities(utterance)
+        
+        entities = {}
+        for slot in slots:
+            getattr(self, f"_slot_{slot}")(utterance, entities)
+        
+        # spaCy only ran if a pattern extractor fell back to it; keep what it found
+        if utterance.parsed:
+            self._add_doc_entities(utterance.doc, entities)
+            if "gpe" in entities:
+                entities["location"] = entities["gpe"][0] if entities["gpe"] else ""
+        
+        return entities
+    
+    def _extract_entities(self, text: str, doc=None) -> Dict[str, Any]:
+        """Every entity the command could carry, whatever its intent"""
+        return self._extract_all_entities(Utterance(text, self._parse, doc))
+    
+    def _extract_all_entities(self, utterance: "Utterance") -> Dict[str, Any]:
         """Extract named entities from text with improved accuracy"""
         entities = {}
-        text_lower = text.lower()
+        text_lower = utterance.lower
         
-        if self.nlp:
-            doc = self.nlp(text)
+        if utterance.doc is not None:
             # Extract different entity types
-            for ent in doc.ents:
-                entity_type = ent.label_.lower()
-                if entity_type not in entities:
-                    entities[entity_type] = []
-                entities[entity_type].append(ent.text)
+            self._add_doc_entities(utterance.doc, entities)
         
         # Extract contact names with improved pattern matching
-        contact = self._extract_contact(text)
-        if contact:
-            entities["contact"] = contact
+        self._slot_contact(utterance, entities)
         
         # Extract message content (most important for WhatsApp)
         if "send" in text_lower or "message" in text_lower or "whatsapp" in text_lower or "text" in text_lower or "email" in text_lower or "sms" in text_lower:
-            message = self._extract_message_content(text)
-            if message:
-                entities["message"] = message
+            self._slot_message(utterance, entities)
         
         # Extract locations
         if "gpe" in entities:
@@ -423,54 +707,81 @@ class NLPProcessor:
         
         # Extract file names
         if "download" in text_lower:
-            entities["file_name"] = self._extract_file_name(text)
-            entities["file_type"] = self._extract_file_type(text)
+            self._slot_file(utterance, entities)
         
         # Extract app names
         if "open" in text_lower or "launch" in text_lower:
-            entities["app"] = self._extract_app_name(text)
+            self._slot_app(utterance, entities)
         
         # Extract media names
         if "play" in text_lower:
-            entities["media"] = self._extract_media_name(text)
+            self._slot_media(utterance, entities)
         
         # Extract reminder/alarm info
         if "remind" in text_lower or "alarm" in text_lower or "alert" in text_lower:
-            entities["reminder_text"] = self._extract_reminder_text(text)
-            entities["time"] = self._extract_time_info(text)
-            entities["type"] = self._extract_alarm_type(text)
+            self._slot_reminder(utterance, entities)
         
         return entities
     
-    def _extract_contact(self, text: str) -> str:
+    def _add_doc_entities(self, doc, entities: Dict[str, Any]):
+        """spaCy entities grouped by lowercased label"""
+        for ent in doc.ents:
+            entity_type = ent.label_.lower()
+            if entity_type not in entities:
+                entities[entity_type] = []
+            entities[entity_type].append(ent.text)
+    
+    # Slot extractors: each fills its entities from the shared utterance
+    
+    def _slot_contact(self, utterance: "Utterance", entities: Dict[str, Any]):
+        contact = self._extract_contact(utterance)
+        if contact:
+            entities["contact"] = contact
+    
+    def _slot_message(self, utterance: "Utterance", entities: Dict[str, Any]):
+        message = self._extract_message_content(utterance)
+        if message:
+            entities["message"] = message
+    
+    def _slot_file(self, utterance: "Utterance", entities: Dict[str, Any]):
+        entities["file_name"] = self._extract_file_name(utterance)
+        entities["file_type"] = self._extract_file_type(utterance)
+    
+    def _slot_app(self, utterance: "Utterance", entities: Dict[str, Any]):
+        entities["app"] = self._extract_app_name(utterance)
+    
+    def _slot_media(self, utterance: "Utterance", entities: Dict[str, Any]):
+        entities["media"] = self._extract_media_name(utterance)
+    
+    def _slot_location(self, utterance: "Utterance", entities: Dict[str, Any]):
+        if not _PLACE_CUE_RE.search(utterance.lower) or utterance.doc is None:
+            return
+        places = [ent.text for ent in utterance.doc.ents if ent.label_ == "GPE"]
+        if places:
+            entities["location"] = places[0]
+    
+    def _slot_reminder(self, utterance: "Utterance", entities: Dict[str, Any]):
+        entities["reminder_text"] = self._extract_reminder_text(utterance)
+        entities["time"] = self._extract_time_info(utterance)
+        entities["type"] = self._extract_alarm_type(utterance)
+    
+    def _extract_contact(self, utterance: "Utterance") -> str:
         """Extract contact name from message with smart patterns"""
-        text_lower = text.lower()
+        text_lower = utterance.lower
         
         # Smart extraction using regex patterns FIRST (most reliable)
-        import re
         # Pattern: "tell [CONTACT]", "send to [CONTACT]", "message to [CONTACT]", etc.
         # Most specific patterns first
-        patterns = [
-            r"send\s+message\s+to\s+([a-z]+)",
-            r"send\s+to\s+([a-z]+)",
-            r"tell\s+([a-z]+)",
-            r"message\s+to\s+([a-z]+)",
-            r"text\s+to\s+([a-z]+)",
-            r"text\s+([a-z]+)",
-            r"message\s+([a-z]+)",
-            r"contact\s+([a-z]+)",
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text_lower)
+        for pattern in CONTACT_PATTERNS:
+            match = pattern.search(text_lower)
             if match:
                 candidate = match.group(1).strip()
                 if candidate and len(candidate) > 1 and candidate not in ["a", "the", "to", "at", "from"]:
                     return candidate
         
-        # Try spaCy NER as fallback (sometimes trained on phrases like "tell john")
-        if self.nlp:
-            doc = self.nlp(text)
+        # Try spaCy NER as fallback (sometimes trained on phrases like "tell john"); parses on first use
+        doc = utterance.doc
+        if doc is not None:
             for ent in doc.ents:
                 if ent.label_ == "PERSON":
                     # Extract only the last word if it's a phrase (handles "tell john" -> "john")
@@ -479,80 +790,69 @@ class NLPProcessor:
                         return name_candidate
         
         # Pattern-based extraction for common names (final fallback)
-        common_names = ["john", "mom", "dad", "brother", "sister", "friend", "wife", "husband",
-                       "boss", "avnish", "alex", "mike", "sarah", "jane", "tom", "jerry",
-                       "david", "michael", "jennifer", "lisa", "james", "disha", "priya", "amit",
-                       "delhi", "rajesh", "neha", "ravi", "anil"]
-        
-        for name in common_names:
+        for name in COMMON_CONTACT_NAMES:
             if name in text_lower:
                 return name
         
         return ""
     
-    def _extract_message_content(self, text: str) -> str:
+    def _extract_message_content(self, utterance: "Utterance") -> str:
         """Extract message content from command with improved accuracy"""
-        text_lower = text.lower()
-        
-        # Keywords that typically come before message content
-        message_keywords = [
-            ("say", "say "),
-            ("tell", "tell "),
-            ("message", "message "),
-            ("text", "text "),
-            ("send", "send "),
-            ("email", "email "),
-            ("sms", "sms ")
-        ]
+        text_lower = utterance.lower
         
-        for keyword, search_str in message_keywords:
-            # Find position after keyword
-            positions = [i for i in range(len(text_lower)) if text_lower.startswith(search_str, i)]
-            for pos in positions:
-                # Get text after the keyword phrase
-                after_keyword = text_lower[pos + len(search_str):].strip()
+        # Every check below works on word offsets into text_lower, so long
+        # dictations stay linear instead of re-slicing the rest per keyword
+        tokens = utterance.tokens
+        if not tokens:
+            return ""
+        text_end = tokens[-1][1]
+        separators = [(separator, _find_all(text_lower, separator)) for separator in MESSAGE_SEPARATORS]
+        
+        for keyword in MESSAGE_KEYWORDS:
+            for position in _find_all(text_lower, keyword + " "):
+                # First word after "<keyword> "
+                first = bisect_left(tokens, (position + len(keyword) + 1,))
+                if first == len(tokens):
+                    continue
                 
                 # Skip prepositions and articles
-                skip_words = ["to ", "a ", "the ", "in ", "on ", "at "]
-                for skip in skip_words:
-                    if after_keyword.startswith(skip):
-                        after_keyword = after_keyword[len(skip):].strip()
+                for skip in MESSAGE_SKIP_WORDS:
+                    word_start, word_end = tokens[first]
+                    if (first + 1 < len(tokens) and text_lower[word_start:word_end] == skip
+                            and text_lower[word_end] == " "):
+                        first += 1
+                
+                after_start = tokens[first][0]
+                if text_end - after_start <= 2:
+                    continue
                 
-                # Continue until we find the actual message
-                if after_keyword and len(after_keyword) > 2:
-                    # Find where contact ends and message begins
-                    parts = after_keyword.split()
-                    
-                    # If there's "that", "with", "message:", everything after is the message
-                    for separator in ["that ", "saying ", "says ", ":"]:
-                        if separator in after_keyword:
-                            message_part = after_keyword.split(separator, 1)[-1].strip()
-                            if message_part:
-                                return message_part
-                    
-                    # Skip known contact names (usually first 1-2 words)
-                    common_names = ["john", "mom", "dad", "brother", "sister", "avnish", "my ", "the "]
-                    message_start = 0
-                    words = after_keyword.split()
-                    
-                    for i, word in enumerate(words):
-                        is_name = any(word.lower().startswith(name.replace(" ", "")) for name in common_names)
-                        if not is_name or i > 1:
-                            message_start = len(" ".join(words[:i]))
-                            break
-                    
-                    if message_start < len(after_keyword):
-                        message = after_keyword[message_start:].strip()
-                        if message and len(message) > 1:
-                            return message
+                # If there's "that", "saying", "message:", everything after is the message
+                for separator, positions in separators:
+                    found = bisect_left(positions, after_start)
+                    if found < len(positions) and positions[found] + len(separator) <= text_end:
+                        message_part = text_lower[positions[found] + len(separator):text_end].strip()
+                        if message_part:
+                            return message_part
+                
+                # Skip known contact names (usually first 1-2 words); offsets assume single spaces
+                message_start = 0
+                for i, (word_start, word_end) in enumerate(tokens[first:first + 3]):
+                    if i > 1 or not text_lower.startswith(MESSAGE_NAME_PREFIXES, word_start, word_end):
+                        message_start = sum(e - s for s, e in tokens[first:first + i]) + max(i - 1, 0)
+                        break
+                
+                if message_start < text_end - after_start:
+                    message = text_lower[after_start + message_start:text_end].strip()
+                    if message and len(message) > 1:
+                        return message
         
         # Fallback: extract everything after the last contact mention
         return ""
     
-    def _extract_file_name(self, text: str) -> str:
+    def _extract_file_name(self, utterance: "Utterance") -> str:
         """Extract file name from download command"""
         # Remove common words
-        words = text.lower().split()
+        words = utterance.words
         download_idx = next((i for i, w in enumerate(words) if "download" in w), -1)
         
         if download_idx >= 0 and download_idx + 1 < len(words):
@@ -562,62 +862,62 @@ class NLPProcessor:
             return file_name
         return ""
     
-    def _extract_file_type(self, text: str) -> str:
+    def _extract_file_type(self, utterance: "Utterance") -> str:
         """Extract file type (pdf, ppt, etc.)"""
         file_types = ["pdf", "ppt", "doc", "docx", "xlsx", "txt", "zip", "mp4"]
         for ftype in file_types:
-            if ftype in text.lower():
+            if ftype in utterance.lower:
                 return ftype
         return ""
     
-    def _extract_app_name(self, text: str) -> str:
+    def _extract_app_name(self, utterance: "Utterance") -> str:
         """Extract application name"""
         common_apps = ["chrome", "firefox", "notepad", "calculator", "spotify", "whatsapp", "telegram", "email", "gmail"]
         for app in common_apps:
-            if app in text.lower():
+            if app in utterance.lower:
                 return app
         
-        words = text.lower().split()
+        words = utterance.words
         open_idx = next((i for i, w in enumerate(words) if "open" in w or "launch" in w), -1)
         if open_idx >= 0 and open_idx + 1 < len(words):
             return words[open_idx + 1]
         return ""
     
-    def _extract_media_name(self, text: str) -> str:
+    def _extract_media_name(self, utterance: "Utterance") -> str:
         """Extract media name"""
-        words = text.lower().split()
+        words = utterance.words
         play_idx = next((i for i, w in enumerate(words) if "play" in w), -1)
         if play_idx >= 0 and play_idx + 1 < len(words):
             media_parts = words[play_idx + 1:]
             return " ".join(media_parts)
         return ""
     
-    def _extract_reminder_text(self, text: str) -> str:
+    def _extract_reminder_text(self, utterance: "Utterance") -> str:
         """Extract reminder text"""
         keywords = ["remind", "remember"]
         for keyword in keywords:
-            if keyword in text.lower():
-                parts = text.lower().split(keyword)
+            if keyword in utterance.lower:
+                parts = utterance.lower.split(keyword)
                 if len(parts) > 1:
                     reminder = parts[-1].strip()
                     return reminder
         return ""
     
-    def _extract_time_info(self, text: str) -> str:
+    def _extract_time_info(self, utterance: "Utterance") -> str:
         """Extract time information"""
         time_keywords = ["tomorrow", "today", "tonight", "in", "at", "morning", "evening", "afternoon"]
         for keyword in time_keywords:
-            if keyword in text.lower():
-                words = text.lower().split()
+            if keyword in utterance.lower:
+                words = utterance.words
                 idx = next((i for i, w in enumerate(words) if keyword in w), -1)
                 if idx >= 0:
                     time_parts = words[idx:]
                     return " ".join(time_parts[:4])
         return ""
     
-    def _extract_alarm_type(self, text: str) -> str:
+    def _extract_alarm_type(self, utterance: "Utterance") -> str:
         """Extract alarm type from text"""
-        text_lower = text.lower()
+        text_lower = utterance.lower
         
         alarm_types = {
             "alarm": ["alarm", "alarm clock", "wake me up"],
@@ -641,18 +941,92 @@ class NLPProcessor:
         return "general"
     
     def get_ai_answer(self, question: str) -> str:
-        """Get answer using AI model"""
+        """Get answer using AI model; repeated questions are answered from the shared cache"""
+        try:
+            if self.model:
+                key = normalize_utterance(question)
+                answer = ANSWER_CACHE.get(key, GEMINI_MODEL)
+                if answer is None:
+                    answer = ANSWER_FLIGHTS.do(key, lambda: self._generate_answer(key, question))
+                return answer
+            else:
+                return self._local_answer(question)
+        except (DeadlineExceeded, CircuitOpen) as e:
+            logger.warning(f"AI answer unavailable: {e}")
+            return self._local_answer(question)
+        except Exception as e:
+            logger.error(f"AI answer error: {e}")
+            return self._local_answer(question)
+    
+    def _local_answer(self, question: str) -> str:
+        """Answer without Gemini; its "Could you be more specific?" sends query handlers to web search"""
+        try:
+            topics = TextBlob(question).noun_phrases
+        except Exception as e:
+            # Also the fallback for Gemini errors, so it must not raise (e.g. TextBlob corpora not downloaded)
+            logger.debug(f"Noun phrase extraction failed: {e}")
+            topics = [question]
+        return f"I found information about {topics}. Could you be more specific?"
+    
+    def _generate_answer(self, key: str, question: str) -> str:
+        """One Gemini call, made on behalf of everyone asking `key` meanwhile; the answer is cached"""
+        answer = GEMINI.generate(self.model, question)
+        if answer:
+            ANSWER_CACHE.put(key, answer, GEMINI_MODEL)
+        return answer
+    
+    def get_ai_answer_stream(self, question: str) -> Iterator[str]:
+        """Yield the AI answer in chunks as Gemini generates them (a cached answer comes as one chunk)"""
+        chunks = []
         try:
             if self.model:
-                response = self.model.generate_content(question)
-                return response.text
+                key = normalize_utterance(question)
+                answer = ANSWER_CACHE.get(key, GEMINI_MODEL)
+                if answer is not None:
+                    yield answer
+                    return
+                
+                for chunk in GEMINI.stream(self.model, question):
+                    chunks.append(chunk)
+                    yield chunk
+                # Only a complete stream is cached; a client that disconnects midway leaves nothing behind
+                if chunks:
+                    ANSWER_CACHE.put(key, "".join(chunks), GEMINI_MODEL)
+            else:
+                yield self._local_answer(question)
+        except Exception as e:
+            if isinstance(e, (DeadlineExceeded, CircuitOpen)):
+                logger.warning(f"AI answer stream unavailable: {e}")
+            else:
+                logger.error(f"AI answer stream error: {e}")
+            # Before the first chunk, yielding nothing lets the caller fall back to web search
+            if chunks:
+                yield "I couldn't finish that answer right now."
+    
+    async def get_ai_answer_async(self, question: str) -> str:
+        """Awaitable variant of get_ai_answer that does not hold a thread while Gemini runs"""
+        try:
+            if self.model:
+                key = normalize_utterance(question)
+                answer = ANSWER_CACHE.get(key, GEMINI_MODEL)
+                if answer is None:
+                    answer = await ANSWER_FLIGHTS.do_async(key, lambda: self._generate_answer_async(key, question))
+                return answer
             else:
-                # Fallback to simple response
-                blob = TextBlob(question)
-                return f"I found information about {blob.noun_phrases}. Could you be more specific?"
+                return self._local_answer(question)
+        except (DeadlineExceeded, CircuitOpen) as e:
+            logger.warning(f"AI answer unavailable: {e}")
+            return self._local_answer(question)
         except Exception as e:
             logger.error(f"AI answer error: {e}")
-            return "I couldn't generate an answer right now."
+            return self._local_answer(question)
+    
+    async def _generate_answer_async(self, key: str, question: str) -> str:
+        """Awaitable variant of _generate_answer"""
+        answer = await GEMINI.generate_async(self.model, question)
+        if answer:
+            ANSWER_CACHE.put(key, answer, GEMINI_MODEL)
+        return answer
     
     def sentiment_analysis(self, text: str) -> Dict[str, float]:
         """Analyze sentiment of text"""
@@ -0,0 +1,121 @@
+"""
+Pagination - Cursor paging and sparse field selection for list endpoints
+Cursors are positions between items of an append-only collection, so a
+page is a slice and costs O(page size) regardless of collection length
+"""
+
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+
+class PageRequest:
+    """limit / before / after / fields parsed from query args"""
+
+    def __init__(self, limit: int = DEFAULT_PAGE_LIMIT, before: Optional[int] = None,
+                 after: Optional[int] = None, fields: Optional[List[str]] = None):
+        self.limit = limit
+        self.before = before
+        self.after = after
+        self.fields = fields
+
+    @classmethod
+    def from_args(cls, args: Mapping, default_limit: int = DEFAULT_PAGE_LIMIT) -> "PageRequest":
+        """Parse request args; raises ValueError with a client-facing message"""
+        limit = _parse_int(args, "limit", default_limit)
+        if not 1 <= limit <= MAX_PAGE_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_LIMIT}")
+
+        before = _parse_int(args, "before", None)
+        after = _parse_int(args, "after", None)
+        if before is not None and after is not None:
+            raise ValueError("Use either before or after, not both")
+        if (before is not None and before < 0) or (after is not None and after < 0):
+            raise ValueError("Cursors must be non-negative")
+
+        return cls(limit, before, after, parse_fields(args.get("fields")))
+
+
+def _parse_int(args: Mapping, name: str, default):
+    value = args.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+
+
+def parse_fields(value) -> Optional[List[str]]:
+    """'a,b' or ['a', 'b'] -> ['a', 'b']; missing or empty means every field"""
+    if not value:
+        return None
+    names = value if isinstance(value, (list, tuple)) else str(value).split(",")
+    fields = [str(name).strip() for name in names if str(name).strip()]
+    return fields or None
+
+
+def select_fields(item: Any, fields: Optional[List[str]]) -> Any:
+    """Keep only the requested keys of a dict item"""
+    if not fields or not isinstance(item, dict):
+        return item
+    return {name: item[name] for name in fields if name in item}
+
+
+def _window(total: int, page: PageRequest, newest: bool) -> Tuple[int, int]:
+    """[start, end) positions for the page"""
+    if page.after is not None:
+        start = min(page.after, total)
+        return start, min(start + page.limit, total)
+    end = total if page.before is None else min(page.before, total)
+    if page.before is None and not newest:
+        return 0, min(page.limit, total)
+    return max(0, end - page.limit), end
+
+
+def _page_info(start: int, end: int, page: PageRequest, has_more: bool, total: Optional[int]) -> Dict[str, Any]:
+    return {
+        "limit": page.limit,
+        "count": end - start,
+        "total": total,
+        # Pass as before= for the previous (older) page, after= for the next (newer) one
+        "before_cursor": start if start > 0 else None,
+        "after_cursor": end if has_more else None,
+    }
+
+
+def page_sequence(items: Sequence, page: PageRequest, newest: bool = True) -> Tuple[List, Dict[str, Any]]:
+    """Slice one page from a list; without a cursor, newest=True returns the latest items"""
+    start, end = _window(len(items), page, newest)
+    selected = [select_fields(item, page.fields) for item in items[start:end]]
+    return selected, _page_info(start, end, page, end < len(items), len(items))
+
+
+def page_mapping(mapping: Dict, page: PageRequest, newest: bool = True) -> Tuple[List, Dict[str, Any]]:
+    """Page an insertion-ordered dict as {"key": ..., **value} items (islice walks up to the start)"""
+    start, end = _window(len(mapping), page, newest)
+    selected = []
+    for key, value in islice(mapping.items(), start, end):
+        item = {"key": key, **value} if isinstance(value, dict) else {"key": key, "value": value}
+        selected.append(select_fields(item, page.fields))
+    return selected, _page_info(start, end, page, end < len(mapping), len(mapping))
+
+
+def page_iterable(items: Iterable, page: PageRequest) -> Tuple[List, Dict[str, Any]]:
+    """Forward paging over a lazily produced sequence; stops once the page is full"""
+    if page.before is not None:
+        start = max(0, page.before - page.limit)
+        end = page.before
+    else:
+        start = page.after or 0
+        end = start + page.limit
+
+    # Read one extra item to know whether another page follows
+    window = list(islice(items, start, end + 1))
+    has_more = len(window) > end - start
+    window = window[:end - start]
+    selected = [select_fields(item, page.fields) for item in window]
+
+    return selected, _page_info(start, start + len(window), page, has_more, None)
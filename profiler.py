@@ -0,0 +1,201 @@
+"""
+Request Profiler - Opt-in, sampled cProfile capture for API requests
+Profiles are kept in a bounded on-disk ring as pstats dumps plus
+collapsed-stack files that flamegraph.pl / speedscope can render
+"""
+
+import cProfile
+import hmac
+import itertools
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.getenv("AARI_PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_RATE = int(os.getenv("AARI_PROFILE_SAMPLE_RATE", "0"))  # 1 in N requests, 0 disables
+PROFILE_KEEP = int(os.getenv("AARI_PROFILE_KEEP", "50"))
+PROFILE_TOKEN = os.getenv("AARI_PROFILE_TOKEN", "")
+
+PROFILE_HEADER = "X-AARI-Profile"
+PROFILE_KINDS = {"pstats": ".pstats", "folded": ".folded"}
+
+
+class RequestProfiler:
+    """Decides which requests to profile and keeps the newest `keep` profiles on disk"""
+
+    def __init__(self, directory: str = PROFILE_DIR, sample_rate: int = PROFILE_SAMPLE_RATE,
+                 keep: int = PROFILE_KEEP, admin_token: str = PROFILE_TOKEN):
+        self.directory = directory
+        self.sample_rate = max(0, sample_rate)
+        self.keep = max(1, keep)
+        self.admin_token = admin_token
+        self._requests = itertools.count(1)
+        self._sequence = itertools.count(1)
+        # cProfile allows one active profiler per process (3.12+), so captures never overlap
+        self._active = threading.Lock()
+        self._ring_lock = threading.Lock()
+
+    def is_admin(self, header_value: Optional[str]) -> bool:
+        """Whether the header carries the configured admin token"""
+        return bool(self.admin_token and header_value
+                    and hmac.compare_digest(header_value.encode(), self.admin_token.encode()))
+
+    def start(self, header_value: Optional[str] = None) -> Optional[cProfile.Profile]:
+        """Begin profiling the current request if it was asked for or sampled"""
+        sampled = self.sample_rate and next(self._requests) % self.sample_rate == 0
+        if not (sampled or self.is_admin(header_value)):
+            return None
+        if not self._active.acquire(blocking=False):
+            return None
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Another profiling tool (debugger, coverage) already owns the hook
+            logger.warning(f"Profiler unavailable: {e}")
+            self._active.release()
+            return None
+        return profile
+
+    def finish(self, profile: cProfile.Profile, info: Dict) -> Optional[str]:
+        """Stop profiling and write the capture into the ring; returns the profile id"""
+        try:
+            profile.disable()
+        finally:
+            self._active.release()
+
+        # Sortable ids: timestamp, then a sequence number within the process
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{next(self._sequence):06d}-{uuid.uuid4().hex[:6]}"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            stats = pstats.Stats(profile)
+            stats.dump_stats(self._path(profile_id, ".pstats"))
+            with open(self._path(profile_id, ".folded"), 'w') as f:
+                f.writelines(f"{stack} {weight}\n" for stack, weight in collapse_stacks(stats))
+
+            meta = {
+                "id": profile_id,
+                "timestamp": datetime.now().isoformat(),
+                **info,
+                "top": top_functions(stats),
+            }
+            with open(self._path(profile_id, ".json"), 'w') as f:
+                json.dump(meta, f, indent=2)
+
+            self._prune()
+            return profile_id
+        except Exception as e:
+            logger.error(f"Error saving profile: {e}")
+            return None
+
+    def list_profiles(self, limit: int = 20) -> List[Dict]:
+        """Metadata for the most recent profiles, newest first"""
+        profiles = []
+        for profile_id in self._profile_ids()[::-1][:limit]:
+            try:
+                with open(self._path(profile_id, ".json"), 'r') as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def profile_path(self, profile_id: str, kind: str) -> Optional[str]:
+        """File for a stored profile, or None if the id or kind is unknown"""
+        suffix = PROFILE_KINDS.get(kind)
+        if suffix is None or profile_id not in self._profile_ids():
+            return None
+        return self._path(profile_id, suffix)
+
+    def _path(self, profile_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, profile_id + suffix)
+
+    def _profile_ids(self) -> List[str]:
+        """Stored profile ids, oldest first (ids start with their timestamp)"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return sorted(name[:-5] for name in names if name.endswith(".json"))
+
+    def _prune(self):
+        """Drop the oldest profiles beyond the ring size"""
+        with self._ring_lock:
+            ids = self._profile_ids()
+            for profile_id in ids[:max(0, len(ids) - self.keep)]:
+                for suffix in (".json",) + tuple(PROFILE_KINDS.values()):
+                    try:
+                        os.remove(self._path(profile_id, suffix))
+                    except OSError:
+                        pass
+
+
+def _label(func) -> str:
+    """Readable frame name from a pstats (file, line, name) key"""
+    filename, line, name = func
+    if filename == "~":
+        return name  # builtins such as <built-in method time.sleep>
+    # Keep the parent directory so flask/app.py and our app.py stay distinct
+    module = os.path.join(os.path.basename(os.path.dirname(filename)), os.path.basename(filename))
+    return f"{module}:{name}:{line}"
+
+
+def collapse_stacks(stats: pstats.Stats, max_depth: int = 64) -> List:
+    """
+    Approximate collapsed stacks from cProfile's caller graph.
+    cProfile keeps only caller->callee edges, so each function's own time
+    is split across its call paths in proportion to the time of each edge.
+    Weights are in microseconds.
+    """
+    entries = stats.stats
+    callees = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    roots = [func for func, entry in entries.items() if not entry[4]]
+    folded = {}
+
+    def walk(func, path, share):
+        own_time = entries[func][2]
+        path = path + (_label(func),)
+        weight = int(own_time * share * 1_000_000)
+        if weight:
+            key = ";".join(path)
+            folded[key] = folded.get(key, 0) + weight
+        if len(path) >= max_depth:
+            return
+        for child, edge_time in callees.get(func, []):
+            child_total = entries[child][3]
+            child_share = share * min(1.0, edge_time / child_total) if child_total > 0 else 0
+            # Paths under a microsecond are noise and would blow up the walk
+            if child_share * child_total < 1e-6 or _label(child) in path:
+                continue
+            walk(child, path, child_share)
+
+    for root in roots:
+        walk(root, (), 1.0)
+
+    return sorted(folded.items())
+
+
+def top_functions(stats: pstats.Stats, limit: int = 15) -> List[Dict]:
+    """Functions with the most cumulative time"""
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            "function": _label(func),
+            "calls": entry[1],
+            "own_ms": round(entry[2] * 1000, 3),
+            "cumulative_ms": round(entry[3] * 1000, 3),
+        }
+        for func, entry in rows
+    ]
@@ -0,0 +1,103 @@
+"""
+Response Encoding - Content negotiation for API responses
+JSON bodies can be re-encoded as MessagePack (Accept header) and
+compressed with brotli or gzip (Accept-Encoding) above a size threshold
+"""
+
+import gzip
+import json
+import logging
+import os
+
+from flask import Request, Response
+
+import metrics
+
+# Optional encoders; negotiation falls back to what is installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESS_MIN_BYTES = int(os.getenv("AARI_COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("AARI_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("AARI_BROTLI_QUALITY", "5"))
+
+MSGPACK_MIMETYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def wants_msgpack(request: Request) -> bool:
+    """Whether the client prefers MessagePack over JSON"""
+    if msgpack is None:
+        return False
+    # JSON is listed first so it wins ties such as */*
+    best = request.accept_mimetypes.best_match(("application/json",) + MSGPACK_MIMETYPES)
+    return best in MSGPACK_MIMETYPES
+
+
+def choose_compression(request: Request) -> str:
+    """Best supported content coding the client accepts, or "" for none"""
+    accepted = request.accept_encodings
+    gzip_quality = accepted["gzip"]
+    if brotli is not None and accepted["br"] and accepted["br"] >= gzip_quality:
+        return "br"
+    if gzip_quality:
+        return "gzip"
+    return ""
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    if coding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def encode_response(response: Response, request: Request) -> Response:
+    """Apply MessagePack and compression to a buffered JSON response"""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or "Content-Encoding" in response.headers
+            or response.mimetype != "application/json"):
+        return response
+
+    endpoint = request.endpoint or "unmatched"
+    body = response.get_data()
+    metrics.RESPONSE_IDENTITY_BYTES.inc(endpoint, amount=len(body))
+    encoding = "json"
+    transformed = False
+
+    try:
+        if wants_msgpack(request):
+            body = msgpack.packb(json.loads(body), use_bin_type=True)
+            response.mimetype = "application/msgpack"
+            encoding = "msgpack"
+            transformed = True
+        response.vary.add("Accept")
+
+        coding = choose_compression(request)
+        if coding and len(body) >= COMPRESS_MIN_BYTES:
+            body = compress(body, coding)
+            response.headers["Content-Encoding"] = coding
+            encoding = f"{encoding}+{coding}"
+            transformed = True
+        response.vary.add("Accept-Encoding")
+    except Exception as e:
+        logger.error(f"Response encoding error: {e}")
+        return response
+
+    if transformed:
+        response.set_data(body)
+        # A re-encoded body is a different representation, so its validator can only be weak
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+    metrics.RESPONSE_WIRE_BYTES.inc(endpoint, encoding, amount=len(body))
+    return response
@@ -0,0 +1,267 @@
+"""
+Result Cache - Bounded, thread-safe LRU map for recomputable results
+Lookups are counted per cache in aari_cache_lookups_total and in stats(),
+and a generation token clears the cache when its inputs (keyword tables,
+model artifacts) change. TTLCache adds per-entry expiry and optional JSON
+persistence; SingleFlight lets concurrent identical calls share one execution
+"""
+
+import asyncio
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from metrics import CACHE_LOOKUPS, SINGLE_FLIGHT_SHARED, record_json_write
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Least-recently-used cache holding at most `max_entries` results (0 disables it)"""
+
+    def __init__(self, name: str, max_entries: int):
+        self.name = name
+        self.max_entries = max(0, max_entries)
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, generation: Hashable = None, default: Any = None) -> Any:
+        """Cached value for `key`, or `default`; a new `generation` drops everything cached before it"""
+        if not self.max_entries:
+            return default
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+            value = self._lookup(key)
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+        CACHE_LOOKUPS.inc(self.name, "miss" if value is _MISSING else "hit")
+        return default if value is _MISSING else value
+
+    def _lookup(self, key: Hashable) -> Any:
+        """Stored value for `key` or _MISSING, marking it recently used (called with the lock held)"""
+        value = self._entries.get(key, _MISSING)
+        if value is not _MISSING:
+            self._entries.move_to_end(key)
+        return value
+
+    def _wrap(self, value: Any) -> Any:
+        """What is stored for `value` (called with the lock held)"""
+        return value
+
+    def put(self, key: Hashable, value: Any, generation: Hashable = None):
+        """Store `value` (computed under `generation`), evicting the least recently used entry once full"""
+        if not self.max_entries:
+            return
+        with self._lock:
+            if generation != self._generation:
+                # Computed against inputs that changed while it ran; get() has already moved on
+                return
+            self._entries[key] = self._wrap(value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+class TTLCache(LRUCache):
+    """LRU cache whose entries also expire `ttl` seconds after being stored (ttl 0 disables it)
+
+    With a `path`, string-keyed JSON-serializable entries are loaded from that
+    file on start and written back at most every `save_interval` seconds and
+    at interpreter exit, so they survive a restart
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl: float, path: Optional[str] = None,
+                 save_interval: float = 30.0):
+        super().__init__(name, max_entries if ttl > 0 else 0)
+        self.ttl = ttl
+        self.path = path or None
+        self.save_interval = save_interval
+        self.expired = 0
+        self._saved_at = time.monotonic()
+        self._dirty = False
+        if self.path and self.max_entries:
+            self.load()
+            atexit.register(self.save)
+
+    def _lookup(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        # Wall-clock expiry, so entries loaded from disk keep their original deadline
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.expired += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def _wrap(self, value: Any) -> Any:
+        self._dirty = True
+        return time.time() + self.ttl, value
+
+    def put(self, key: Hashable, value: Any, generation: Hashable = None):
+        super().put(key, value, generation)
+        if self.path and self._dirty and time.monotonic() - self._saved_at >= self.save_interval:
+            self.save()
+
+    def load(self):
+        """Read unexpired entries from `path`; a missing or unreadable file leaves the cache empty"""
+        try:
+            if not os.path.exists(self.path):
+                return
+            with open(self.path, "r") as f:
+                saved = json.load(f)
+            now = time.time()
+            with self._lock:
+                self._generation = saved.get("generation")
+                for key, expires_at, value in saved.get("entries", [])[-self.max_entries:]:
+                    if expires_at > now:
+                        self._entries[key] = (expires_at, value)
+            logger.info(f"Loaded {len(self._entries)} {self.name} cache entries from {self.path}")
+        except Exception as e:
+            logger.warning(f"Could not load {self.name} cache from {self.path}: {e}")
+
+    def save(self):
+        """Write unexpired entries to `path` atomically (several workers may share the file)"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            snapshot = {
+                "generation": self._generation,
+                "entries": [[key, expires_at, value] for key, (expires_at, value) in self._entries.items()
+                            if expires_at > now],
+            }
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=f".{self.name}-cache-", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(snapshot, f)
+                    record_json_write(self.path, f.tell())
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            logger.warning(f"Could not save {self.name} cache to {self.path}: {e}")
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        report = super().stats()
+        report["ttl_seconds"] = self.ttl
+        report["expired"] = self.expired
+        return report
+
+
+class _Flight:
+    """One in-progress call and, once it finishes, its result or exception"""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share a single execution and its result (or exception)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._tasks: Dict[Hashable, "asyncio.Future"] = {}
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """fn() for the first caller with `key`; callers arriving while it runs wait for the same result"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.shared += 1
+        if not leader:
+            SINGLE_FLIGHT_SHARED.inc(self.name)
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.value
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Awaitable variant of do(); calls are shared within one event loop"""
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        with self._lock:
+            task = self._tasks.get(flight_key)
+            if task is None:
+                # A task of its own: a cancelled caller must not cancel the call others are waiting on
+                task = self._tasks[flight_key] = loop.create_task(fn())
+                task.add_done_callback(lambda t: self._finish_task(flight_key, t))
+            else:
+                self.shared += 1
+                SINGLE_FLIGHT_SHARED.inc(self.name)
+        return await asyncio.shield(task)
+
+    def _finish_task(self, flight_key: Hashable, task: "asyncio.Future"):
+        with self._lock:
+            self._tasks.pop(flight_key, None)
+        # Mark the exception retrieved even if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights) + len(self._tasks)
@@ -0,0 +1,154 @@
+"""
+Session Manager - Per-user assistant state with lock striping
+Each user/device gets its own conversation history, memory, learning and
+context store, while NLP models, executors and web search stay shared
+singletons. Stripe locks only guard the session table; a session's own
+state_lock guards its stores and is never held across network calls
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from memory_manager import MemoryManager
+from auto_updater import SelfLearningSystem
+from context_manager import ContextManager
+
+logger = logging.getLogger(__name__)
+
+USER_DATA_DIR = os.getenv("AARI_USER_DATA_DIR", "user_data")
+
+# Per-user directories kept on disk; requests from new ids are refused past this
+MAX_USER_DIRS = int(os.getenv("AARI_MAX_USER_DIRS", "10000"))
+
+# Device ids are UUIDs or similar opaque tokens
+USER_ID_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._:-]{0,127}$")
+
+
+class InvalidUserId(ValueError):
+    """The X-User-Id / X-Device-Id value is not an acceptable id"""
+
+
+class TooManyUsers(Exception):
+    """Creating storage for another user would exceed MAX_USER_DIRS"""
+
+
+class SessionManager:
+    """Maps user ids to assistant session views, one lock per stripe"""
+
+    def __init__(self, assistant_factory: Callable, stripes: int = 64, max_sessions: int = 4096,
+                 data_dir: str = USER_DATA_DIR, max_user_dirs: int = MAX_USER_DIRS):
+        self.assistant_factory = assistant_factory
+        self.data_dir = data_dir
+        self.max_user_dirs = max_user_dirs
+        self.stripe_count = max(1, stripes)
+        self.max_sessions_per_stripe = max(1, max_sessions // self.stripe_count)
+
+        # Stripe i guards the session table entries whose id hashes to i
+        self._locks = [threading.Lock() for _ in range(self.stripe_count)]
+        self._sessions = [OrderedDict() for _ in range(self.stripe_count)]
+        # Evicted views a request may still be using; reused instead of opening the user's files twice
+        self._evicted = [weakref.WeakValueDictionary() for _ in range(self.stripe_count)]
+
+        self._dirs_lock = threading.Lock()
+        self._user_dirs = self._count_user_dirs()
+
+    def _count_user_dirs(self) -> int:
+        """Per-user directories already on disk"""
+        try:
+            return sum(1 for entry in os.scandir(self.data_dir) if entry.is_dir())
+        except FileNotFoundError:
+            return 0
+
+    def _stripe(self, user_id: str) -> int:
+        """Stable stripe index for a user id"""
+        digest = hashlib.sha1(user_id.encode("utf-8")).digest()
+        return int.from_bytes(digest[:4], "big") % self.stripe_count
+
+    def _user_dir(self, user_id: str) -> str:
+        """Per-user storage directory (hashed so ids never reach the filesystem raw)"""
+        return os.path.join(self.data_dir, hashlib.sha1(user_id.encode("utf-8")).hexdigest()[:16])
+
+    def check_user_id(self, user_id: str):
+        """Raise InvalidUserId or TooManyUsers if a request from user_id cannot be served"""
+        if not user_id:
+            return
+        if not USER_ID_RE.match(user_id):
+            raise InvalidUserId("Invalid user id")
+        if self._user_dirs >= self.max_user_dirs and not os.path.isdir(self._user_dir(user_id)):
+            raise TooManyUsers("Too many users")
+
+    def _make_user_dir(self, user_id: str) -> str:
+        """Create the user's directory, counting it against max_user_dirs"""
+        user_dir = self._user_dir(user_id)
+        with self._dirs_lock:
+            if not os.path.isdir(user_dir):
+                if self._user_dirs >= self.max_user_dirs:
+                    raise TooManyUsers("Too many users")
+                os.makedirs(user_dir, exist_ok=True)
+                self._user_dirs += 1
+        return user_dir
+
+    def _create_session(self, user_id: str):
+        """Build a session view with its own memory, learning and context files"""
+        shared = self.assistant_factory()
+        if shared is None:
+            return None
+
+        user_dir = self._make_user_dir(user_id)
+
+        memory_manager = MemoryManager(memory_file=os.path.join(user_dir, "aari_memory.json"))
+        self_learning = SelfLearningSystem(learning_file=os.path.join(user_dir, "self_learning.json"))
+        context_manager = ContextManager(context_file=os.path.join(user_dir, "context.json"))
+
+        logger.info(f"Created session in {user_dir}")
+        return shared.session_view(memory_manager, self_learning, context_manager)
+
+    def get(self, user_id: str = ""):
+        """The user's assistant (created on first use); no id means the shared assistant
+
+        The stripe lock is held only for the lookup. Command processing takes the
+        session's state_lock stage by stage; other callers use session(). An evicted
+        view that is still referenced (by a request in flight) is brought back rather
+        than replaced, so one user's files never have two writers
+        """
+        if not user_id:
+            return self.assistant_factory()
+        self.check_user_id(user_id)
+
+        index = self._stripe(user_id)
+        with self._locks[index]:
+            sessions = self._sessions[index]
+            evicted = self._evicted[index]
+            asst = sessions.get(user_id)
+            if asst is None:
+                asst = evicted.pop(user_id, None) or self._create_session(user_id)
+                if asst is not None:
+                    sessions[user_id] = asst
+                    # Drop the least recently used session once the stripe is full
+                    while len(sessions) > self.max_sessions_per_stripe:
+                        old_id, old = sessions.popitem(last=False)
+                        evicted[old_id] = old
+            else:
+                sessions.move_to_end(user_id)
+            return asst
+
+    @contextmanager
+    def session(self, user_id: str = "") -> Iterator:
+        """Yield the user's assistant with its state_lock held, for short reads and writes of its stores"""
+        asst = self.get(user_id)
+        if asst is None:
+            yield None
+            return
+        with asst.state_lock:
+            yield asst
+
+    def session_count(self) -> int:
+        """Number of live user sessions"""
+        return sum(len(sessions) for sessions in self._sessions)
@@ -3,17 +3,24 @@ Task Executor - Handles execution of various assistant tasks
 WhatsApp, phone calls, downloads, system commands, etc.
 """
 
+import asyncio
+import copy
 import os
 import subprocess
 import logging
 import json
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional, Tuple
 import requests
 import time
 from datetime import datetime, timedelta
 import platform
 import webbrowser
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,6 +32,12 @@ class TaskExecutor:
         self.contacts_db = self._load_contacts()
         self.reminders = []
     
+    def for_session(self) -> "TaskExecutor":
+        """Executor for one user's session: same platform and contacts, its own reminders"""
+        executor = copy.copy(self)
+        executor.reminders = []
+        return executor
+    
     def send_whatsapp_message(self, contact_name: str, message: str) -> Dict[str, Any]:
         """Send message via WhatsApp using pywhatkit"""
         try:
@@ -106,22 +119,10 @@ class TaskExecutor:
                 "error": str(e)
             }
     
-    def download_file(self, file_name: str, file_type: str = "") -> Dict[str, Any]:
-        """Download files from internet"""
+    def download_file(self, file_name: str, file_type: str = "", progress: Optional[Callable] = None) -> Dict[str, Any]:
+        """Download files from internet, streaming to disk; progress(fraction, message) if given"""
         try:
-            # Map file names to URLs (you should expand this)
-            file_sources = {
-                "python pdf": "https://www.python.org/ftp/python/3.11.0/python-3.11.0.exe",
-                "tutorial pdf": "https://example.com/tutorial.pdf",
-                "presentation ppt": "https://example.com/presentation.pptx",
-            }
-            
-            search_key = f"{file_name} {file_type}".lower()
-            url = file_sources.get(search_key)
-            
-            if not url:
-                # Try to search online
-                url = self._search_and_get_file_url(file_name, file_type)
+            url, filepath = self._resolve_download(file_name, file_type)
             
             if not url:
                 return {
@@ -129,23 +130,58 @@ class TaskExecutor:
                     "error": f"Could not find '{file_name}'"
                 }
             
-            # Download file
-            downloads_dir = os.path.expanduser("~/Downloads")
-            os.makedirs(downloads_dir, exist_ok=True)
+            with requests.get(url, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                total = int(response.headers.get("Content-Length") or 0)
+                received = 0
+                
+                with open(filepath, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        f.write(chunk)
+                        received += len(chunk)
+                        if progress and total:
+                            progress(received / total, f"{received} of {total} bytes")
             
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
+            logger.info(f"File downloaded: {filepath}")
             
-            # Generate filename
-            if file_type:
-                filename = f"{file_name}.{file_type}"
-            else:
-                filename = file_name
+            return {
+                "status": "success",
+                "file_path": filepath,
+                "message": f"Downloaded {file_name}"
+            }
+        
+        except Exception as e:
+            logger.error(f"Download error: {e}")
+            return {
+                "status": "error",
+                "error": str(e)
+            }
+    
+    async def download_file_async(self, file_name: str, file_type: str = "") -> Dict[str, Any]:
+        """Awaitable variant of download_file; URL lookup (may search online) and file writes run on worker threads"""
+        loop = asyncio.get_running_loop()
+        if aiohttp is None:
+            return await loop.run_in_executor(None, self.download_file, file_name, file_type)
+        
+        try:
+            url, filepath = await loop.run_in_executor(None, self._resolve_download, file_name, file_type)
             
-            filepath = os.path.join(downloads_dir, filename)
+            if not url:
+                return {
+                    "status": "error",
+                    "error": f"Could not find '{file_name}'"
+                }
             
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
+            timeout = aiohttp.ClientTimeout(total=30)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    f = await loop.run_in_executor(None, open, filepath, 'wb')
+                    try:
+                        async for chunk in response.content.iter_chunked(64 * 1024):
+                            await loop.run_in_executor(None, f.write, chunk)
+                    finally:
+                        await loop.run_in_executor(None, f.close)
             
             logger.info(f"File downloaded: {filepath}")
             
@@ -162,6 +198,37 @@ class TaskExecutor:
                 "error": str(e)
             }
     
+    def _resolve_download(self, file_name: str, file_type: str = "") -> Tuple[str, str]:
+        """Resolve the source URL and local target path for a download"""
+        # Map file names to URLs (you should expand this)
+        file_sources = {
+            "python pdf": "https://www.python.org/ftp/python/3.11.0/python-3.11.0.exe",
+            "tutorial pdf": "https://example.com/tutorial.pdf",
+            "presentation ppt": "https://example.com/presentation.pptx",
+        }
+        
+        search_key = f"{file_name} {file_type}".lower()
+        url = file_sources.get(search_key)
+        
+        if not url:
+            # Try to search online
+            url = self._search_and_get_file_url(file_name, file_type)
+        
+        if not url:
+            return "", ""
+        
+        # Download file
+        downloads_dir = os.path.expanduser("~/Downloads")
+        os.makedirs(downloads_dir, exist_ok=True)
+        
+        # Generate filename
+        if file_type:
+            filename = f"{file_name}.{file_type}"
+        else:
+            filename = file_name
+        
+        return url, os.path.join(downloads_dir, filename)
+    
     def open_application(self, app_name: str) -> Dict[str, Any]:
         """Open an application - Full system control"""
         try:
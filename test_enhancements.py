@@ -90,6 +90,40 @@ def test_ml_model():
     return accuracy >= 70
 
 
+def test_messages_with_greetings():
+    """Greeting words inside a messaging/call command must not turn it into a greeting"""
+    print("\n" + "="*70)
+    print("TESTING MESSAGES THAT CONTAIN GREETINGS")
+    print("="*70)
+    
+    nlp = NLPProcessor()
+    
+    test_cases = [
+        ("text john hi how are you", "send_message"),
+        ("message dad good morning", "send_message"),
+        ("whatsapp sarah hey", "send_message"),
+        ("email boss good morning", "send_message"),
+        ("whatsapp my friend hello there", "send_message"),
+        ("text mom call me back", "send_message"),
+        ("call mom and say hi", "make_call"),
+        ("hello there", "greeting"),
+        ("good morning", "greeting"),
+    ]
+    
+    failures = 0
+    for command, expected_intent in test_cases:
+        intent, entities, confidence = nlp.extract_intent(command)
+        status = "PASS" if intent == expected_intent else "FAIL"
+        failures += intent != expected_intent
+        print(f"  [{status}] '{command}' -> {intent} (expected {expected_intent}, confidence {confidence:.2f})")
+    
+    print(f"\n{'='*70}")
+    print(f"FAILURES: {failures}/{len(test_cases)}")
+    print(f"{'='*70}\n")
+    
+    return failures == 0
+
+
 def test_entity_extraction():
     """Test improved entity extraction"""
     print("\n" + "="*70)
@@ -216,6 +250,7 @@ def main():
     
     results = {
         "ML Model": test_ml_model(),
+        "Messages With Greetings": test_messages_with_greetings(),
         "Entity Extraction": test_entity_extraction(),
         "Memory Integration": test_memory_integration(),
     }
@@ -0,0 +1,105 @@
+"""
+Tests for admission control: token bucket, bounded queue, Retry-After and
+that rejected requests never spend rate-limit tokens
+"""
+
+import os
+import re
+import threading
+import time
+
+from admission import AdmissionController, AdmissionLimiter, TokenBucket
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_token_bucket_allows_burst_then_reports_wait():
+    bucket = TokenBucket(rate=2, burst=3)
+    assert [bucket.take() for _ in range(3)] == [0.0, 0.0, 0.0]
+    wait = bucket.take()
+    assert 0 < wait <= 0.5
+
+
+def test_token_bucket_refills_over_time():
+    bucket = TokenBucket(rate=50, burst=1)
+    assert bucket.take() == 0.0
+    assert bucket.take() > 0
+    time.sleep(0.05)
+    assert bucket.take() == 0.0
+
+
+def test_rate_limited_rejection_is_429_with_retry_after():
+    limiter = AdmissionLimiter("t", max_concurrent=5, rate=0.5, burst=1)
+    assert limiter.acquire() is None
+    limiter.release(0.01)
+    rejection = limiter.acquire()
+    assert rejection.status == 429
+    assert rejection.reason == "rate_limited"
+    assert rejection.retry_after == 2
+
+
+def test_queue_full_rejection_spends_no_token():
+    limiter = AdmissionLimiter("t", max_concurrent=1, max_queue=0, rate=1, burst=2)
+    assert limiter.acquire() is None
+    tokens = limiter.bucket.tokens
+    for _ in range(5):
+        rejection = limiter.acquire()
+        assert rejection.status == 503
+        assert rejection.reason == "queue_full"
+        assert rejection.retry_after >= 1
+    assert limiter.bucket.tokens == tokens
+
+
+def test_queue_timeout_rejects_after_waiting():
+    limiter = AdmissionLimiter("t", max_concurrent=1, max_queue=1, queue_timeout=0.1)
+    assert limiter.acquire() is None
+    start = time.monotonic()
+    rejection = limiter.acquire()
+    assert time.monotonic() - start >= 0.1
+    assert rejection.status == 503
+    assert rejection.reason == "queue_timeout"
+    assert limiter.status()["waiting"] == 0
+
+
+def test_queued_request_gets_slot_on_release():
+    limiter = AdmissionLimiter("t", max_concurrent=1, max_queue=1, queue_timeout=2.0)
+    assert limiter.acquire() is None
+    outcome = []
+    waiter = threading.Thread(target=lambda: outcome.append(limiter.acquire()))
+    waiter.start()
+    time.sleep(0.05)
+    assert limiter.status()["waiting"] == 1
+    limiter.release(0.05)
+    waiter.join(1)
+    assert outcome == [None]
+    assert limiter.status()["active"] == 1
+
+
+def test_retry_after_grows_with_service_time():
+    limiter = AdmissionLimiter("t", max_concurrent=1, max_queue=0)
+    for _ in range(20):
+        assert limiter.acquire() is None
+        limiter.release(10.0)
+    assert limiter.acquire() is None
+    assert limiter.acquire().retry_after >= 9
+
+
+def test_controller_maps_endpoints_to_pools():
+    controller = AdmissionController({
+        "pools": {"assistant": {"max_concurrent": 2}},
+        "endpoints": {"process_command": "assistant", "web_search": "missing"},
+    })
+    assert controller.limiter_for("process_command") is controller.pools["assistant"]
+    assert controller.limiter_for("web_search") is None
+    assert controller.limiter_for("health") is None
+    assert AdmissionController({"enabled": False, "pools": {"a": {}}, "endpoints": {"x": "a"}}).limiter_for("x") is None
+
+
+def test_shipped_config_leaves_threads_free():
+    """Running + queued over every pool stays two below the Dockerfile's gunicorn --threads"""
+    controller = AdmissionController.from_config_file(os.path.join(ROOT, "config.json"))
+    with open(os.path.join(ROOT, "Dockerfile")) as f:
+        threads = int(re.search(r"--threads (\d+)", f.read()).group(1))
+    held = sum(limiter.max_concurrent + limiter.max_queue for limiter in controller.pools.values())
+    assert controller.pools
+    assert held <= threads - 2
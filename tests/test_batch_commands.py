@@ -0,0 +1,34 @@
+import pytest
+
+import app as app_module
+
+
+class FakeAssistant:
+    def __init__(self):
+        self.batches = []
+
+    def process_commands_batch(self, commands):
+        self.batches.append(commands)
+        return [{"status": "success", "response": f"ran {command}"} for command in commands]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    assistant = FakeAssistant()
+    monkeypatch.setattr(app_module.sessions, "get", lambda user_id="": assistant)
+    return app_module.app.test_client(), assistant
+
+
+def test_non_string_items_get_their_own_error(client):
+    http, assistant = client
+    response = http.post("/api/process-commands",
+                         json={"commands": ["Hello", 5, None, {"command": 7}, {"command": "call mom"}, ""]})
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert assistant.batches == [["hello", "call mom"]]
+    assert [r["status"] for r in body["results"]] == ["success", "error", "error", "error", "success", "error"]
+    assert [r["index"] for r in body["results"]] == list(range(6))
+    assert body["results"][1]["message"] == "Command must be a string"
+    assert body["results"][5]["message"] == "No command provided"
+    assert body["errors"] == 4
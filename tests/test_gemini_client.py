@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from gemini_client import CircuitBreaker, CircuitOpen, DeadlineExceeded, GeminiClient
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class ScriptedModel:
+    """Each call takes the next (delay, result) step; a result that is an exception is raised"""
+
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _next(self, kwargs):
+        with self._lock:
+            self.calls.append(kwargs)
+            return self.steps.pop(0) if len(self.steps) > 1 else self.steps[0]
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        delay, result = self._next(kwargs)
+        time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        if stream:
+            return iter(_Response(word) for word in result.split())
+        return _Response(result)
+
+    async def generate_content_async(self, prompt, **kwargs):
+        delay, result = self._next(kwargs)
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return _Response(result)
+
+
+def make_client(deadline=0.4, hedge=0.95, failures=2, cooldown=0.1):
+    return GeminiClient(deadline=deadline, hedge_percentile=hedge, threads=4,
+                        breaker=CircuitBreaker("test", failure_threshold=failures, cooldown=cooldown))
+
+
+def test_upstream_timeout_is_the_time_left_to_the_deadline():
+    client = make_client(hedge=0)
+    model = ScriptedModel((0, "hi"))
+    assert client.generate(model, "q") == "hi"
+    assert model.calls[0]["request_options"]["timeout"] == pytest.approx(0.4)
+
+
+def test_slow_call_raises_deadline_exceeded_on_time():
+    client = make_client(hedge=0)
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        client.generate(ScriptedModel((1.0, "late")), "q")
+    assert time.monotonic() - started < 0.6
+    assert client.breaker.failures == 1
+
+
+def test_slow_call_is_hedged_and_the_hedge_gets_the_remaining_time():
+    client = make_client()
+    model = ScriptedModel((1.0, "slow"), (0, "fast"))
+    assert client.generate(model, "q") == "fast"
+    assert len(model.calls) == 2
+    # Hedged at half the deadline while no latency history exists
+    assert model.calls[1]["request_options"]["timeout"] == pytest.approx(0.2, abs=0.05)
+
+
+def test_fast_failure_is_hedged():
+    client = make_client()
+    model = ScriptedModel((0, RuntimeError("boom")), (0, "second"))
+    assert client.generate(model, "q") == "second"
+    assert client.breaker.state == "closed"
+
+
+def test_error_propagates_when_every_attempt_fails():
+    client = make_client()
+    with pytest.raises(RuntimeError):
+        client.generate(ScriptedModel((0, RuntimeError("boom"))), "q")
+
+
+def test_breaker_opens_probes_once_and_closes():
+    client = make_client(hedge=0)
+    failing = ScriptedModel((0, RuntimeError("boom")))
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            client.generate(failing, "q")
+    assert client.breaker.state == "open"
+    with pytest.raises(CircuitOpen):
+        client.generate(ScriptedModel((0, "ok")), "q")
+    assert len(failing.calls) == 2
+
+    time.sleep(0.15)
+    assert client.breaker.allow()
+    assert client.breaker.state == "half_open"
+    assert not client.breaker.allow()  # only one probe at a time
+    client.breaker.record_success()
+    assert client.breaker.state == "closed"
+    assert client.generate(ScriptedModel((0, "ok")), "q") == "ok"
+
+
+def test_failed_probe_reopens_the_breaker():
+    client = make_client(hedge=0, failures=1)
+    with pytest.raises(RuntimeError):
+        client.generate(ScriptedModel((0, RuntimeError("boom"))), "q")
+    time.sleep(0.15)
+    with pytest.raises(RuntimeError):
+        client.generate(ScriptedModel((0, RuntimeError("boom"))), "q")
+    assert client.breaker.state == "open"
+
+
+def test_async_generate_passes_timeout_and_hedges():
+    client = make_client()
+    model = ScriptedModel((1.0, "slow"), (0, "fast"))
+    assert asyncio.run(client.generate_async(model, "q")) == "fast"
+    assert model.calls[0]["request_options"]["timeout"] == pytest.approx(0.4, abs=0.05)
+
+
+def test_stream_passes_the_stream_timeout():
+    client = make_client()
+    client.stream_timeout = 5
+    model = ScriptedModel((0, "one two"))
+    assert list(client.stream(model, "q")) == ["one", "two"]
+    assert model.calls[0]["request_options"]["timeout"] == 5
+    assert client.breaker.state == "closed"
+
+
+def test_stream_deadline_applies_to_each_chunk():
+    client = make_client(hedge=0)
+    with pytest.raises(DeadlineExceeded):
+        list(client.stream(ScriptedModel((1.0, "late")), "q"))
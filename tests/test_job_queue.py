@@ -0,0 +1,38 @@
+import threading
+
+import pytest
+
+from job_queue import JobQueue, JobQueueFull
+
+
+@pytest.fixture
+def jobs():
+    return JobQueue(workers=1, max_pending=2)
+
+
+def test_only_the_owner_reads_a_job(jobs):
+    job = jobs.submit("work", lambda progress: "done", owner="alice")
+    assert jobs.get(job.id, owner="alice") is job
+    assert jobs.get(job.id, owner="bob") is None
+    assert jobs.get(job.id) is None
+    assert jobs.get(job.id, token=job.token) is None
+    assert job.token == ""
+
+
+def test_anonymous_job_needs_its_token(jobs):
+    job = jobs.submit("work", lambda progress: "done")
+    other = jobs.submit("work", lambda progress: "done")
+    assert job.token and job.token != other.token
+    assert jobs.get(job.id, token=job.token) is job
+    assert jobs.get(job.id) is None
+    assert jobs.get(job.id, token=other.token) is None
+    assert jobs.get(job.id, owner="alice", token=job.token) is None
+
+
+def test_full_queue_is_refused(jobs):
+    release = threading.Event()
+    for _ in range(2):
+        jobs.submit("work", lambda progress: release.wait(5))
+    with pytest.raises(JobQueueFull):
+        jobs.submit("work", lambda progress: None)
+    release.set()
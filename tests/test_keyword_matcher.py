@@ -0,0 +1,80 @@
+import json
+import os
+import random
+
+import pytest
+
+from keyword_matcher import LONG_TEXT, MATCHER, KeywordMatcher
+
+TABLE = {
+    "pronoun": ["he", "she", "his", "hers"],
+    "greeting": ["hi", "hello", "good morning", "morning"],
+    "action": ["call", "recall", "all", "call"],
+}
+
+
+def naive(text, keywords):
+    """What the matcher must report: every keyword present, True if some occurrence is a whole word"""
+    padded = f" {text} "
+    return {keyword: f" {keyword} " in padded for keyword in keywords if keyword in text}
+
+
+def keywords_of(tables):
+    return {keyword for table in tables for keywords in table.values() for keyword in keywords}
+
+
+@pytest.fixture
+def matcher():
+    matcher = KeywordMatcher()
+    matcher.register("table", TABLE)
+    return matcher
+
+
+def random_texts(count, length, seed=7):
+    words = ["he", "she", "hers", "ushers", "his", "hi", "hello", "good", "morning", "call", "recall",
+             "all", "ball", "x", "mornings", "shis"]
+    rng = random.Random(seed)
+    for _ in range(count):
+        text = ""
+        while len(text) < length:
+            text += rng.choice(words) + rng.choice([" ", " ", ""])
+        yield text.strip()
+
+
+@pytest.mark.parametrize("length", [5, 40, LONG_TEXT - 1, LONG_TEXT + 1, 400])
+def test_agrees_with_naive_scan(matcher, length):
+    keywords = keywords_of([TABLE])
+    for text in random_texts(200, length):
+        assert matcher.scan(text).found == naive(text, keywords), text
+
+
+def test_long_and_short_paths_agree(matcher):
+    short = "recall his call good morning ushers"
+    long = " ".join([short] * 6)
+    assert len(short) <= LONG_TEXT < len(long)
+    assert matcher.scan(short).found == matcher.scan(long).found
+
+
+def test_scores_and_first_label(matcher):
+    hits = matcher.scan("recall hello")
+    # 2 per whole word, 1 inside a word, times how often the table lists it ("call" twice)
+    assert hits.score("table") == {"pronoun": 1, "greeting": 2, "action": 2 + 1 * 2 + 1}
+    assert hits.first_label("table") == "pronoun"
+
+
+def test_registering_a_table_invalidates_scans(matcher):
+    first = matcher.scan("hello")
+    matcher.register("table", {"greeting": ["yo"]})
+    assert matcher.scan("hello").found == {}
+    assert matcher.scan("yo").version > first.version
+
+
+def test_registered_tables_agree_with_naive_scan_on_the_corpus():
+    import nlp_processor  # noqa: F401 (registers the intent table)
+    keywords = keywords_of(MATCHER._tables.values())
+    corpus = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "loadtest_corpus.jsonl")
+    with open(corpus) as f:
+        commands = [json.loads(line)["command"].lower() for line in f if line.strip()]
+    assert commands
+    for text in commands + [" ".join(commands[:20])]:
+        assert MATCHER.scan(text).found == naive(text, keywords), text
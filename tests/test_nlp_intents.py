@@ -0,0 +1,102 @@
+import pytest
+
+from nlp_processor import NLPProcessor, intent_cache_keys
+from result_cache import LRUCache
+
+
+@pytest.fixture(scope="module")
+def shared_nlp():
+    return NLPProcessor()
+
+
+@pytest.fixture
+def nlp(shared_nlp):
+    shared_nlp.intent_cache = LRUCache("intent", 64)
+    return shared_nlp
+
+
+def test_cache_keys_fold_only_the_classification():
+    assert intent_cache_keys("Call John")[0] != intent_cache_keys("call john")[0]
+    assert intent_cache_keys("Call  John!")[1] == intent_cache_keys("call john")[1]
+
+
+def test_differently_written_commands_share_the_classification_only(nlp, monkeypatch):
+    classified = []
+    classify = nlp._classify
+    monkeypatch.setattr(nlp, "_classify", lambda texts: classified.append(texts) or classify(texts))
+
+    intent, entities, _ = nlp.extract_intent("text mom that i'm late!")
+    again, entities_again, _ = nlp.extract_intent("Text mom that I'm late")
+
+    assert again == intent
+    assert len(classified) == 1
+    # Entities come from each text as written
+    assert entities.get("message") != entities_again.get("message")
+
+
+def test_exact_repeat_is_a_full_cache_hit(nlp, monkeypatch):
+    first = nlp.extract_intent("call mom")
+    monkeypatch.setattr(nlp, "extract_entities_for_intent", pytest.fail)
+    assert nlp.extract_intent("call mom") == first
+
+
+class FakeEnt:
+    def __init__(self, text, label):
+        self.text, self.label_ = text, label
+
+
+class FakeDoc:
+    def __init__(self, *ents):
+        self.ents = list(ents)
+
+
+def test_query_keeps_its_location(nlp, monkeypatch):
+    parsed = []
+    monkeypatch.setattr(nlp, "_parse", lambda text: parsed.append(text) or FakeDoc(FakeEnt("Delhi", "GPE")))
+
+    entities = nlp.extract_entities_for_intent("query", "weather in Delhi")
+    assert entities["location"] == "Delhi"
+    assert entities["gpe"] == ["Delhi"]
+
+    # No place cue: spaCy is not run for the query at all
+    assert nlp.extract_entities_for_intent("query", "what is python") == {}
+    assert parsed == ["weather in Delhi"]
+
+
+def probabilities(nlp, **by_intent):
+    """Classifier output row with the given probabilities, the rest spread evenly"""
+    classes = [str(c) for c in nlp.classifier.classes_]
+    rest = (1 - sum(by_intent.values())) / (len(classes) - len(by_intent))
+    return [by_intent.get(intent, rest) for intent in classes]
+
+
+@pytest.fixture
+def ml_nlp(nlp):
+    if not nlp.ml_ready:
+        pytest.skip("intent classifier not available")
+    return nlp
+
+
+def test_action_keyword_beats_greeting_even_when_the_classifier_disagrees(ml_nlp):
+    intent, confidence = ml_nlp._hybrid_intent("hi can you call mom", probabilities(ml_nlp, greeting=0.9))
+    assert intent == "make_call"
+    assert 0.6 <= confidence <= 1.0
+
+
+def test_greeting_alone_stays_a_greeting(ml_nlp):
+    intent, confidence = ml_nlp._hybrid_intent("hello there", probabilities(ml_nlp, greeting=0.9))
+    assert (intent, round(confidence, 2)) == ("greeting", 0.96)
+
+
+def test_tied_actions_go_to_the_one_named_first(ml_nlp):
+    flat = probabilities(ml_nlp)
+    assert ml_nlp._hybrid_intent("text john call me back", flat)[0] == "send_message"
+    assert ml_nlp._hybrid_intent("call john text me back", flat)[0] == "make_call"
+
+
+def test_classifier_alone_decides_without_keywords(ml_nlp):
+    assert ml_nlp._hybrid_intent("xyzzy plugh", probabilities(ml_nlp, memory=0.8)) == ("memory", 0.8)
+
+
+def test_unsure_classifier_without_keywords_is_unknown(ml_nlp):
+    assert ml_nlp._hybrid_intent("xyzzy plugh", probabilities(ml_nlp, memory=0.4)) == ("unknown", 0.3)
@@ -0,0 +1,110 @@
+from contextlib import contextmanager
+
+import pytest
+
+from pagination import MAX_PAGE_LIMIT, PageRequest, page_iterable, page_mapping, page_sequence
+
+ITEMS = [{"n": n, "text": f"item {n}"} for n in range(23)]
+
+
+def walk_back(items, limit):
+    """Newest page first, then follow before_cursor to the start"""
+    pages, args = [], {"limit": limit}
+    while True:
+        page, info = page_sequence(items, PageRequest.from_args(args))
+        pages.append(page)
+        if info["before_cursor"] is None:
+            return [item for page in reversed(pages) for item in page]
+        args = {"limit": limit, "before": str(info["before_cursor"])}
+
+
+def test_before_cursor_round_trip_covers_every_item_once():
+    for limit in (1, 5, 23, 50):
+        assert walk_back(ITEMS, limit) == ITEMS
+
+
+def test_after_cursor_round_trip_covers_every_item_once():
+    seen, args = [], {"limit": 4, "after": "0"}
+    while True:
+        page, info = page_sequence(ITEMS, PageRequest.from_args(args))
+        seen.extend(page)
+        if info["after_cursor"] is None:
+            break
+        args = {"limit": 4, "after": str(info["after_cursor"])}
+    assert seen == ITEMS
+
+
+def test_cursors_stay_valid_while_items_are_appended():
+    items = list(ITEMS)
+    page, info = page_sequence(items, PageRequest(limit=5))
+    items.extend({"n": n} for n in range(23, 30))
+    older, _ = page_sequence(items, PageRequest(limit=5, before=info["before_cursor"]))
+    assert older == ITEMS[13:18]
+
+
+def test_mapping_and_iterable_pages_round_trip():
+    mapping = {f"k{n}": {"n": n} for n in range(7)}
+    keys, args = [], {"limit": 3, "after": "0"}
+    while True:
+        page, info = page_mapping(mapping, PageRequest.from_args(args))
+        keys.extend(item["key"] for item in page)
+        if info["after_cursor"] is None:
+            break
+        args = {"limit": 3, "after": str(info["after_cursor"])}
+    assert keys == list(mapping)
+
+    page, info = page_iterable(iter(ITEMS), PageRequest(limit=10, after=20))
+    assert page == ITEMS[20:] and info["after_cursor"] is None and info["total"] is None
+
+
+def test_fields_are_selected():
+    page, _ = page_sequence(ITEMS, PageRequest.from_args({"limit": "2", "fields": "n"}))
+    assert page == [{"n": 21}, {"n": 22}]
+
+
+@pytest.mark.parametrize("args", [
+    {"before": "abc"},
+    {"after": "-1"},
+    {"before": "3", "after": "1"},
+    {"limit": "0"},
+    {"limit": str(MAX_PAGE_LIMIT + 1)},
+])
+def test_invalid_args_are_rejected(args):
+    with pytest.raises(ValueError):
+        PageRequest.from_args(args)
+
+
+class FakeSession:
+    history_version = 1
+
+    def get_conversation_history(self):
+        return ITEMS
+
+
+@pytest.fixture
+def client(monkeypatch):
+    import app as app_module
+
+    @contextmanager
+    def session(user_id=""):
+        yield FakeSession()
+
+    monkeypatch.setattr(app_module.sessions, "session", session)
+    return app_module.app.test_client()
+
+
+@pytest.mark.parametrize("query", ["before=abc", "after=-5", "before=1&after=2", "limit=100000"])
+def test_history_route_answers_400_for_invalid_cursors(client, query):
+    response = client.get(f"/api/get-conversation-history?{query}")
+    assert response.status_code == 400
+    assert response.get_json()["status"] == "error"
+
+
+def test_history_route_cursor_round_trip(client):
+    seen, url = [], "/api/get-conversation-history?limit=10"
+    while url:
+        body = client.get(url).get_json()
+        seen = body["history"] + seen
+        cursor = body["page"]["before_cursor"]
+        url = f"/api/get-conversation-history?limit=10&before={cursor}" if cursor is not None else None
+    assert seen == ITEMS
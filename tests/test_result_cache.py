@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+
+from result_cache import LRUCache, SingleFlight, TTLCache
+
+
+def test_lru_keeps_the_most_recently_used_entries():
+    cache = LRUCache("test", 2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.put("c", 3)
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["hits"] == 3
+
+
+def test_new_generation_drops_old_entries_and_late_puts():
+    cache = LRUCache("test", 4)
+    cache.put("a", 1, generation=1)
+    assert cache.get("a", generation=2) is None
+    cache.put("b", 2, generation=1)  # computed before the change
+    assert cache.get("b", generation=2) is None
+
+
+def test_zero_size_disables_the_cache():
+    cache = LRUCache("test", 0)
+    cache.put("a", 1)
+    assert cache.get("a", default="miss") == "miss"
+
+
+def test_ttl_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = TTLCache("test", 4, ttl=10)
+    cache.put("a", 1)
+    now[0] += 9
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_ttl_cache_is_also_size_bounded():
+    cache = TTLCache("test", 2, ttl=60)
+    for key in "abc":
+        cache.put(key, key)
+    assert len(cache) == 2
+    assert cache.get("a") is None
+
+
+def test_ttl_cache_survives_a_restart(tmp_path):
+    path = str(tmp_path / "answers.json")
+    cache = TTLCache("test", 4, ttl=60, path=path)
+    cache.put("q", "answer")
+    cache.save()
+    assert TTLCache("test", 4, ttl=60, path=path).get("q") == "answer"
+
+
+def test_single_flight_shares_one_call():
+    flights = SingleFlight("test")
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    leader = threading.Thread(target=lambda: results.append(flights.do("k", slow)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flights.do("k", slow))) for _ in range(3)]
+    for t in followers:
+        t.start()
+    while flights.shared < 3:
+        time.sleep(0.001)
+    release.set()
+    for t in [leader] + followers:
+        t.join(5)
+
+    assert calls == [1]
+    assert results == ["value"] * 4
+    assert flights.in_flight() == 0
+
+
+def test_single_flight_propagates_the_error_to_every_caller():
+    flights = SingleFlight("test")
+    started, release = threading.Event(), threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("upstream down")
+
+    def call():
+        try:
+            flights.do("k", failing)
+        except ValueError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    while flights.shared < 1:
+        time.sleep(0.001)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert errors == ["upstream down"] * 2
+    # The failure is not cached: the next call runs again
+    assert flights.do("k", lambda: "recovered") == "recovered"
+
+
+def test_single_flight_async_shares_one_call():
+    flights = SingleFlight("test")
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def main():
+        return await asyncio.gather(*(flights.do_async("k", fetch) for _ in range(4)))
+
+    assert asyncio.run(main()) == ["value"] * 4
+    assert calls == [1]
+    assert flights.in_flight() == 0
+
+
+def test_single_flight_async_error_reaches_every_caller():
+    flights = SingleFlight("test")
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def main():
+        return await asyncio.gather(*(flights.do_async("k", failing) for _ in range(2)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [type(r) for r in results] == [ValueError, ValueError]
+    assert flights.in_flight() == 0
@@ -0,0 +1,87 @@
+import gc
+import os
+
+import pytest
+
+from session_manager import InvalidUserId, SessionManager, TooManyUsers
+
+
+class FakeView:
+    def __init__(self, memory_manager):
+        self.memory_manager = memory_manager
+
+
+class FakeShared:
+    """Stands in for VoiceAssistant: counts the views session_view() builds"""
+
+    def __init__(self):
+        self.built = 0
+
+    def session_view(self, memory_manager, self_learning, context_manager):
+        self.built += 1
+        return FakeView(memory_manager)
+
+
+@pytest.fixture
+def fake_sessions(tmp_path):
+    shared = FakeShared()
+    return shared, SessionManager(lambda: shared, stripes=1, max_sessions=2, data_dir=str(tmp_path))
+
+
+def test_evicted_view_in_use_is_reused(fake_sessions):
+    shared, sessions = fake_sessions
+    held = sessions.get("alice")
+    sessions.get("bob")
+    sessions.get("carol")  # evicts alice while a request still holds her view
+    assert sessions.session_count() == 2
+    assert sessions.get("alice") is held
+    assert shared.built == 3
+
+
+def test_evicted_view_nobody_holds_is_rebuilt(fake_sessions):
+    shared, sessions = fake_sessions
+    sessions.get("alice")
+    sessions.get("bob")
+    sessions.get("carol")
+    gc.collect()
+    assert sessions.get("alice") is not None
+    assert shared.built == 4
+
+
+def test_user_ids_are_checked(tmp_path):
+    sessions = SessionManager(FakeShared, data_dir=str(tmp_path), max_user_dirs=1)
+    with pytest.raises(InvalidUserId):
+        sessions.get("../etc")
+    sessions.get("alice")
+    with pytest.raises(TooManyUsers):
+        sessions.get("bob")
+    assert sessions.get("alice") is not None
+    assert len(os.listdir(tmp_path)) == 1
+
+
+@pytest.fixture(scope="module")
+def assistant():
+    from voice_assistant import VoiceAssistant
+    return VoiceAssistant()
+
+
+def test_sessions_own_their_state_and_share_models(assistant, tmp_path):
+    sessions = SessionManager(lambda: assistant, data_dir=str(tmp_path))
+    alice, bob = sessions.get("alice"), sessions.get("bob")
+
+    alice.process_command("hello aari")
+    alice.task_executor.set_reminder("stretch", "in 10 minutes")
+    alice.advanced_executor.learning_engine.learn_command("organize files", {})
+
+    assert [turn["type"] for turn in alice.conversation_history] == ["user", "assistant"]
+    assert bob.conversation_history == []
+    assert bob.task_executor.reminders == []
+    assert bob.advanced_executor.learning_engine.user_patterns == {}
+    assert assistant.task_executor.reminders == []
+    for store in ("memory_manager", "self_learning", "context_manager", "state_lock"):
+        assert getattr(alice, store) is not getattr(bob, store)
+    assert alice.memory_manager.memory_file != bob.memory_manager.memory_file
+
+    assert alice.nlp_processor is bob.nlp_processor is assistant.nlp_processor
+    assert alice.auto_updater is bob.auto_updater is assistant.auto_updater
+    assert alice.advanced_executor.task_executor is assistant.advanced_executor.task_executor
@@ -3,15 +3,21 @@ Core Voice Assistant Engine
 Advanced AI-powered voice assistant with natural language processing
 """
 
+import asyncio
+import copy
+import itertools
 import json
 import os
 import subprocess
 import webbrowser
+from contextlib import ExitStack
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 import logging
 import io
 import tempfile
+import threading
 import time
 
 # Optional imports for cloud compatibility
@@ -20,11 +26,6 @@ try:
 except ImportError:
     sr = None
     
-try:
-    import spacy
-except ImportError:
-    spacy = None
-
 try:
     from gtts import gTTS
 except ImportError:
@@ -43,10 +44,45 @@ from emotional_intelligence import EmotionalIntelligence
 from memory_manager import MemoryManager
 from auto_updater import AutoUpdater, SelfLearningSystem
 from web_search import WebSearchEngine
+from metrics import STAGE_LATENCY, INTENT_LATENCY
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# History versions come from one process-wide counter, so a session that is
+# evicted and recreated never reuses a version (and ETag) of its old history
+_history_versions = itertools.count(1)
+
+
+@dataclass
+class CommandResult:
+    """Outcome of a single pass through the command pipeline"""
+    
+    command: str
+    response: str
+    intent: str = "unknown"
+    entities: Dict[str, Any] = field(default_factory=dict)
+    confidence: float = 0.0
+    contact: str = ""
+    contact_number: str = ""
+    message: str = ""
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to the metadata shape consumed by the mobile and desktop clients"""
+        result = {
+            "response": self.response,
+            "intent": self.intent,
+            "confidence": self.confidence,
+            "entities": self.entities,
+        }
+        if self.contact:
+            result["contact"] = self.contact
+            if self.contact_number:
+                result["contact_number"] = self.contact_number
+        if self.message:
+            result["message"] = self.message
+        return result
+
 
 class VoiceAssistant:
     """Main voice assistant class with advanced capabilities"""
@@ -64,21 +100,14 @@ class VoiceAssistant:
         self.self_learning = SelfLearningSystem()  # Initialize self-learning
         self.web_search = WebSearchEngine()  # Initialize web search
         
-        # Load NLP model only if available
-        self.nlp = None
-        if spacy:
-            try:
-                self.nlp = spacy.load("en_core_web_sm")
-            except:
-                logger.warning("Spacy model not available, NLP limited")
-        else:
-            logger.warning("Spacy not available, NLP disabled")
-            logger.warning("Spacy model not found. Install with: python -m spacy download en_core_web_sm")
+        # Guards history, memory, learning and context; never held across network calls
+        self.state_lock = threading.RLock()
         
         self.running = False
         self.user_name = self.memory_manager.get_preference("user_name", "avnish")
         self.assistant_name = "aari"
         self.conversation_history = []
+        self.history_version = next(_history_versions)
         self.current_language = "en"  # Default English
         
         # Wake words for background listening
@@ -100,6 +129,29 @@ class VoiceAssistant:
             "stackoverflow": "https://stackoverflow.com",
         }
         
+    @property
+    def nlp(self):
+        """The NLP processor's spaCy pipeline (one copy per process, via the model registry)"""
+        return self.nlp_processor.nlp
+    
+    def session_view(self, memory_manager: MemoryManager, self_learning: SelfLearningSystem,
+                     context_manager: ContextManager) -> "VoiceAssistant":
+        """Per-user view that shares models and the updater but owns history, memory, learning, context,
+        reminders and learned command patterns"""
+        view = copy.copy(self)
+        view.state_lock = threading.RLock()
+        view.task_executor = self.task_executor.for_session()
+        view.advanced_executor = self.advanced_executor.for_session()
+        # auto_updater stays shared: it manages this installation, not a user, and serializes itself
+        view.memory_manager = memory_manager
+        view.self_learning = self_learning
+        view.context_manager = context_manager
+        view.emotional_intelligence = EmotionalIntelligence()
+        view.conversation_history = []
+        view.history_version = next(_history_versions)
+        view.user_name = memory_manager.get_preference("user_name", self.user_name)
+        return view
+    
     def speak(self, text: str, language: str = "en"):
         """Convert text to speech with natural female Indian voice using Google TTS"""
         logger.info(f"Assistant ({language}): {text}")
@@ -140,51 +192,195 @@ class VoiceAssistant:
     
     def process_command(self, command: str) -> str:
         """Process natural language command with emotional understanding"""
+        return self.process_command_detailed(command).response
+    
+    def process_command_detailed(self, command: str, extraction: Optional[Tuple[str, Dict, float]] = None) -> CommandResult:
+        """Process command once and return response together with intent metadata"""
+        started = time.perf_counter()
+        intent, entities, confidence = self._locked(self._begin_command, command, extraction)
+        if self._is_network_route(command, intent):
+            response = self._route_command(command, intent, entities)
+        else:
+            response = self._locked(self._route_command, command, intent, entities)
+        return self._locked(self._finish_command, command, intent, entities, confidence, response, started)
+    
+    async def process_command_detailed_async(self, command: str) -> CommandResult:
+        """Awaitable variant: query intents await Gemini/web search, the rest runs in a worker thread"""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        # Each stage takes and releases the state lock within one worker call
+        intent, entities, confidence = await loop.run_in_executor(
+            None, self._locked, self._begin_command, command, None
+        )
+        
+        if self._is_query_route(command, intent):
+            with STAGE_LATENCY.time("handler"):
+                response = await self._handle_query_async(command)
+        elif self._is_network_route(command, intent):
+            response = await loop.run_in_executor(None, self._route_command, command, intent, entities)
+        else:
+            response = await loop.run_in_executor(None, self._locked, self._route_command, command, intent, entities)
+        
+        return await loop.run_in_executor(
+            None, self._locked, self._finish_command, command, intent, entities, confidence, response, started
+        )
+    
+    def process_command_stream(self, command: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (event, data): intent metadata first, answer chunks as generated, then the final result"""
+        started = time.perf_counter()
+        # The state lock is never held while a chunk is being yielded
+        intent, entities, confidence = self._locked(self._begin_command, command)
+        chunks = []
+        finished = False
+        try:
+            yield "meta", {"intent": intent, "entities": entities or {}, "confidence": confidence}
+            
+            if self._is_query_route(command, intent):
+                # Handler time here includes the client consuming each chunk
+                with STAGE_LATENCY.time("handler"):
+                    for chunk in self._handle_query_stream(command):
+                        chunks.append(chunk)
+                        yield "chunk", {"text": chunk}
+                response = "".join(chunks)
+            else:
+                if self._is_network_route(command, intent):
+                    response = self._route_command(command, intent, entities)
+                else:
+                    response = self._locked(self._route_command, command, intent, entities)
+                chunks.append(response)
+                yield "chunk", {"text": response}
+            
+            result = self._locked(self._finish_command, command, intent, entities, confidence, response, started)
+            finished = True
+            yield "done", result.to_dict()
+        finally:
+            if not finished:
+                # Closed early (client left) or failed: pair the user turn with what was produced
+                self._locked(self._add_turn, "assistant", "".join(chunks))
+    
+    def _locked(self, stage, *args):
+        """Run one command stage with the session's state lock held"""
+        with self.state_lock:
+            return stage(*args)
+    
+    def _begin_command(self, command: str, extraction: Optional[Tuple[str, Dict, float]] = None) -> Tuple[str, Dict, float]:
+        """Record the user turn and extract intent/entities"""
         
         # Add to conversation history
-        self.conversation_history.append({
-            "timestamp": datetime.now().isoformat(),
-            "type": "user",
-            "content": command
-        })
+        self._add_turn("user", command)
         
-        # Process with NLP
-        intent, entities, confidence = self.nlp_processor.extract_intent(command)
+        # Process with NLP (batch callers pass in a precomputed extraction)
+        if extraction is None:
+            with STAGE_LATENCY.time("nlp"):
+                extraction = self.nlp_processor.extract_intent(command)
+        intent, entities, confidence = extraction
         
         logger.info(f"Intent: {intent}, Confidence: {confidence}")
         
+        return intent, entities, confidence
+    
+    def _is_update_request(self, command: str) -> bool:
+        """Check if this is an update/learning request"""
+        command_lower = command.lower()
+        return "update" in command_lower or "learn" in command_lower or "improve" in command_lower
+    
+    def _is_query_route(self, command: str, intent: str) -> bool:
+        """Check if the command will be answered by the query handler"""
+        return intent == "query" and not self._is_update_request(command) and not self._is_complex_task(command)
+    
+    def _is_network_route(self, command: str, intent: str) -> bool:
+        """Check if the handler waits on the network (Gemini, web search, downloads) without touching session state"""
+        return self._is_query_route(command, intent) or (
+            intent == "download_file" and not self._is_update_request(command) and not self._is_complex_task(command)
+        )
+    
+    def _route_command(self, command: str, intent: str, entities: Dict) -> str:
+        """Dispatch to the update, advanced or standard intent handlers"""
+        with STAGE_LATENCY.time("handler"):
+            return self._dispatch_command(command, intent, entities)
+    
+    def _dispatch_command(self, command: str, intent: str, entities: Dict) -> str:
+        """Pick the handler for a command"""
+        
         # Check if update/learning request
-        if "update" in command.lower() or "learn" in command.lower() or "improve" in command.lower():
-            response = self._handle_update_request(command)
+        if self._is_update_request(command):
+            return self._handle_update_request(command)
         # Check if complex task (advanced)
         elif self._is_complex_task(command):
-            response = self.advanced_executor.handle_advanced_command(command, {
+            return self.advanced_executor.handle_advanced_command(command, {
                 "user_name": self.user_name,
                 "timestamp": datetime.now().isoformat()
             })
         else:
             # Route to standard handlers
-            response = self._handle_intent(intent, entities, command)
+            return self._handle_intent(intent, entities, command)
+    
+    def _finish_command(self, command: str, intent: str, entities: Dict, confidence: float, response: str,
+                        started: Optional[float] = None) -> CommandResult:
+        """Wrap the handler response, record the assistant turn and learn from it"""
         
         # Enhance response with emotional intelligence
-        response = self.emotional_intelligence.generate_contextual_response(
-            command, 
-            response,
-            {"user_name": self.user_name}
-        )
+        with STAGE_LATENCY.time("emotional_intelligence"):
+            response = self.emotional_intelligence.generate_contextual_response(
+                command, 
+                response,
+                {"user_name": self.user_name}
+            )
         
         # Add response to history
-        self.conversation_history.append({
-            "timestamp": datetime.now().isoformat(),
-            "type": "assistant",
-            "content": response
-        })
+        self._add_turn("assistant", response)
         
         # Learn from interaction
         success = not any(err in response.lower() for err in ["error", "couldn't", "failed"])
-        self.self_learning.learn_from_interaction(command, response, success)
+        with STAGE_LATENCY.time("learning"):
+            self.self_learning.learn_from_interaction(command, response, success)
+        
+        result = CommandResult(
+            command=command,
+            response=response,
+            intent=intent,
+            entities=entities or {},
+            confidence=confidence,
+        )
         
-        return response
+        # Resolve contact details from the same extraction pass
+        if entities:
+            if entities.get("contact"):
+                result.contact = entities.get("contact")
+                result.contact_number = self._get_contact_number(result.contact)
+            if entities.get("message"):
+                result.message = entities.get("message")
+        
+        if started is not None:
+            INTENT_LATENCY.observe(intent, value=time.perf_counter() - started)
+        
+        return result
+    
+    def process_commands_batch(self, commands: List[str]) -> List[Dict[str, Any]]:
+        """Process an ordered batch of commands with one NLP pass and one write per store"""
+        with STAGE_LATENCY.time("nlp_batch"):
+            extractions = self.nlp_processor.extract_intents_batch(commands)
+        
+        results = []
+        # Stages lock one at a time, so queries in the batch never hold the state lock;
+        # only entering and flushing the deferred saves does
+        deferred = ExitStack()
+        with self.state_lock:
+            deferred.enter_context(self.memory_manager.deferred_saves())
+            deferred.enter_context(self.self_learning.deferred_saves())
+        try:
+            for index, (command, extraction) in enumerate(zip(commands, extractions)):
+                try:
+                    detailed = self.process_command_detailed(command, extraction=extraction)
+                    results.append({"index": index, "status": "success", **detailed.to_dict()})
+                except Exception as e:
+                    logger.error(f"Batch command {index} error: {e}")
+                    results.append({"index": index, "status": "error", "message": str(e)})
+        finally:
+            with self.state_lock:
+                deferred.close()
+        
+        return results
     
     def _is_complex_task(self, command: str) -> bool:
         """Check if this is a complex multi-step task"""
@@ -862,15 +1058,48 @@ class VoiceAssistant:
             if not answer or "could you be more specific" in answer.lower():
                 # Perform web search
                 results = self.web_search.search(command, num_results=3)
-                
-                if results:
-                    # Compile answer from search results
-                    answer = f"I found some information: {results[0]['snippet']}. "
-                    if len(results) > 1:
-                        answer += f"Other sources mention: {results[1]['snippet'][:100]}..."
-                    return answer
-                else:
-                    return "I couldn't find information on that. Can you provide more context?"
+                return self._compile_search_answer(results)
+            
+            return answer
+        
+        except Exception as e:
+            logger.error(f"Query error: {e}")
+            return "I'm having trouble answering that right now."
+    
+    def _handle_query_stream(self, command: str) -> Iterator[str]:
+        """Streaming variant of _handle_query"""
+        try:
+            # Try AI first, passing Gemini chunks through as they arrive
+            streamed = self.nlp_processor.model is not None
+            chunks = []
+            for chunk in self.nlp_processor.get_ai_answer_stream(command):
+                chunks.append(chunk)
+                if streamed:
+                    yield chunk
+            answer = "".join(chunks)
+            
+            # If AI answer is not satisfactory, try web search
+            if not answer or "could you be more specific" in answer.lower():
+                results = self.web_search.search(command, num_results=3)
+                yield self._compile_search_answer(results)
+            elif not streamed:
+                yield answer
+        
+        except Exception as e:
+            logger.error(f"Query error: {e}")
+            yield "I'm having trouble answering that right now."
+    
+    async def _handle_query_async(self, command: str) -> str:
+        """Awaitable variant of _handle_query"""
+        try:
+            # Try AI first
+            answer = await self.nlp_processor.get_ai_answer_async(command)
+            
+            # If AI answer is not satisfactory, try web search
+            if not answer or "could you be more specific" in answer.lower():
+                # Perform web search
+                results = await self.web_search.search_async(command, num_results=3)
+                return self._compile_search_answer(results)
             
             return answer
         
@@ -878,6 +1107,15 @@ class VoiceAssistant:
             logger.error(f"Query error: {e}")
             return "I'm having trouble answering that right now."
     
+    def _compile_search_answer(self, results: List[Dict[str, str]]) -> str:
+        """Compile a spoken answer from web search results"""
+        if results:
+            answer = f"I found some information: {results[0]['snippet']}. "
+            if len(results) > 1:
+                answer += f"Other sources mention: {results[1]['snippet'][:100]}..."
+            return answer
+        return "I couldn't find information on that. Can you provide more context?"
+    
     def _extract_memory_content(self, command: str) -> str:
         """Extract content to remember from command"""
         keywords = ["remember", "remember that", "store", "save", "i said"]
@@ -932,6 +1170,15 @@ class VoiceAssistant:
         """Return conversation history"""
         return self.conversation_history
     
+    def _add_turn(self, kind: str, content: str):
+        """Append a turn to the conversation history and give it a new version"""
+        self.conversation_history.append({
+            "timestamp": datetime.now().isoformat(),
+            "type": kind,
+            "content": content
+        })
+        self.history_version = next(_history_versions)
+    
     def save_settings(self, settings_file: str = "assistant_settings.json"):
         """Save assistant settings"""
         settings = {
@@ -3,15 +3,28 @@ Web Search Integration for Voice Assistant
 Enables real-time web search and content retrieval
 """
 
+import asyncio
 import requests
 from googlesearch import search
 from bs4 import BeautifulSoup
 import logging
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional
+
+from metrics import WEB_FETCHES
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
 
 logger = logging.getLogger(__name__)
 
 
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
+
+
 class WebSearchEngine:
     """Web search engine with content extraction"""
     
@@ -19,13 +32,13 @@ class WebSearchEngine:
         self.timeout = 10
         self.max_results = 5
     
-    def search(self, query: str, num_results: int = 5) -> List[Dict[str, str]]:
-        """Perform web search and return results"""
+    def search(self, query: str, num_results: int = 5, progress: Optional[Callable] = None) -> List[Dict[str, str]]:
+        """Perform web search and return results; progress(fraction, message) after each page"""
         try:
             results = []
             count = 0
             
-            for url in search(query, num_results=num_results, advanced=True, sleep_interval=1):
+            for url in self._result_urls(query, num_results):
                 if count >= num_results:
                     break
                 
@@ -39,44 +52,121 @@ class WebSearchEngine:
                             "full_content": content
                         })
                         count += 1
+                        if progress:
+                            progress(count / num_results, f"Fetched {count} of {num_results} pages")
                 except:
                     continue
             
+            WEB_FETCHES.inc("search", "ok")
             logger.info(f"Web search completed for '{query}': {len(results)} results")
             return results
         
         except Exception as e:
             logger.error(f"Web search error: {e}")
+            WEB_FETCHES.inc("search", "error")
             return []
     
     def get_page_content(self, url: str) -> str:
         """Extract main content from webpage"""
         try:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-            response = requests.get(url, headers=headers, timeout=self.timeout)
+            response = requests.get(url, headers=BROWSER_HEADERS, timeout=self.timeout)
             response.raise_for_status()
+            WEB_FETCHES.inc("page", "ok")
+            return self._extract_text(response.content)
+        
+        except Exception as e:
+            logger.warning(f"Page content extraction error for {url}: {e}")
+            WEB_FETCHES.inc("page", "error")
+            return ""
+    
+    def _result_urls(self, query: str, num_results: int) -> List[str]:
+        """Result URLs from googlesearch (blocking: it fetches and parses the results page)"""
+        return [getattr(result, "url", result)
+                for result in search(query, num_results=num_results, advanced=True, sleep_interval=1)]
+    
+    async def search_async(self, query: str, num_results: int = 5, session=None) -> List[Dict[str, str]]:
+        """Awaitable search: googlesearch on a worker thread, then all pages fetched concurrently"""
+        loop = asyncio.get_running_loop()
+        if aiohttp is None:
+            return await loop.run_in_executor(None, self.search, query, num_results)
+        
+        owns_session = session is None
+        if owns_session:
+            session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        
+        try:
+            urls = (await loop.run_in_executor(None, self._result_urls, query, num_results))[:num_results]
+            WEB_FETCHES.inc("search", "ok")
             
-            soup = BeautifulSoup(response.content, "html.parser")
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # Get text
-            text = soup.get_text(separator=" ", strip=True)
+            contents = await asyncio.gather(
+                *(self.get_page_content_async(url, session=session) for url in urls)
+            )
             
-            # Clean up whitespace
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = " ".join(chunk for chunk in chunks if chunk)
+            results = [
+                {
+                    "url": url,
+                    "title": self._extract_title(url),
+                    "snippet": content[:200],
+                    "full_content": content
+                }
+                for url, content in zip(urls, contents) if content
+            ]
             
-            return text[:2000]  # Return first 2000 chars
+            logger.info(f"Async web search completed for '{query}': {len(results)} results")
+            return results
         
         except Exception as e:
-            logger.warning(f"Page content extraction error for {url}: {e}")
+            logger.error(f"Async web search error: {e}")
+            WEB_FETCHES.inc("search", "error")
+            return []
+        
+        finally:
+            if owns_session:
+                await session.close()
+    
+    async def get_page_content_async(self, url: str, session=None) -> str:
+        """Awaitable variant of get_page_content; the HTML is parsed on a worker thread"""
+        loop = asyncio.get_running_loop()
+        if aiohttp is None:
+            return await loop.run_in_executor(None, self.get_page_content, url)
+        
+        owns_session = session is None
+        if owns_session:
+            session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        
+        try:
+            async with session.get(url, headers=BROWSER_HEADERS) as response:
+                response.raise_for_status()
+                content = await response.read()
+            WEB_FETCHES.inc("page", "ok")
+            return await loop.run_in_executor(None, self._extract_text, content)
+        
+        except Exception as e:
+            logger.warning(f"Async page content extraction error for {url}: {e}")
+            WEB_FETCHES.inc("page", "error")
             return ""
+        
+        finally:
+            if owns_session:
+                await session.close()
+    
+    def _extract_text(self, content: bytes) -> str:
+        """Strip markup from a fetched page and return its first 2000 characters"""
+        soup = BeautifulSoup(content, "html.parser")
+        
+        # Remove script and style elements
+        for script in soup(["script", "style"]):
+            script.decompose()
+        
+        # Get text
+        text = soup.get_text(separator=" ", strip=True)
+        
+        # Clean up whitespace
+        lines = (line.strip() for line in text.splitlines())
+        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+        text = " ".join(chunk for chunk in chunks if chunk)
+        
+        return text[:2000]  # Return first 2000 chars
     
     def _extract_title(self, url: str) -> str:
         """Extract title from URL"""